@@ -0,0 +1,477 @@
+import operator
+from collections import Counter
+from functools import reduce
+from typing import Any, Callable
+
+from natives.natives import NATIVES
+from interpreter.operators import ARITHMETIC_OPERATORS, NUMERIC_TYPES, OPERATOR_TABLE, ORDERING_OPERATORS
+from interpreter.strings import Rope, concatenate, repeat
+from lexer.types import BINARY_OPERATOR_TO_CHAR, TokenType
+from parser.types import *
+
+
+# Inferred types. A scalar type is the frozenset of Python types its values can have, ArrayType and ObjectType
+# describe lists and dicts by their contents, and ANY is everything else: values read from memory the script did
+# not assign, results of operations the analysis knows nothing about. The empty frozenset types an expression
+# that never produces a value, like an element of an empty array.
+
+class AnyType:
+    __slots__ = ()
+
+    def __repr__(self):
+        return 'any'
+
+
+ANY = AnyType()
+NEVER = frozenset()
+INT = frozenset({int})
+FLOAT = frozenset({float})
+NUMBER = frozenset(NUMERIC_TYPES)
+BOOL = frozenset({bool})
+STR = frozenset({str})
+STRING = frozenset({str, Rope}) # concatenations can return a rope
+NONE = frozenset({type(None)})
+LIST = frozenset({list})
+DICT = frozenset({dict})
+
+MAX_NESTING = 4 # deeper containers are ANY, so loops building nested arrays still reach a fixed point
+MAX_DESCRIBED_KEYS = 8
+
+UNKNOWN_KEY = object() # a store under a key that is not a constant
+
+
+class ArrayType:
+    __slots__ = ('element',)
+
+    def __init__(self, element):
+        self.element = element
+
+    def __eq__(self, other):
+        return type(other) is ArrayType and self.element == other.element
+
+    def __hash__(self):
+        return hash((ArrayType, self.element))
+
+    def __repr__(self):
+        return describe(self)
+
+
+class ObjectType:
+    # `shape` holds the keys every value of the type is proven to have, and the types of their values
+    __slots__ = ('shape',)
+
+    def __init__(self, shape: dict):
+        self.shape = shape
+
+    def __eq__(self, other):
+        return type(other) is ObjectType and self.shape == other.shape
+
+    def __hash__(self):
+        return hash((ObjectType, frozenset(self.shape.items())))
+
+    def __repr__(self):
+        return describe(self)
+
+
+CONTAINER_TYPES = (ArrayType, ObjectType)
+
+
+def describe(inferred) -> str:
+    if type(inferred) is ArrayType:
+        return f"array<{describe(inferred.element)}>"
+    if type(inferred) is ObjectType:
+        items = [f"{key!r}: {describe(value)}" for key, value in list(inferred.shape.items())[:MAX_DESCRIBED_KEYS]]
+        if len(inferred.shape) > MAX_DESCRIBED_KEYS:
+            items.append('...')
+        return f"object{{{', '.join(items)}}}"
+    if type(inferred) is frozenset:
+        names = {'null' if value_type is type(None) else getattr(value_type, 'script_type_name', value_type.__name__)
+                 for value_type in inferred}
+        return '|'.join(sorted(names)) or 'never'
+    return 'any'
+
+
+def join(a, b):
+    # the least type describing the values of both
+    if a == b:
+        return a
+    if type(a) is frozenset and type(b) is frozenset:
+        return a | b
+    if a == NEVER:
+        return b
+    if b == NEVER:
+        return a
+    if type(a) is ArrayType and type(b) is ArrayType:
+        return ArrayType(join(a.element, b.element))
+    if type(a) is ObjectType and type(b) is ObjectType:
+        return ObjectType({key: join(value, b.shape[key]) for key, value in a.shape.items() if key in b.shape})
+    return ANY
+
+
+def join_environments(a: dict | None, b: dict | None) -> dict | None:
+    # None is the environment of a path that never gets there; a name missing from an environment may be unassigned
+    if a is None or b is None:
+        return b if a is None else a
+    return {name: join(value, b[name]) for name, value in a.items() if name in b}
+
+
+def bounded(inferred, depth: int = MAX_NESTING):
+    if type(inferred) is ArrayType:
+        if not depth:
+            return ANY
+        element = bounded(inferred.element, depth - 1)
+        return inferred if element is inferred.element else ArrayType(element)
+    if type(inferred) is ObjectType:
+        if not depth:
+            return ANY
+        shape = {key: bounded(value, depth - 1) for key, value in inferred.shape.items()}
+        return inferred if all(shape[key] is value for key, value in inferred.shape.items()) else ObjectType(shape)
+    return inferred
+
+
+def runtime_types(inferred) -> frozenset | None:
+    if type(inferred) is ArrayType:
+        return LIST
+    if type(inferred) is ObjectType:
+        return DICT
+    return inferred if type(inferred) is frozenset else None
+
+
+def mutated(inferred, kind: type | None, key, value):
+    # `inferred` after a store of `value` under `key` into some container of `kind` (None when it is not known),
+    # which may be any part of a value of that type: aliases are not tracked, so every position that could hold
+    # that container takes the value in
+    if type(inferred) is ArrayType:
+        element = mutated(inferred.element, kind, key, value)
+        return ArrayType(join(element, value) if kind is not dict else element)
+    if type(inferred) is ObjectType:
+        shape = {name: mutated(item, kind, key, value) for name, item in inferred.shape.items()}
+        if kind is not list:
+            for name in shape:
+                if key is UNKNOWN_KEY or name == key:
+                    shape[name] = join(shape[name], value)
+        return ObjectType(shape)
+    return inferred
+
+
+def stored(inferred, keys: list, value):
+    # `inferred` after storing `value` at a constant key path inside it; only objects know where that is
+    if not keys:
+        return value
+    if type(inferred) is not ObjectType or (len(keys) > 1 and keys[0] not in inferred.shape):
+        return inferred
+    shape = dict(inferred.shape)
+    shape[keys[0]] = stored(shape[keys[0]], keys[1:], value) if len(keys) > 1 else value
+    return ObjectType(shape)
+
+
+def is_numeric(inferred) -> bool:
+    return type(inferred) is frozenset and bool(inferred) and inferred <= NUMBER
+
+
+COMPARISON_FUNCTIONS = {operator.eq, operator.ne, *ORDERING_OPERATORS.values()}
+
+
+def result_type(operator_type: TokenType, left_type: type, right_type: type, function: Callable, left, right):
+    # what the built-in implementations return; anything registered on top of them returns ANY
+    if left_type in NUMERIC_TYPES and right_type in NUMERIC_TYPES and function is ARITHMETIC_OPERATORS.get(operator_type):
+        if operator_type == TokenType.DIVIDE:
+            return FLOAT
+        if operator_type == TokenType.EXPONENT: # negative exponents give floats, fractional ones complex numbers
+            return NUMBER if left_type is int and right_type is int else frozenset({float, complex})
+        return FLOAT if float in (left_type, right_type) else INT
+    if function in COMPARISON_FUNCTIONS:
+        return BOOL
+    if function is concatenate:
+        return STRING
+    if function is repeat:
+        return STR
+    if function is operator.add and left_type is list and right_type is list:
+        return ArrayType(join(left.element, right.element))
+    if function is operator.mul and list in (left_type, right_type):
+        return left if left_type is list else right
+    return ANY
+
+
+def extreme(*args):
+    if len(args) == 1:
+        return args[0].element if type(args[0]) is ArrayType else ANY
+    return reduce(join, args)
+
+
+NATIVE_RESULTS: dict[Any, Callable] = {NATIVES[name]: rule for name, rule in {
+    'print': lambda *args: NONE,
+    'len': lambda *args: INT,
+    'str': lambda *args: STR,
+    'int': lambda *args: INT,
+    'float': lambda *args: FLOAT,
+    'abs': lambda value: value if is_numeric(value) else ANY,
+    'round': lambda value, *digits: INT if not digits and is_numeric(value) else ANY,
+    'min': extreme,
+    'max': extreme,
+    'sum': lambda values: join(INT, values.element) if type(values) is ArrayType and is_numeric(values.element) else ANY,
+    'sqrt': lambda *args: FLOAT,
+    'floor': lambda *args: INT,
+    'ceil': lambda *args: INT,
+    'upper': lambda *args: STR,
+    'lower': lambda *args: STR,
+    'replace': lambda *args: STR,
+    'split': lambda *args: ArrayType(STR),
+    'join': lambda *args: STR,
+    'keys': lambda *args: ArrayType(ANY),
+    'range': lambda *args: ArrayType(INT),
+}.items()} # keyed by the Native, so a re-registered name is not typed by the rule of the one it replaced
+
+
+class TypeInference:
+    # Infers what the values of the script can be by running it on types instead of values: branches are joined and
+    # loops iterate to a fixed point. The script starts from a memory it knows nothing about, so the result holds
+    # whatever memory it runs on. Nothing is inferred for nodes that never run.
+    def __init__(self):
+        self.types: dict[int, Any] = {} # id(node) -> the join of the types of every value the node evaluated to
+        self.proven: dict[int, bool] = {} # id(Identifier or Assign) -> each of its runs only indexes proven containers
+        self.nodes: dict[int, Type] = {} # keeps the nodes the ids stand for alive
+        self.env: dict | None = {} # top-level name -> type of its value, for names assigned on every path here
+        self.loops: list[tuple[list, list]] = [] # environments at the breaks and continues of the loops being run
+        self.mutations: list[tuple] = [] # stores into containers since the current statement started
+        self.variables: dict = {} # the environment at the end of the script
+        self.specialized: Counter[str] = Counter() # variant name -> nodes rewritten into it
+        self.inferrers = {
+            Identifier: self.infer_identifier,
+            BinaryOperation: self.infer_binary_operation,
+            Assign: self.infer_assign,
+            Object: self.infer_object,
+            Array: lambda x: bounded(ArrayType(reduce(join, self.evaluate(x.elements), NEVER))),
+            NativeCall: self.infer_native_call,
+            If: self.infer_if,
+            While: self.infer_while,
+            Break: lambda x: self.jump(0),
+            Continue: lambda x: self.jump(1),
+            Symbol: lambda x: STR,
+            **{t: lambda x: frozenset({type(x.value)}) for t in Primitive.__subclasses__()}
+        }
+
+    def infer(self, ast: list) -> 'TypeInference':
+        self.env = {}
+        self.infer_block(ast)
+        self.variables = self.env or {}
+        return self
+
+    def type_of(self, node):
+        return self.types.get(id(node))
+
+    def is_proven(self, node) -> bool:
+        return self.proven.get(id(node), False)
+
+    def infer_node(self, node):
+        inferrer = self.inferrers.get(type(node))
+        if inferrer is None: # quickened and typed variants are inferred like the node they stand in for
+            inferrer = next((self.inferrers[base] for base in type(node).__mro__ if base in self.inferrers), None)
+        inferred = inferrer(node) if inferrer else ANY
+        key = id(node)
+        self.types[key] = join(self.types.get(key, NEVER), inferred)
+        self.nodes[key] = node
+        return inferred
+
+    def prove(self, node, proven: bool):
+        self.proven[id(node)] = self.proven.get(id(node), True) and proven
+
+    def catch_up(self, inferred, mark: int):
+        # a value evaluated earlier in the statement, after the stores made since
+        for kind, key, value in self.mutations[mark:]:
+            inferred = mutated(inferred, kind, key, value)
+        return inferred
+
+    def evaluate(self, nodes: list) -> list:
+        # the types of values evaluated left to right, as they are once the last one has been evaluated
+        types, marks = [], []
+        for node in nodes:
+            types.append(self.infer_node(node))
+            marks.append(len(self.mutations))
+        if marks and marks[0] < len(self.mutations):
+            types = [self.catch_up(inferred, mark) for inferred, mark in zip(types, marks)]
+        return types
+
+    def mutate(self, kind: type | None, key, value):
+        self.mutations.append((kind, key, value))
+        env = self.env
+        for name, inferred in env.items():
+            if type(inferred) in CONTAINER_TYPES:
+                env[name] = bounded(mutated(inferred, kind, key, value))
+
+    def index(self, container, part, key):
+        # the type of container[part] and whether the indexing is proven to need no validation
+        if type(container) is ObjectType:
+            if isinstance(part, Primitive) and part.value in container.shape:
+                return container.shape[part.value], True
+            return ANY, False
+        if key == INT:
+            if type(container) is ArrayType:
+                return container.element, True
+            if type(container) is frozenset and container and container <= STRING:
+                return STR, True
+        return ANY, False
+
+    def infer_path(self, address: list) -> tuple[Any, bool]:
+        # the value at the address and whether reading it is proven to need no validation
+        root = address[0]
+        if isinstance(root, Primitive):
+            current, proven = self.env.get(root.value, ANY), root.value in self.env
+        else:
+            current, proven = self.infer_node(root), False
+            if type(root) is not NativeCall: # a computed top-level name
+                current = ANY
+        for part in address[1:]:
+            mark = len(self.mutations)
+            key = self.infer_node(part)
+            current, step_proven = self.index(self.catch_up(current, mark), part, key)
+            proven = proven and step_proven
+        return current, proven
+
+    def infer_identifier(self, identifier: Identifier):
+        current, proven = self.infer_path(identifier.address)
+        self.prove(identifier, proven)
+        return current
+
+    def infer_binary_operation(self, operation: BinaryOperation):
+        left, right = self.evaluate([operation.left, operation.right])
+        lefts, rights = runtime_types(left), runtime_types(right)
+        if lefts is None or rights is None:
+            return ANY
+        result = NEVER
+        for left_type in lefts:
+            for right_type in rights:
+                function = OPERATOR_TABLE.get((operation.operator, left_type, right_type))
+                if function is not None: # other pairs raise
+                    result = join(result, result_type(operation.operator, left_type, right_type, function, left, right))
+        return bounded(result)
+
+    def operator_function(self, operation: BinaryOperation) -> Callable | None:
+        # the implementation every operand type pair the operation can see resolves to, if there is exactly one
+        lefts, rights = runtime_types(self.type_of(operation.left)), runtime_types(self.type_of(operation.right))
+        if not lefts or not rights:
+            return None
+        functions = {OPERATOR_TABLE.get((operation.operator, left_type, right_type))
+                     for left_type in lefts for right_type in rights}
+        return functions.pop() if len(functions) == 1 and None not in functions else None
+
+    def infer_object(self, obj: Object):
+        values = self.evaluate([prop.value for prop in obj.properties])
+        return bounded(ObjectType({prop.key.value: value for prop, value in zip(obj.properties, values)}))
+
+    def infer_native_call(self, call: NativeCall):
+        args = self.evaluate(call.args)
+        rule = NATIVE_RESULTS.get(call.native)
+        return rule(*args) if rule else ANY
+
+    def infer_assign(self, assign: Assign):
+        mark = len(self.mutations)
+        value = self.infer_node(assign.value)
+        address = assign.identifier.address
+        root = address[0]
+        old = ANY
+        if len(address) == 1 and isinstance(root, Primitive):
+            old = self.env.get(root.value, ANY)
+            self.env[root.value] = bounded(value)
+            self.prove(assign, True)
+        elif len(address) == 1: # a computed name may be any of them
+            self.infer_node(root)
+            value = self.catch_up(value, mark)
+            for name in self.env:
+                self.env[name] = ANY
+            self.prove(assign, False)
+        else:
+            container, proven = self.infer_path(address[:-1])
+            last_mark = len(self.mutations)
+            key = self.infer_node(address[-1])
+            container, value = self.catch_up(container, last_mark), self.catch_up(value, mark)
+            constant = isinstance(address[-1], Primitive)
+            if type(container) is ObjectType:
+                kind = dict
+                if constant and address[-1].value in container.shape:
+                    old = container.shape[address[-1].value]
+            elif type(container) is ArrayType:
+                kind, proven = list, proven and key == INT
+            else:
+                kind, proven = None, False
+            self.prove(assign, proven)
+            self.mutate(kind, address[-1].value if constant else UNKNOWN_KEY, value)
+            if all(isinstance(part, Primitive) for part in address) and root.value in self.env:
+                keys = [part.value for part in address[1:]]
+                self.env[root.value] = bounded(stored(self.env[root.value], keys, value))
+        return value if assign.return_mode == 'after' else old
+
+    def infer_block(self, statements: list):
+        for statement in statements:
+            if self.env is None: # after a break or continue
+                return
+            self.mutations.clear()
+            self.infer_node(statement)
+
+    def infer_if(self, node: If):
+        self.infer_node(node.condition)
+        before = dict(self.env)
+        self.infer_block(node.body)
+        after_body, self.env = self.env, before
+        self.infer_block(node.orelse)
+        self.env = join_environments(after_body, self.env)
+        return NONE
+
+    def jump(self, which: int):
+        self.loops[-1][which].append(self.env)
+        self.env = None
+        return NONE
+
+    def infer_while(self, loop: While):
+        head = self.env
+        while True:
+            self.env = dict(head)
+            self.infer_node(loop.condition)
+            exit_env = dict(self.env)
+            breaks, continues = [], []
+            self.loops.append((breaks, continues))
+            self.infer_block(loop.body)
+            self.loops.pop()
+            next_head = reduce(join_environments, continues, join_environments(head, self.env))
+            if next_head == head:
+                break
+            head = next_head
+        self.env = reduce(join_environments, breaks, exit_env)
+        return NONE
+
+    def report(self) -> str:
+        lines = [f"TypeReport(nodes: {len(self.types)}, proven accesses: {sum(self.proven.values())} of "
+                 f"{len(self.proven)}, specialized: {self.specialized.total()})"]
+        for name, inferred in self.variables.items():
+            lines.append(f"  {name!s:<24} {describe(inferred)}")
+        for name, count in self.specialized.most_common():
+            lines.append(f"  {name:<48} {count:>8} specialized")
+        return '\n'.join(lines)
+
+    def dump(self, ast: list) -> str:
+        # every node that ran, with the class it runs as and the type of its values; the children of nodes that are
+        # not evaluated themselves, like assignment targets, are listed in their place
+        lines = []
+
+        def visit(node, depth: int):
+            inferred = self.type_of(node)
+            if inferred is None:
+                for child in node.children():
+                    visit(child, depth)
+                return
+            label = type(node).__name__
+            if isinstance(node, Primitive):
+                label += f" {node.value!r}"
+            elif type(node) is BinaryOperation: # variants name the operator themselves
+                label += f" {BINARY_OPERATOR_TO_CHAR[node.operator]}"
+            elif isinstance(node, NativeCall):
+                label += f" {node.native.name}()"
+            if id(node) in self.proven:
+                label += ' (proven)' if self.is_proven(node) else ' (checked)'
+            lines.append(f"{'  ' * depth}{label}: {describe(inferred)}")
+            for child in node.children():
+                visit(child, depth + 1)
+
+        for statement in ast:
+            visit(statement, 0)
+        return '\n'.join(lines)
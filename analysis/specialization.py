@@ -0,0 +1,85 @@
+from typing import Any, Callable
+
+from analysis.inference import TypeInference, describe
+from lexer.types import BINARY_OPERATOR_TO_CHAR, TokenType
+from parser.types import Assign, BinaryOperation, Identifier, Type
+
+
+# Variants of AST nodes for operations the type inference proved, swapped in like the quickened ones
+# (interpreter/quickening.py) but before the script runs and without guards: what a variant skips is proven to
+# always succeed, so it never deoptimizes. `typed_from` names the node type the variant stands in for.
+
+class TypedBinaryOperation(BinaryOperation):
+    # base of the per (operator, implementation) variants: every operand type pair the operation can see resolves
+    # to `function` in the operator table, so it is called without looking the pair up
+    __slots__ = ()
+    typed_from = BinaryOperation
+    function: Callable[[Any, Any], Any]
+
+
+class TypedGlobalIdentifier(Identifier):
+    # a top-level name assigned on every path to the read
+    __slots__ = ()
+    typed_from = Identifier
+
+
+class TypedPathIdentifier(Identifier):
+    # a path whose every step indexes a list with an int, a string with an int or an object with a key it has
+    __slots__ = ()
+    typed_from = Identifier
+
+
+class TypedGlobalAssign(Assign):
+    __slots__ = ()
+    typed_from = Assign
+
+
+class TypedPathAssign(Assign):
+    # stores into a list with an int or into an object, through a path that is proven like TypedPathIdentifier's
+    __slots__ = ()
+    typed_from = Assign
+
+
+TYPED_BINARY_VARIANTS: dict[tuple, type[TypedBinaryOperation]] = {}
+
+
+def typed_binary_operation_variant(operator_type: TokenType, function: Callable[[Any, Any], Any],
+                                   left: str, right: str) -> type[TypedBinaryOperation]:
+    key = (operator_type, function, left, right)
+    variant = TYPED_BINARY_VARIANTS.get(key)
+    if variant is None:
+        name = f'TypedBinaryOperation[{left} {BINARY_OPERATOR_TO_CHAR[operator_type]} {right}]'
+        variant = TYPED_BINARY_VARIANTS[key] = type(name, (TypedBinaryOperation,), {
+            '__slots__': (), 'function': staticmethod(function),
+        })
+    return variant
+
+
+def specialize(ast: list, inference: TypeInference):
+    # rewrites the nodes of an inferred AST in place; nodes that never ran during inference keep their class
+    seen = set()
+
+    def rewrite(node, variant: type):
+        node.__class__ = variant
+        inference.specialized[variant.__name__] += 1
+
+    def visit(node: Type):
+        if id(node) in seen: # shared subtrees are inferred and rewritten once
+            return
+        seen.add(id(node))
+        node_type = type(node)
+        if node_type is BinaryOperation:
+            function = inference.operator_function(node)
+            if function is not None:
+                rewrite(node, typed_binary_operation_variant(node.operator, function,
+                                                             describe(inference.type_of(node.left)),
+                                                             describe(inference.type_of(node.right))))
+        elif node_type is Identifier and inference.is_proven(node):
+            rewrite(node, TypedGlobalIdentifier if len(node.address) == 1 else TypedPathIdentifier)
+        elif node_type is Assign and inference.is_proven(node):
+            rewrite(node, TypedGlobalAssign if len(node.identifier.address) == 1 else TypedPathAssign)
+        for child in node.children():
+            visit(child)
+
+    for statement in ast:
+        visit(statement)
@@ -0,0 +1,215 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterable, Iterator
+
+from engines import ENGINES
+from interpreter.interpreter import Interpreter
+from lexer.bulk_lexer import BulkLexer
+from lexer.symbols import SYMBOLS
+from optimizer.optimizer import Optimizer
+from parser.cache import ParseCache
+from parser.parser import Parser
+
+
+# a worker keeps no tree between scripts, so it starts the symbol table over once it holds this many identifiers
+# instead of keeping every identifier of every script it ran for as long as it lives
+MAX_WORKER_SYMBOLS = 1 << 16
+
+
+class ScriptTimeout(Exception):
+    pass
+
+
+class WorkerState:
+    # built once per worker process by the pool initializer and reused by every script the worker runs
+    engine = Interpreter
+    optimize = True
+    timeout: float | None = None
+    parse_cache: ParseCache | None = None
+
+
+def init_worker(engine: str, optimize: bool, timeout: float | None, cache_dir: str | None):
+    WorkerState.engine = ENGINES[engine]
+    WorkerState.optimize = optimize
+    WorkerState.timeout = timeout
+    WorkerState.parse_cache = ParseCache(cache_dir) if cache_dir else None
+    if timeout and hasattr(signal, 'setitimer'):
+        signal.signal(signal.SIGALRM, raise_timeout)
+
+
+def raise_timeout(signum, frame):
+    raise ScriptTimeout(f"Script exceeded its {WorkerState.timeout}s time limit")
+
+
+@contextlib.contextmanager
+def time_limit(seconds: float | None):
+    if not seconds or not hasattr(signal, 'setitimer'):
+        yield
+        return
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def parse(source: str) -> list:
+    if WorkerState.parse_cache:
+        return WorkerState.parse_cache.parse(source)
+    return Parser(BulkLexer(source)).parse()
+
+
+def run_script(path: str) -> dict:
+    return run_source(None, path)
+
+
+def run_source(source: str | None, path: str) -> dict:
+    # never raises: every failure is reported in the result so one script cannot take the batch down with it;
+    # without a source the script is read from path
+    result = {'path': path, 'ok': False, 'error': None, 'output': '', 'memory': None,
+              'parse_seconds': 0.0, 'run_seconds': 0.0, 'seconds': 0.0, 'worker': os.getpid()}
+    start = time.perf_counter()
+    output = io.StringIO()
+    try:
+        with time_limit(WorkerState.timeout):
+            if source is None:
+                with open(path) as script:
+                    source = script.read()
+            ast = parse(source)
+            if WorkerState.optimize:
+                ast = Optimizer().optimize(ast)
+            parsed = time.perf_counter()
+            result['parse_seconds'] = parsed - start
+            interpreter = WorkerState.engine(ast)
+            with contextlib.redirect_stdout(output):
+                interpreter.interpret()
+            result['run_seconds'] = time.perf_counter() - parsed
+        result['memory'] = encodable(interpreter.memory)
+        result['ok'] = True
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['output'] = output.getvalue()
+    result['seconds'] = time.perf_counter() - start
+    if len(SYMBOLS) > MAX_WORKER_SYMBOLS:
+        SYMBOLS.clear()
+    return result
+
+
+def encodable(value, ancestors: set | None = None):
+    # the memory as a tree JSON can encode: a container found inside itself is replaced by '[...]' or '{...}', the
+    # way Python prints it, since a valid script can build cycles that json.dumps rejects
+    if not isinstance(value, (dict, list)):
+        return value
+    ancestors = ancestors if ancestors is not None else set()
+    if id(value) in ancestors:
+        return '{...}' if isinstance(value, dict) else '[...]'
+    ancestors.add(id(value))
+    if isinstance(value, dict):
+        result = {key: encodable(item, ancestors) for key, item in value.items()}
+    else:
+        result = [encodable(item, ancestors) for item in value]
+    ancestors.remove(id(value))
+    return result
+
+
+def encode(result: dict) -> tuple[str, bool]:
+    # the JSON line of a result and whether it reports success; a memory that still cannot be encoded is dropped
+    # and that one script reported as failed, instead of ending the batch
+    try:
+        return json.dumps(result, default=repr), result['ok']
+    except (TypeError, ValueError, RecursionError) as e:
+        error = f"Cannot encode the memory: {type(e).__name__}: {e}"
+        return json.dumps(result | {'ok': False, 'error': error, 'memory': None}, default=repr), False
+
+
+def failed(path: str, error: str) -> dict:
+    return {'path': path, 'ok': False, 'error': error, 'output': '', 'memory': None,
+            'parse_seconds': 0.0, 'run_seconds': 0.0, 'seconds': 0.0, 'worker': None}
+
+
+def discover(target: str, suffix: str = '.sb') -> list[str]:
+    # a directory is searched recursively for scripts, any other file is a manifest with one script path per line
+    if os.path.isdir(target):
+        return sorted(os.path.join(root, name) for root, _, names in os.walk(target)
+                      for name in names if name.endswith(suffix))
+    base = os.path.dirname(os.path.abspath(target))
+    with open(target) as manifest:
+        lines = (line.strip() for line in manifest)
+        return [os.path.join(base, line) for line in lines if line and not line.startswith('#')]
+
+
+def run_batch(paths: Iterable[str], workers: int | None = None, engine: str = 'tree', optimize: bool = True,
+              timeout: float | None = None, cache_dir: str | None = None) -> Iterator[dict]:
+    # results are yielded in completion order; at most a few tasks per worker are queued at once so
+    # huge batches do not materialize a future per script up front. A worker that dies breaks its pool: the
+    # scripts in flight on it fail, and the rest of the batch goes on in a new pool.
+    workers = workers or os.cpu_count() or 1
+    paths = iter(paths)
+    pending = {} # future -> (path, the executor it was submitted to)
+
+    def start_pool() -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                   initargs=(engine, optimize, timeout, cache_dir))
+
+    executor = start_pool()
+    try:
+        while True:
+            while len(pending) < workers * 4:
+                path = next(paths, None)
+                if path is None:
+                    break
+                try:
+                    future = executor.submit(run_script, path)
+                except BrokenProcessPool: # broke since the last results came in, the script never ran
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    executor = start_pool()
+                    future = executor.submit(run_script, path)
+                pending[future] = (path, executor)
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                path, submitted_to = pending.pop(future)
+                try:
+                    yield future.result()
+                except BrokenProcessPool as e:
+                    yield failed(path, f'BrokenProcessPool: {e}')
+                    if submitted_to is executor:
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        executor = start_pool()
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description='run many independent Saban scripts across a process pool')
+    arg_parser.add_argument('target', help='directory of scripts, or a manifest file listing one script per line')
+    arg_parser.add_argument('--suffix', default='.sb', help='script file suffix when target is a directory')
+    arg_parser.add_argument('--workers', type=int, help='defaults to the number of CPUs')
+    arg_parser.add_argument('--engine', choices=ENGINES, default='tree')
+    arg_parser.add_argument('--no-optimize', action='store_true')
+    arg_parser.add_argument('--timeout', type=float, help='per-script time limit in seconds')
+    arg_parser.add_argument('--cache-dir', help='reuse parsed ASTs from this directory')
+    arg_parser.add_argument('--output', action='store_true', help='include what each script printed')
+    args = arg_parser.parse_args()
+
+    batch_start = time.perf_counter()
+    succeeded = failures = 0
+    for script_result in run_batch(discover(args.target, args.suffix), args.workers, args.engine,
+                                   not args.no_optimize, args.timeout, args.cache_dir):
+        if not args.output:
+            del script_result['output']
+        line, ok = encode(script_result)
+        succeeded += ok
+        failures += not ok
+        print(line, flush=True)
+    print(f"{succeeded} succeeded, {failures} failed in {time.perf_counter() - batch_start:.3f}s", file=sys.stderr)
+    sys.exit(1 if failures else 0)
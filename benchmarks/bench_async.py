@@ -0,0 +1,45 @@
+import asyncio
+import statistics
+import sys
+import time
+
+from benchmarks.corpus import generate
+from lexer.bulk_lexer import BulkLexer
+from parser.parser import Parser
+from vm.scheduler import AsyncScript
+
+
+async def probe(lags: list, stop: asyncio.Event, interval: float = 0.001):
+    # how late the event loop wakes a timer is the latency every other coroutine on it sees
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - expected)
+
+
+async def interleave(asts: list, slice_size: int) -> tuple[float, list]:
+    lags, stop = [], asyncio.Event()
+    probe_task = asyncio.create_task(probe(lags, stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(AsyncScript(ast, slice_size).run() for ast in asts))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe_task
+    return elapsed, lags
+
+
+def main(scripts: int = 200, heavy_scale: int = 2000):
+    light = Parser(BulkLexer(generate('arithmetic_heavy', 5))).parse()
+    heavy = Parser(BulkLexer(generate('deep_identifier_chains', heavy_scale))).parse()
+    asts = [heavy if i % 20 == 0 else light for i in range(scripts)]
+    print(f"{scripts} scripts, {scripts // 20} heavy")
+    print(f"{'slice':>10}{'total':>10}{'lag p50':>12}{'lag p99':>12}{'lag max':>12}")
+    for slice_size in (10 ** 9, 4096, 1024, 256):
+        elapsed, lags = asyncio.run(interleave(asts, slice_size))
+        lags.sort()
+        p50, p99 = statistics.median(lags), lags[int(len(lags) * 0.99)]
+        print(f"{slice_size:>10}{elapsed:>9.3f}s{p50 * 1e3:>10.2f}ms{p99 * 1e3:>10.2f}ms{lags[-1] * 1e3:>10.2f}ms")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,64 @@
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from server.client import Client
+
+SCRIPT = "a = {'b': [1, 2, 3]}; c = a.b[0] + a.b[2] * 2; d = 'total: ' + 'c';"
+
+
+def timed_runs(command: list[str], runs: int) -> float:
+    start = time.perf_counter()
+    for _ in range(runs):
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return (time.perf_counter() - start) / runs
+
+
+def wait_for(path: str, daemon: subprocess.Popen, seconds: float = 30):
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline and daemon.poll() is None:
+        try:
+            Client(path).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError("the daemon did not start")
+
+
+def main(runs: int = 20, clients: int = 8, requests: int = 200):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with tempfile.TemporaryDirectory() as directory:
+        script, path = os.path.join(directory, 'script.sb'), os.path.join(directory, 'daemon.sock')
+        with open(script, 'w') as file:
+            file.write(SCRIPT)
+        daemon = subprocess.Popen([sys.executable, '-m', 'server.daemon', '--socket', path, '--quiet'], cwd=root)
+        try:
+            wait_for(path, daemon)
+            cold = timed_runs([sys.executable, os.path.join(root, 'main.py'), script], runs)
+            warm = timed_runs([sys.executable, '-m', 'server.client', '--socket', path, script], runs)
+            print(f"per run: main.py {cold * 1e3:.1f}ms, client + daemon {warm * 1e3:.1f}ms ({cold / warm:.1f}x)")
+
+            def session(_):
+                with Client(path) as client:
+                    for _ in range(requests):
+                        if not client.run(SCRIPT)['ok']:
+                            raise AssertionError("the daemon failed to run the script")
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(clients) as pool:
+                list(pool.map(session, range(clients)))
+            elapsed = time.perf_counter() - start
+            with Client(path) as client:
+                stats = client.stats()
+            print(f"{clients} concurrent clients x {requests} requests: {clients * requests / elapsed:.0f} requests/s, "
+                  f"latency p50 {stats['p50_ms']:.2f}ms, p95 {stats['p95_ms']:.2f}ms, max {stats['max_ms']:.2f}ms")
+        finally:
+            daemon.terminate()
+            daemon.wait()
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,58 @@
+import contextlib
+import copy
+import io
+import sys
+import time
+import tracemalloc
+
+from benchmarks.corpus import generate
+from interpreter.interpreter import Interpreter
+from lexer.bulk_lexer import BulkLexer
+from parser.parser import Parser
+
+
+def base_source(scale: int) -> str:
+    # one table per statement so the base state grows with the scale
+    lines = generate('large_literals', scale).splitlines()
+    return '\n'.join(line.replace(f'table_{i % 16} =', f'table_{i} =', 1) for i, line in enumerate(lines))
+
+
+def variant(i: int) -> list:
+    return Parser(BulkLexer(f"table_{i}.meta.f0 = {i}; table_{i}.values[0] += {i};")).parse()
+
+
+def run_forks(forks: int, fork) -> tuple[float, int]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    interpreters = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(forks):
+            interpreter = fork(variant(i))
+            for statement in interpreter.ast:
+                interpreter.interpret_type(statement)
+            interpreters.append(interpreter)
+    elapsed = time.perf_counter() - start
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return elapsed, allocated
+
+
+def main(forks: int = 100, scale: int = 2000):
+    forks = min(forks, scale)
+    base = Interpreter(Parser(BulkLexer(base_source(scale))).parse())
+    for statement in base.ast:
+        base.interpret_type(statement)
+    tracemalloc.start()
+    duplicate = copy.deepcopy(base.memory)
+    baseline = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del duplicate
+    print(f"base memory: {baseline / 2 ** 20:.2f} MB")
+    for name, fork in (('deepcopy', lambda ast: Interpreter(ast, memory=copy.deepcopy(base.memory))),
+                       ('fork', base.fork)):
+        elapsed, allocated = run_forks(forks, fork)
+        print(f"{name:<10}{forks} variants in {elapsed:.3f}s, {allocated / 2 ** 20:.2f} MB retained")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
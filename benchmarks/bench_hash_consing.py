@@ -0,0 +1,50 @@
+import gc
+import sys
+import time
+import tracemalloc
+
+from lexer.bulk_lexer import BulkLexer
+from parser.parser import Parser
+
+
+def rows_script(rows: int) -> str:
+    # what our generators emit: the same few row shapes and expressions over and over
+    shapes = [
+        "{'type': 'row', 'cols': [1, 2, 3], 'style': {'bold': 0, 'width': 12.5}}",
+        "{'type': 'row', 'cols': ['a', 'b'], 'style': {'bold': 1, 'width': 8}}",
+        "{'type': 'header', 'cols': [], 'style': {'bold': 1, 'width': 12.5}}",
+    ]
+    return '\n'.join(f"row_{i % 64} = {shapes[i % len(shapes)]}; total = total + width * {i % 4} + 1;"
+                     for i in range(rows))
+
+
+def parse(source: str, hash_cons: bool) -> tuple[float, int, Parser, list]:
+    start = time.perf_counter()
+    Parser(BulkLexer(source), hash_cons=hash_cons).parse()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    tracemalloc.start()
+    parser = Parser(BulkLexer(source), hash_cons=hash_cons)
+    ast = parser.parse()
+    parser.lexer = None # keep only the AST and the hash-consing table
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return elapsed, retained, parser, ast
+
+
+def main(rows: int = 10000):
+    source = rows_script(rows)
+    plain_seconds, plain_bytes, _, plain = parse(source, hash_cons=False)
+    shared_seconds, shared_bytes, parser, shared = parse(source, hash_cons=True)
+    if shared != plain:
+        raise AssertionError("hash-consed AST differs from the plain one")
+    print(f"{rows} rows, {len(source)} bytes")
+    print(f"  plain       {plain_seconds:.3f}s parse, {plain_bytes / 2 ** 20:.1f} MB retained")
+    print(f"  hash-consed {shared_seconds:.3f}s parse, {shared_bytes / 2 ** 20:.1f} MB retained "
+          f"({plain_bytes / shared_bytes:.1f}x less)")
+    print(f"  {parser.hash_consing}")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,50 @@
+import random
+import sys
+import time
+
+from benchmarks.corpus import generate
+from lexer.bulk_lexer import BulkLexer
+from parser.incremental import IncrementalParser
+from parser.parser import Parser
+
+
+def keystrokes(text: str, count: int, seed: int = 0) -> list[tuple[int, int, str]]:
+    # types a digit into, or deletes one from, a random statement: edits that keep the script parsable
+    rng = random.Random(seed)
+    edits = []
+    for _ in range(count):
+        offset = rng.choice([i for i in range(rng.randrange(len(text) // 64), len(text), len(text) // 64)
+                             if text[i].isdigit()] or [0])
+        if rng.random() < 0.5 and text[offset + 1:offset + 2].isdigit():
+            edit = (offset, 1, '')
+        else:
+            edit = (offset, 0, str(rng.randrange(10)))
+        edits.append(edit)
+        text = text[:offset] + edit[2] + text[offset + edit[1]:]
+    return edits
+
+
+def main(scale: int = 2000, count: int = 50):
+    text = generate('arithmetic_heavy', scale)
+    edits = keystrokes(text, count)
+    print(f"{text.count(chr(10)) + 1} lines, {count} keystrokes")
+
+    start = time.perf_counter()
+    for offset, deleted, inserted in edits:
+        text = text[:offset] + inserted + text[offset + deleted:]
+        full = Parser(BulkLexer(text)).parse()
+    reparse = (time.perf_counter() - start) / count
+
+    incremental = IncrementalParser(generate('arithmetic_heavy', scale))
+    start = time.perf_counter()
+    for offset, deleted, inserted in edits:
+        incremental.edit(offset, deleted, inserted)
+    edit = (time.perf_counter() - start) / count
+    if incremental.statements != full:
+        raise AssertionError("incremental parse disagrees with a full parse")
+    print(f"  full re-parse {reparse * 1e3:.2f}ms, incremental {edit * 1e3:.2f}ms per keystroke "
+          f"({reparse / edit:.0f}x)")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
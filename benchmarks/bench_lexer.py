@@ -0,0 +1,65 @@
+import random
+import sys
+import time
+
+from lexer.bulk_lexer import BulkLexer
+from lexer.lexer import Lexer
+from lexer.types import TokenType
+
+
+STATEMENT_TEMPLATES = (
+    "{name} = {number} + {name}_{index} * ({number} - {float}) ** 2;",
+    "{name}.prop['{name}'][{index}] = [{number}, '{name}', \"{name}\\n\", {float}];",
+    "{name}_{index} = {{'{name}': {number}, {index}: {{'nested': true}}}};",
+    "{name} += {name}_{index} %= {number}; {name}++; --{name}_{index};",
+    "@ {name}, {name}.prop, '{name}';",
+)
+
+
+def generate_source(statements: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    names = [f'var_{i}' for i in range(64)]
+    return '\n'.join(rng.choice(STATEMENT_TEMPLATES).format(
+        name=rng.choice(names),
+        index=rng.randrange(1000),
+        number=rng.randrange(100000),
+        float=round(rng.random() * 1000, 3),
+    ) for _ in range(statements))
+
+
+def lex_incrementally(text: str):
+    lexer = Lexer(text)
+    tokens = [lexer.get_next_token()]
+    while tokens[-1].type != TokenType.EOF:
+        tokens.append(lexer.get_next_token())
+    return tokens
+
+
+def lex_in_bulk(text: str):
+    return BulkLexer(text).tokenize_all()
+
+
+def best_time(func, text: str, repeat: int):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(text)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(statements: int = 20000, repeat: int = 3):
+    text = generate_source(statements)
+    incremental_time, incremental_tokens = best_time(lex_incrementally, text, repeat)
+    bulk_time, bulk_tokens = best_time(lex_in_bulk, text, repeat)
+    if [(t.type, t.value) for t in incremental_tokens] != [(t.type, t.value) for t in bulk_tokens]:
+        raise AssertionError("BulkLexer token stream differs from Lexer")
+    count = len(bulk_tokens)
+    print(f"source: {len(text)} chars, {count} tokens")
+    print(f"Lexer.get_next_token: {incremental_time:.3f}s ({count / incremental_time:,.0f} tokens/s)")
+    print(f"BulkLexer.tokenize_all: {bulk_time:.3f}s ({count / bulk_time:,.0f} tokens/s)")
+    print(f"speedup: {incremental_time / bulk_time:.2f}x")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
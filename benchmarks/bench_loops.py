@@ -0,0 +1,49 @@
+import io
+import sys
+import time
+from contextlib import redirect_stdout
+
+from interpreter.interpreter import Interpreter
+from lexer.bulk_lexer import BulkLexer
+from parser.parser import Parser
+from vm.vm import VM
+
+BODY = "total = total + i * 2 % 7; row = [i, total]; i = i + 1;"
+
+
+def unrolled_script(iterations: int) -> str:
+    # what our script generator emits today
+    return "i = 0; total = 0;\n" + '\n'.join(BODY for _ in range(iterations))
+
+
+def loop_script(iterations: int) -> str:
+    # the break is never taken, but it makes the loop check every statement for it
+    return f"i = 0; total = 0;\nwhile i < {iterations} {{ if i < 0 {{ break }} {BODY} }}"
+
+
+def run(engine, source: str, **options) -> tuple[float, float, dict]:
+    start = time.perf_counter()
+    ast = Parser(BulkLexer(source)).parse()
+    parsed = time.perf_counter()
+    interpreter = engine(ast, **options)
+    with redirect_stdout(io.StringIO()):
+        interpreter.interpret()
+    return parsed - start, time.perf_counter() - parsed, interpreter.memory
+
+
+def main(iterations: int = 50000):
+    unrolled, loop = unrolled_script(iterations), loop_script(iterations)
+    print(f"{iterations} iterations: unrolled script {len(unrolled)} bytes, loop script {len(loop)} bytes")
+    for name, engine, options in (('tree', Interpreter, {}), ('tree --quicken', Interpreter, {'quicken': True}),
+                                  ('vm', VM, {})):
+        unrolled_parse, unrolled_run, unrolled_memory = run(engine, unrolled, **options)
+        loop_parse, loop_run, loop_memory = run(engine, loop, **options)
+        if loop_memory != unrolled_memory:
+            raise AssertionError(f"{name}: the loop and the unrolled script disagree")
+        unrolled_total, loop_total = unrolled_parse + unrolled_run, loop_parse + loop_run
+        print(f"  {name:<15} unrolled {unrolled_total:.3f}s (parse {unrolled_parse:.3f}s), "
+              f"loop {loop_total:.3f}s (parse {loop_parse * 1e3:.2f}ms), {unrolled_total / loop_total:.1f}x")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,43 @@
+import io
+import sys
+import time
+from contextlib import redirect_stdout
+
+from interpreter.interpreter import Interpreter
+from natives.natives import memo_stats, set_memo_size
+from lexer.bulk_lexer import BulkLexer
+from parser.parser import Parser
+from vm.vm import VM
+
+
+def calls_script(statements: int) -> str:
+    # the same handful of expensive pure calls on values that are not literals, so the optimizer cannot fold them
+    return '\n'.join(f"n = {i % 8} + 2000; key = 'k' + str(n); digits = len(str(pow(3, n))) + len(upper(key));"
+                     for i in range(statements))
+
+
+def run(engine, ast: list) -> float:
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        engine(ast).interpret()
+    return time.perf_counter() - start
+
+
+def main(statements: int = 20000, memo_size: int = 256):
+    ast = Parser(BulkLexer(calls_script(statements))).parse()
+    print(f"{statements} statements, 5 native calls each")
+    for name, engine in (('tree', Interpreter), ('vm', VM)):
+        set_memo_size(0)
+        plain = run(engine, ast)
+        set_memo_size(memo_size)
+        memoized = run(engine, ast)
+        stats = memo_stats()
+        hits = sum(native['hits'] for native in stats.values())
+        misses = sum(native['misses'] for native in stats.values())
+        print(f"  {name:<4} plain {plain:.3f}s, memoized {memoized:.3f}s ({plain / memoized:.1f}x), "
+              f"{hits} hits / {misses} misses")
+    set_memo_size(0)
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
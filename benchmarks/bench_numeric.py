@@ -0,0 +1,44 @@
+import random
+import sys
+import time
+
+from interpreter.interpreter import Interpreter
+from lexer.bulk_lexer import BulkLexer
+from parser.parser import Parser
+
+EXPRESSION = '(v * 2.5 + v / 3 - w) ** 2 % 7'
+
+
+def python_baseline(v: list, w: list) -> list:
+    # what a script has to compute without element-wise arithmetic
+    return [(x * 2.5 + x / 3 - y) ** 2 % 7 for x, y in zip(v, w)]
+
+
+def main(length: int = 200000, repeat: int = 20):
+    rng = random.Random(0)
+    v = [rng.uniform(1, 100) for _ in range(length)]
+    w = [rng.uniform(1, 100) for _ in range(length)]
+    setup = Parser(BulkLexer(f"v = {v!r}; w = {w!r};")).parse()
+    interpreter = Interpreter(setup, numeric_arrays=True)
+    start = time.perf_counter()
+    for statement in setup:
+        interpreter.interpret_type(statement)
+    print(f"build two {length}-element arrays: {time.perf_counter() - start:.3f}s")
+
+    expression = Parser(BulkLexer(EXPRESSION)).parse()[0]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = interpreter.interpret_type(expression)
+    vectorized = (time.perf_counter() - start) / repeat
+    start = time.perf_counter()
+    for _ in range(repeat):
+        expected = python_baseline(v, w)
+    baseline = (time.perf_counter() - start) / repeat
+    if max(abs(a - b) for a, b in zip(result, expected)) > 1e-9:
+        raise AssertionError("element-wise result disagrees with the Python baseline")
+    print(f"{EXPRESSION}: element-wise {vectorized * 1e3:.2f}ms, per-element Python {baseline * 1e3:.2f}ms "
+          f"({baseline / vectorized:.0f}x)")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
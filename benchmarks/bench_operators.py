@@ -0,0 +1,64 @@
+import contextlib
+import io
+import sys
+import time
+
+from interpreter.interpreter import Interpreter
+from interpreter.operators import binary_operation
+from lexer.bulk_lexer import BulkLexer
+from lexer.types import ARITHMETIC_TYPE_TO_CHAR, TokenType
+from parser.parser import Parser
+from vm.vm import VM
+
+
+def eval_binary_operation(operator_type: TokenType, left, right):
+    # the pre-operator-table implementation, kept as the baseline
+    left = f'\'{left}\'' if isinstance(left, str) else left
+    right = f'\'{right}\'' if isinstance(right, str) else right
+    return eval(f'{left} {ARITHMETIC_TYPE_TO_CHAR[operator_type]} {right}')
+
+
+OPERAND_CASES = {
+    'int + int': (TokenType.PLUS, 12345, 678),
+    'int * int': (TokenType.MULTIPLY, 12345, 678),
+    'int % int': (TokenType.MODULUS, 12345, 678),
+    'float / float': (TokenType.DIVIDE, 1234.5, 6.78),
+    'float ** int': (TokenType.EXPONENT, 1.0001, 3),
+    'str + str': (TokenType.PLUS, 'hello', 'world'),
+}
+
+
+def per_operation(func, operator_type, left, right, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func(operator_type, left, right)
+    return (time.perf_counter() - start) / iterations
+
+
+def arithmetic_script(statements: int) -> str:
+    return 'x = 1; y = 2.5;' + ';'.join(f'x = (x * 3 + {i}) % 1000 - y / 2 ** 2' for i in range(statements))
+
+
+def run_script(engine, ast) -> float:
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine(ast).interpret()
+    return time.perf_counter() - start
+
+
+def main(iterations: int = 20000, statements: int = 5000):
+    print(f"{'operands':<16}{'eval':>12}{'table':>12}{'speedup':>10}")
+    for name, (operator_type, left, right) in OPERAND_CASES.items():
+        if eval_binary_operation(operator_type, left, right) != binary_operation(operator_type, left, right):
+            raise AssertionError(f"operator table disagrees with eval for {name}")
+        legacy = per_operation(eval_binary_operation, operator_type, left, right, iterations)
+        table = per_operation(binary_operation, operator_type, left, right, iterations)
+        print(f"{name:<16}{legacy * 1e9:>10.0f}ns{table * 1e9:>10.0f}ns{legacy / table:>9.0f}x")
+
+    ast = Parser(BulkLexer(arithmetic_script(statements))).parse()
+    for engine in (Interpreter, VM):
+        print(f"{engine.__name__} arithmetic script ({statements} statements): {run_script(engine, ast):.3f}s")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
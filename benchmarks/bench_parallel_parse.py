@@ -0,0 +1,40 @@
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.corpus import generate
+from lexer.bulk_lexer import BulkLexer
+from parser.parallel import CHUNKS_PER_WORKER, parse_parallel, split_points
+from parser.parser import Parser
+
+
+def main(scale: int = 20000, max_workers: int = 0):
+    source = generate('large_literals', scale) # what our data-load scripts look like
+    start = time.perf_counter()
+    sequential = Parser(BulkLexer(source)).parse()
+    sequential_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    split_points(source, CHUNKS_PER_WORKER * (os.cpu_count() or 1))
+    split_seconds = time.perf_counter() - start
+    print(f"{len(source) / 2 ** 20:.1f} MB, {len(sequential)} statements, {os.cpu_count()} CPUs, "
+          f"finding split points {split_seconds:.3f}s")
+    print(f"  sequential  {sequential_seconds:.3f}s")
+    max_workers = max_workers or os.cpu_count() or 1
+    workers = 2
+    while True:
+        with ProcessPoolExecutor(workers) as pool:
+            parse_parallel('a = 1;' * 20000, workers, executor=pool) # start the workers before timing
+            start = time.perf_counter()
+            parallel = parse_parallel(source, workers, executor=pool)
+            elapsed = time.perf_counter() - start
+        if parallel != sequential:
+            raise AssertionError(f"parallel parse with {workers} workers differs from the sequential one")
+        print(f"  {workers:>2} workers  {elapsed:.3f}s ({sequential_seconds / elapsed:.1f}x)")
+        if workers >= max_workers:
+            break
+        workers = min(workers * 2, max_workers)
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
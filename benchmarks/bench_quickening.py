@@ -0,0 +1,35 @@
+import sys
+import time
+
+from benchmarks.corpus import CORPUS, generate
+from interpreter.interpreter import Interpreter
+from lexer.bulk_lexer import BulkLexer
+from parser.parser import Parser
+
+
+def looped(source: str, passes: int) -> str:
+    # the script runs `passes` times over the same nodes, so they have time to settle into their variants
+    return f"bench_pass = 0; while bench_pass < {passes} {{ {source} bench_pass += 1; }}"
+
+
+def run(source: str, passes: int, quicken: bool) -> tuple[float, Interpreter]:
+    interpreter = Interpreter(Parser(BulkLexer(looped(source, passes))).parse(), quicken=quicken)
+    start = time.perf_counter()
+    for statement in interpreter.ast:
+        interpreter.interpret_type(statement)
+    return time.perf_counter() - start, interpreter
+
+
+def main(scale: int = 500, passes: int = 20):
+    for name in CORPUS:
+        source = generate(name, scale)
+        generic, plain = run(source, passes, quicken=False)
+        quickened, quick = run(source, passes, quicken=True)
+        if quick.memory != plain.memory:
+            raise AssertionError(f"{name}: quickened run disagrees with the generic one")
+        print(f"{name}: generic {generic:.3f}s, quickened {quickened:.3f}s ({generic / quickened:.2f}x)")
+        print('  ' + quick.quickening.report().replace('\n', '\n  '))
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,50 @@
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.corpus import generate
+from interpreter.interpreter import Interpreter
+from interpreter.snapshot import restore_snapshot, write_snapshot
+from lexer.bulk_lexer import BulkLexer
+from parser.parser import Parser
+
+
+def build_state(scale: int) -> dict:
+    # one table per statement so the state grows with the scale instead of being overwritten
+    source = generate('large_literals', scale).replace('table_', 'row_')
+    lines = [line.replace(f'row_{i % 16} =', f'row_{i} =', 1) for i, line in enumerate(source.splitlines())]
+    interpreter = Interpreter(Parser(BulkLexer('\n'.join(lines))).parse())
+    for statement in interpreter.ast:
+        interpreter.interpret_type(statement)
+    return interpreter.memory
+
+
+def lookup(memory: dict, scale: int):
+    interpreter = Interpreter(Parser(BulkLexer(f"row_{scale // 2}.meta.f0")).parse(), memory=memory)
+    return interpreter.interpret_type(interpreter.ast[0])
+
+
+def main(scale: int = 5000):
+    start = time.perf_counter()
+    memory = build_state(scale)
+    build_seconds = time.perf_counter() - start
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'state.snapshot')
+        start = time.perf_counter()
+        write_snapshot(memory, path)
+        write_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        restored = restore_snapshot(path)
+        value = lookup(restored, scale)
+        restore_seconds = time.perf_counter() - start
+        if value != lookup(memory, scale):
+            raise AssertionError("restored state disagrees with the original")
+        print(f"state: {scale} rows, snapshot {os.path.getsize(path) / 2 ** 20:.1f} MB")
+        print(f"build by running the script: {build_seconds:.3f}s")
+        print(f"write snapshot:               {write_seconds:.3f}s")
+        print(f"restore + one lookup:         {restore_seconds * 1e3:.2f}ms")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
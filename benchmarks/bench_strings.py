@@ -0,0 +1,44 @@
+import operator
+import sys
+import time
+
+from interpreter.interpreter import Interpreter
+from interpreter.operators import OPERATOR_TABLE, register_operator
+from lexer.bulk_lexer import BulkLexer
+from lexer.types import TokenType
+from parser.parser import Parser
+from vm.vm import VM
+
+
+def append_script(appends: int) -> str:
+    return "s = '';" + ''.join(f" s += 'chunk {i};';" for i in range(appends)) + ' n = s[0];'
+
+
+def run(engine, ast: list) -> float:
+    interpreter = engine(ast)
+    start = time.perf_counter()
+    if engine is VM:
+        for statement in ast:
+            interpreter.run(statement)
+    else:
+        for statement in ast:
+            interpreter.interpret_type(statement)
+    return time.perf_counter() - start
+
+
+def main(appends: int = 100000):
+    ast = Parser(BulkLexer(append_script(appends))).parse()
+    print(f"{appends} appends")
+    concatenate = OPERATOR_TABLE[(TokenType.PLUS, str, str)]
+    for engine in (Interpreter, VM):
+        ropes = run(engine, ast)
+        register_operator(TokenType.PLUS, str, str, operator.add) # the plain copying concatenation
+        try:
+            copies = run(engine, ast)
+        finally:
+            register_operator(TokenType.PLUS, str, str, concatenate)
+        print(f"  {engine.__name__:<12} ropes {ropes:.3f}s, copying str {copies:.3f}s ({copies / ropes:.1f}x)")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,59 @@
+import io
+import sys
+import time
+from contextlib import redirect_stdout
+
+from analysis.inference import TypeInference
+from analysis.specialization import specialize
+from interpreter.interpreter import Interpreter
+from lexer.bulk_lexer import BulkLexer
+from parser.parser import Parser
+from vm.vm import VM
+
+
+def typed_script(iterations: int) -> str:
+    # numeric kernels over arrays and an object of accumulators, the shape of our scoring scripts
+    weights = ', '.join(str(i % 13 + 1) for i in range(64))
+    samples = ', '.join(f"{i % 17 * 0.25}" for i in range(64))
+    return f"""
+weights = [{weights}]; samples = [{samples}];
+stats = {{'total': 0, 'scaled': 0.0, 'peak': 0}};
+i = 0; j = 0;
+while i < {iterations} {{
+    w = weights[j]; s = samples[j];
+    stats.total = stats.total + w * 3 - i % 7;
+    stats.scaled = stats.scaled + s * w / 4;
+    if w > stats.peak {{ stats.peak = w; }}
+    weights[j] = (w * 7 + 3) % 13 + 1;
+    j = (j + 1) % 64; i = i + 1;
+}}"""
+
+
+def run(engine, source: str, typed: bool, **options) -> tuple[float, float, dict, int]:
+    ast = Parser(BulkLexer(source)).parse()
+    start = time.perf_counter()
+    inference = TypeInference()
+    if typed:
+        specialize(ast, inference.infer(ast))
+    inferred = time.perf_counter()
+    interpreter = engine(ast, **options)
+    with redirect_stdout(io.StringIO()):
+        interpreter.interpret()
+    return inferred - start, time.perf_counter() - inferred, interpreter.memory, inference.specialized.total()
+
+
+def main(iterations: int = 50000):
+    source = typed_script(iterations)
+    print(f"{iterations} iterations")
+    for name, engine, options in (('tree', Interpreter, {}), ('tree --quicken', Interpreter, {'quicken': True}),
+                                  ('vm', VM, {})):
+        _, generic, generic_memory, _ = run(engine, source, False, **options)
+        inference, typed, typed_memory, specialized = run(engine, source, True, **options)
+        if typed_memory != generic_memory:
+            raise AssertionError(f"{name}: the typed run disagrees with the generic one")
+        print(f"  {name:<15} generic {generic:.3f}s, typed {typed:.3f}s ({generic / typed:.2f}x), "
+              f"inference {inference * 1e3:.2f}ms, {specialized} nodes specialized")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,40 @@
+import argparse
+import json
+import sys
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    regressions = []
+    for name, program in current['results'].items():
+        if name not in baseline['results']:
+            continue
+        print(name)
+        for stage, result in program['stages'].items():
+            before = baseline['results'][name]['stages'].get(stage)
+            if before is None:
+                continue
+            time_ratio = result['seconds'] / before['seconds'] if before['seconds'] else float('inf')
+            memory_ratio = result['peak_bytes'] / before['peak_bytes'] if before['peak_bytes'] else float('inf')
+            flags = []
+            if time_ratio > 1 + threshold:
+                flags.append('SLOWER')
+            if memory_ratio > 1 + threshold:
+                flags.append('MORE MEMORY')
+            if flags:
+                regressions.append(f'{name}/{stage}: {", ".join(flags)}')
+            print(f"  {stage:<10} time x{time_ratio:.2f}  peak memory x{memory_ratio:.2f}  {' '.join(flags)}")
+    return regressions
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('baseline')
+    arg_parser.add_argument('current')
+    arg_parser.add_argument('--threshold', type=float, default=0.1, help='relative slowdown that counts as a regression')
+    args = arg_parser.parse_args()
+
+    with open(args.baseline) as baseline_file, open(args.current) as current_file:
+        found = compare(json.load(baseline_file), json.load(current_file), args.threshold)
+    for regression in found:
+        print(f'regression: {regression}')
+    sys.exit(1 if found else 0)
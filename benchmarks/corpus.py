@@ -0,0 +1,60 @@
+import random
+
+
+def deep_identifier_chains(scale: int, depth: int = 8, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    keys = [f'k{level}' for level in range(depth)]
+    nested = '0'
+    for key in reversed(keys):
+        nested = f"{{'{key}': {nested}, 'items': [1, 2, 3]}}"
+    lines = [f'root = {nested};', 'total = 0;']
+    for i in range(scale):
+        level = rng.randrange(1, depth)
+        path = '.'.join(keys[:level])
+        lines.append(f"total = total + root.{path}.items[{i % 3}];")
+        lines.append(f"root.{'.'.join(keys)} = {i};")
+    return '\n'.join(lines)
+
+
+def large_literals(scale: int, width: int = 32, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    lines = []
+    for i in range(scale):
+        values = ', '.join(str(rng.randrange(10 ** 6)) for _ in range(width))
+        fields = ', '.join(f"'f{j}': {rng.choice(('1', '2.5', repr('text'), '[1, 2]'))}" for j in range(width // 4))
+        lines.append(f"table_{i % 16} = {{'id': {i}, 'values': [{values}], 'meta': {{{fields}}}}};")
+    return '\n'.join(lines)
+
+
+def assignment_chains(scale: int, length: int = 16) -> str:
+    lines = ['seed = 1;']
+    for i in range(scale):
+        targets = ' = '.join(f'v{j}' for j in range(length))
+        lines.append(f'{targets} = seed + {i};')
+        lines.append(f'v{i % length} += v{(i + 1) % length};')
+    return '\n'.join(lines)
+
+
+def arithmetic_heavy(scale: int, terms: int = 12, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    operators = ('+', '-', '*', '/', '%')
+    lines = ['x = 3; y = 2.5; z = 7;']
+    for _ in range(scale):
+        expression = 'x'
+        for _ in range(terms):
+            operand = rng.choice(('x', 'y', 'z', str(rng.randrange(1, 100)), f'{rng.random() + 1:.3f}'))
+            expression = f'({expression} {rng.choice(operators)} {operand})'
+        lines.append(f'z = {expression} % 1000 + 1;')
+    return '\n'.join(lines)
+
+
+CORPUS = {
+    'deep_identifier_chains': deep_identifier_chains,
+    'large_literals': large_literals,
+    'assignment_chains': assignment_chains,
+    'arithmetic_heavy': arithmetic_heavy,
+}
+
+
+def generate(name: str, scale: int) -> str:
+    return CORPUS[name](scale)
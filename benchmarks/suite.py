@@ -0,0 +1,131 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import time
+import tracemalloc
+
+from benchmarks.corpus import CORPUS, generate
+from interpreter.interpreter import Interpreter
+from lexer.bulk_lexer import BulkLexer
+from lexer.lexer import Lexer
+from lexer.types import TokenType
+from optimizer.optimizer import count_nodes
+from parser.parser import Parser
+from version import __version__
+from vm.compiler import Program
+from vm.vm import VM
+
+
+def lex(source: str):
+    lexer = Lexer(source)
+    tokens = [lexer.get_next_token()]
+    while tokens[-1].type != TokenType.EOF:
+        tokens.append(lexer.get_next_token())
+    return tokens
+
+
+def bulk_lex(source: str):
+    return BulkLexer(source).tokenize_all()
+
+
+def parse(tokens: list):
+    lexer = BulkLexer('')
+    lexer.tokens = tokens
+    return Parser(lexer).parse()
+
+
+def execute(engine, ast: list):
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        interpreter = engine(ast)
+        interpreter.interpret()
+    return interpreter
+
+
+def compile_program(ast: list) -> Program:
+    return Program(ast).compile()
+
+
+def measure(func, arg, repeat: int) -> tuple[float, int, object]:
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(arg)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    func(arg)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak, result
+
+
+def stage_result(seconds: float, peak: int, **counts) -> dict:
+    result = {'seconds': seconds, 'peak_bytes': peak}
+    for name, count in counts.items():
+        result[name] = count
+        result[f'{name}_per_second'] = count / seconds if seconds else 0.0
+    return result
+
+
+def benchmark_program(source: str, repeat: int) -> dict:
+    lex_seconds, lex_peak, tokens = measure(lex, source, repeat)
+    bulk_seconds, bulk_peak, tokens = measure(bulk_lex, source, repeat)
+    parse_seconds, parse_peak, ast = measure(parse, tokens, repeat)
+    nodes = sum(count_nodes(statement) for statement in ast)
+    results = {
+        'lex': stage_result(lex_seconds, lex_peak, tokens=len(tokens)),
+        'bulk_lex': stage_result(bulk_seconds, bulk_peak, tokens=len(tokens)),
+        'parse': stage_result(parse_seconds, parse_peak, nodes=nodes),
+    }
+    interpret_seconds, interpret_peak, _ = measure(lambda x: execute(Interpreter, x), ast, repeat)
+    results['interpret'] = stage_result(interpret_seconds, interpret_peak, nodes=nodes)
+    # the VM stage runs the program compiled once, the way repeated runs of a script reuse its Code
+    compile_seconds, compile_peak, program = measure(compile_program, ast, repeat)
+    results['compile'] = stage_result(compile_seconds, compile_peak, nodes=nodes)
+    vm_seconds, vm_peak, _ = measure(lambda x: execute(VM, x), program, repeat)
+    results['vm'] = stage_result(vm_seconds, vm_peak, nodes=nodes)
+    results['vm']['speedup_over_interpret'] = interpret_seconds / vm_seconds if vm_seconds else 0.0
+    return results
+
+
+def run_suite(scale: int, repeat: int, programs: list[str]) -> dict:
+    report = {
+        'meta': {
+            'version': __version__,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.time(),
+            'scale': scale,
+            'repeat': repeat,
+        },
+        'results': {},
+    }
+    for name in programs:
+        source = generate(name, scale)
+        report['results'][name] = {'source_bytes': len(source), 'stages': benchmark_program(source, repeat)}
+    return report
+
+
+def print_report(report: dict):
+    for name, program in report['results'].items():
+        print(f"{name} ({program['source_bytes']} bytes)")
+        for stage, result in program['stages'].items():
+            rate = next((f'{result[k]:>14,.0f} {k.removesuffix("_per_second")}/s' for k in result if k.endswith('_per_second')), '')
+            print(f"  {stage:<10}{result['seconds']:>9.4f}s{rate}{result['peak_bytes'] / 2 ** 20:>10.1f} MB peak")
+        print(f"  vm runs {program['stages']['vm']['speedup_over_interpret']:.2f}x the speed of interpret")
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('--scale', type=int, default=2000)
+    arg_parser.add_argument('--repeat', type=int, default=3)
+    arg_parser.add_argument('--program', action='append', choices=CORPUS, help='defaults to the whole corpus')
+    arg_parser.add_argument('--output', help='write the results as JSON to this path')
+    args = arg_parser.parse_args()
+
+    suite_report = run_suite(args.scale, args.repeat, args.program or list(CORPUS))
+    print_report(suite_report)
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(suite_report, output, indent=2)
@@ -0,0 +1,7 @@
+from interpreter.interpreter import Interpreter
+from vm.vm import VM
+
+ENGINES = {
+    'tree': Interpreter,
+    'vm': VM,
+}
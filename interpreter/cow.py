@@ -0,0 +1,111 @@
+import operator
+import weakref
+from collections import ChainMap
+
+from interpreter.operators import register_equality, register_operator
+from lexer.types import TokenType
+
+
+class OwnedList(list):
+    # a list built or copied by a copy-on-write memory; `owner` is the generation of the memory that may mutate it
+    # in place, so ownership lives on the container instead of in a table that would keep it alive
+    __slots__ = ('owner', '__weakref__')
+    script_type_name = 'list'
+
+    def copy(self):
+        return OwnedList(self)
+
+
+class OwnedDict(dict):
+    __slots__ = ('owner', '__weakref__')
+    script_type_name = 'dict'
+
+    def copy(self):
+        return OwnedDict(self)
+
+
+# a chain of shared translation maps longer than this is flattened into one map at the next fork
+MAX_SHARED_MAPS = 8
+
+
+def original(translation: tuple):
+    # the container a translation was made for; None once an owned original is gone and its id may be reused
+    reference = translation[0]
+    return reference() if type(reference) is weakref.ref else reference
+
+
+class CopyOnWrite:
+    # Copy-on-write view of a memory tree shared between forked interpreters. Containers that existed at fork time
+    # are frozen for every fork: the first write through one copies it, and the translation id(original) -> copy
+    # makes every other path (alias) to the original see the copy too. Translations of earlier generations are
+    # shared read-only through the ChainMap, so a fork costs two new empty maps. Only the first map of a memory is
+    # written to: one still empty at the next fork is dropped instead of shared, and a chain longer than
+    # MAX_SHARED_MAPS is flattened, so a lookup scans a bounded number of maps however often memories fork.
+    def __init__(self, translations: ChainMap | None = None):
+        self.translations = translations if translations is not None else ChainMap()
+        self.generation = object() # containers tagged with it are only reachable from this memory
+
+    def fork(self) -> 'CopyOnWrite':
+        shared = self.translations
+        if not shared.maps[0] and len(shared.maps) > 1:
+            shared = shared.parents # nothing was written since the last fork
+        if len(shared.maps) > MAX_SHARED_MAPS:
+            # earlier maps win, as in a lookup; translations whose original is gone are dropped
+            shared = ChainMap({key: translation for key, translation in shared.items()
+                               if original(translation) is not None})
+        self.translations = shared.new_child()
+        self.generation = object() # whatever this memory owned is now shared with the fork
+        return CopyOnWrite(shared.new_child())
+
+    def current(self, value):
+        translations = self.translations
+        while (translation := translations.get(id(value))) is not None and original(translation) is value:
+            value = translation[1]
+        return value
+
+    def own(self, container: dict | list) -> dict | list:
+        if not hasattr(type(container), 'owner'):
+            container = (OwnedDict if isinstance(container, dict) else OwnedList)(container)
+        container.owner = self.generation
+        return container
+
+    def writable(self, container: dict | list) -> dict | list:
+        container = self.current(container)
+        if getattr(container, 'owner', None) is self.generation:
+            return container
+        copy = self.own(container.copy())
+        translations, key = self.translations.maps[0], id(container)
+        if type(container) in (OwnedList, OwnedDict):
+            # dropped with the original, after which no path can lead to it and its id may be reused; a flattened
+            # map keeps it, and the weak reference tells it apart from a new container with the same id
+            translations[key] = (weakref.ref(container), copy)
+            weakref.finalize(container, translations.pop, key, None)
+        else:
+            translations[key] = (container, copy) # the original is kept alive so its id stays unique
+        return copy
+
+    def materialize(self, value, copies: dict | None = None):
+        # a plain tree of what this memory sees, for printing; aliases and cycles are preserved
+        value = self.current(value)
+        if not isinstance(value, (dict, list)):
+            return value
+        copies = copies if copies is not None else {}
+        if id(value) in copies:
+            return copies[id(value)]
+        if isinstance(value, dict):
+            result = copies[id(value)] = {}
+            for key, item in value.items():
+                result[key] = self.materialize(item, copies)
+        else:
+            result = copies[id(value)] = []
+            result.extend(self.materialize(item, copies) for item in value)
+        return result
+
+
+# owned containers combine with plain ones exactly like lists and dicts do
+for _left_type, _right_type in ((OwnedList, list), (list, OwnedList), (OwnedList, OwnedList)):
+    register_operator(TokenType.PLUS, _left_type, _right_type, operator.add)
+register_operator(TokenType.MULTIPLY, OwnedList, int, operator.mul)
+register_operator(TokenType.MULTIPLY, int, OwnedList, operator.mul)
+register_equality(OwnedList)
+register_equality(OwnedDict)
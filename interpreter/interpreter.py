@@ -1,7 +1,16 @@
 from typing import Any
 
-from lexer.types import ARITHMETIC_TYPE_TO_CHAR
-from parser.types import Identifier, BinaryOperation, Primitive, Assign, Object, Array, String
+from analysis.specialization import TypedBinaryOperation, TypedGlobalIdentifier, TypedPathIdentifier, \
+    TypedGlobalAssign, TypedPathAssign
+from interpreter.cow import CopyOnWrite
+from interpreter.numeric import numeric_array, numpy
+from interpreter.operators import OPERATOR_TABLE, binary_operation, type_name, unsupported_operands
+from interpreter.profiler import Profiler
+from interpreter.quickening import Quickening, QuickBinaryOperation, GenericBinaryOperation, GlobalIdentifier, \
+    ConstantPathIdentifier, GenericIdentifier, GlobalAssign, ConstantPathAssign, GenericAssign, \
+    binary_operation_variant, is_constant
+from parser.types import Identifier, BinaryOperation, Primitive, Assign, Object, Array, Number, String, Symbol, \
+    NativeCall, If, While, Break, Continue
 
 
 def validate_indexable(value: dict | list, index: Any):
@@ -10,7 +19,7 @@ def validate_indexable(value: dict | list, index: Any):
             raise KeyError(f"Identifier '{index}' not found in memory")
     elif isinstance(value, list):
         if not isinstance(index, int):
-            raise TypeError(f"List index must be an integer, got {type(index).__name__}")
+            raise TypeError(f"List index must be an integer, got {type_name(index)}")
 
 
 def safe_get(value: dict | list, index: Any, default=None):
@@ -19,32 +28,81 @@ def safe_get(value: dict | list, index: Any, default=None):
     return value[index] if 0 <= index < len(value) else default
 
 
+# what a block hands back to the loop running it when it stops early; statements return plain values, which are
+# never these objects, so a loop tells them apart with an identity check instead of catching an exception
+BREAK = object()
+CONTINUE = object()
+
+
+def prints_result(statement, result) -> bool:
+    # every statement's result is printed, except the None of a call like print() that has no result to show
+    return result is not None or type(statement) is not NativeCall
+
+
+def can_jump(statement) -> bool:
+    # whether running the statement can hand BREAK or CONTINUE to the loop around it
+    if type(statement) in (Break, Continue):
+        return True
+    if type(statement) is If:
+        return any(map(can_jump, statement.body)) or any(map(can_jump, statement.orelse))
+    return False
+
+
 class Interpreter:
-    def __init__(self, ast):
+    def __init__(self, ast, profiler: Profiler | None = None, memory: dict | None = None, numeric_arrays: bool = False,
+                 quicken: bool = False):
         self.ast = ast
-        self.memory = {}
+        self.memory = memory if memory is not None else {}
+        self.cow: CopyOnWrite | None = None
+        self.quickening: Quickening | None = None
+        self.numeric_arrays = numeric_arrays
+        self.profiler = profiler
+        if profiler is not None:
+            # shadow the method on this instance only, an unprofiled interpreter keeps the plain dispatch
+            self.interpret_type = profiler.wrap(self.interpret_type)
         self.type_interpretation_handlers = {
             Identifier: self.identity_value,
             BinaryOperation: self.execute_binary_operation,
             Assign: self.execute_assign,
             Object: lambda x: {prop.key.value: self.interpret_type(prop.value) for prop in x.properties},
             Array: lambda x: [self.interpret_type(i) for i in x.elements],
+            Symbol: lambda x: x.value,
+            NativeCall: lambda x: x.native(*[self.interpret_type(arg) for arg in x.args]),
+            If: self.execute_if,
+            While: self.execute_while,
+            Break: lambda x: BREAK,
+            Continue: lambda x: CONTINUE,
+            TypedBinaryOperation: self.typed_binary_operation,
+            TypedGlobalIdentifier: lambda x: self.memory[x.address[0].value],
+            TypedPathIdentifier: self.typed_identity_value,
+            TypedGlobalAssign: self.quick_global_assign,
+            TypedPathAssign: self.typed_store,
             **{t: lambda x: x.value for t in Primitive.__subclasses__()}
         }
+        if numeric_arrays:
+            if numpy is None:
+                raise RuntimeError("Numeric arrays require numpy to be installed")
+            self.type_interpretation_handlers[Array] = lambda x: numeric_array([self.interpret_type(i) for i in x.elements])
+        if quicken:
+            self.specialize_nodes(Quickening())
 
     def identity_value(self, identifier: Identifier):
-        current_value = self.memory
-        for part in identifier.address:
-            prim_part = self.interpret_type(part)
+        address, current_value = identifier.address, self.memory
+        if type(address[0]) is NativeCall: # a path into the result of a call
+            address, current_value = address[1:], self.interpret_type(address[0])
+        for part in address:
+            prim_part = part.value if type(part) is Symbol else self.interpret_type(part)
             validate_indexable(current_value, prim_part) # raises KeyError or TypeError if invalid indexing
             current_value = current_value[prim_part]
         return current_value
 
     def execute_assign(self, assign: Assign):
-        literal_value = self.interpret_type(assign.value)
+        return self.store(assign, self.interpret_type(assign.value))
+
+    def store(self, assign: Assign, literal_value):
         memory_cursor: list | dict = self.memory
         for part in assign.identifier.address[:-1]:
-            prim_part = self.interpret_type(part)
+            prim_part = part.value if type(part) is Symbol else self.interpret_type(part)
             validate_indexable(memory_cursor, prim_part)
             memory_cursor = memory_cursor[prim_part]
         address_to_modify = self.interpret_type(assign.identifier.address[-1])
@@ -52,20 +110,262 @@ class Interpreter:
         memory_cursor[address_to_modify] = literal_value
         return literal_value if assign.return_mode == 'after' else old_value
 
+    def fork(self, ast) -> 'Interpreter':
+        # O(1): the fork starts from this interpreter's memory as it is now, and each side copies only the
+        # containers it writes to from then on
+        if self.cow is None:
+            self.copy_on_write(CopyOnWrite())
+        fork = Interpreter(ast, memory=self.memory, numeric_arrays=self.numeric_arrays,
+                           quicken=self.quickening is not None)
+        fork.copy_on_write(self.cow.fork())
+        return fork
+
+    def copy_on_write(self, cow: CopyOnWrite):
+        self.cow = cow
+        handlers = self.type_interpretation_handlers
+        build_object, build_array = handlers[Object], handlers[Array]
+        handlers.update({
+            Object: lambda x: cow.own(build_object(x)),
+            Array: lambda x: cow.own(build_array(x)),
+            # natives index containers directly, so they get a plain tree of what this memory sees
+            NativeCall: lambda x: x.native(*[cow.materialize(self.interpret_type(arg)) for arg in x.args]),
+        })
+        for node_type in list(handlers): # quickened variants included, every memory access has to go through cow
+            if issubclass(node_type, Identifier):
+                handlers[node_type] = self.cow_identity_value
+            elif issubclass(node_type, Assign):
+                handlers[node_type] = self.cow_execute_assign
+
+    def cow_identity_value(self, identifier: Identifier):
+        current = self.cow.current
+        address, current_value = identifier.address, current(self.memory)
+        if type(address[0]) is NativeCall:
+            address, current_value = address[1:], self.interpret_type(address[0])
+        for part in address:
+            prim_part = part.value if type(part) is Symbol else self.interpret_type(part)
+            validate_indexable(current_value, prim_part)
+            current_value = current(current_value[prim_part])
+        return current_value
+
+    def cow_execute_assign(self, assign: Assign):
+        literal_value = self.interpret_type(assign.value)
+        writable = self.cow.writable
+        memory_cursor = self.memory = writable(self.memory)
+        for part in assign.identifier.address[:-1]:
+            prim_part = part.value if type(part) is Symbol else self.interpret_type(part)
+            validate_indexable(memory_cursor, prim_part)
+            child = memory_cursor[prim_part]
+            if isinstance(child, (dict, list)):
+                child = memory_cursor[prim_part] = writable(child)
+            memory_cursor = child
+        address_to_modify = self.interpret_type(assign.identifier.address[-1])
+        old_value = self.cow.current(safe_get(memory_cursor, address_to_modify))
+        memory_cursor[address_to_modify] = literal_value
+        return literal_value if assign.return_mode == 'after' else old_value
+
+    def specialize_nodes(self, quickening: Quickening):
+        # nodes rewrite themselves into variants specialized on what they saw the first time they ran; the AST is
+        # changed in place, so it is meant for this interpreter only
+        self.quickening = quickening
+        handlers = self.type_interpretation_handlers
+        handlers.update({
+            BinaryOperation: self.adaptive_binary_operation,
+            QuickBinaryOperation: self.quick_binary_operation,
+            GenericBinaryOperation: self.execute_binary_operation,
+        })
+        if self.cow is None: # copy-on-write needs to see every memory access
+            handlers.update({
+                Identifier: self.adaptive_identity_value,
+                GlobalIdentifier: self.quick_global_identity_value,
+                ConstantPathIdentifier: self.quick_constant_path_identity_value,
+                GenericIdentifier: self.identity_value,
+                Assign: self.adaptive_assign,
+                GlobalAssign: self.quick_global_assign,
+                ConstantPathAssign: self.quick_constant_path_assign,
+                GenericAssign: self.execute_assign,
+            })
+
+    def adaptive_binary_operation(self, operation: BinaryOperation):
+        left = self.interpret_type(operation.left)
+        right = self.interpret_type(operation.right)
+        function = OPERATOR_TABLE.get((operation.operator, type(left), type(right)))
+        if function is None:
+            raise unsupported_operands(operation.operator, left, right)
+        self.quickening.observed += 1
+        self.quickening.specialize(operation, binary_operation_variant(operation.operator, type(left), type(right), function))
+        return function(left, right)
+
+    def quick_binary_operation(self, operation: QuickBinaryOperation):
+        left, right = operation.left, operation.right
+        left = left.value if type(left) is Number else self.interpret_type(left)
+        right = right.value if type(right) is Number else self.interpret_type(right)
+        variant = type(operation)
+        if type(left) is variant.left_type and type(right) is variant.right_type:
+            return variant.function(left, right)
+        self.quickening.deoptimize(operation, GenericBinaryOperation)
+        return binary_operation(operation.operator, left, right)
+
+    def adaptive_identity_value(self, identifier: Identifier):
+        value = self.identity_value(identifier)
+        address = identifier.address
+        self.quickening.observed += 1
+        if not is_constant(address):
+            identifier.__class__ = GenericIdentifier
+        else:
+            self.quickening.specialize(identifier, GlobalIdentifier if len(address) == 1 else ConstantPathIdentifier)
+        return value
+
+    def quick_global_identity_value(self, identifier: GlobalIdentifier):
+        try:
+            return self.memory[identifier.address[0].value]
+        except KeyError:
+            self.quickening.deoptimize(identifier, GenericIdentifier)
+            return self.identity_value(identifier)
+
+    def quick_constant_path_identity_value(self, identifier: ConstantPathIdentifier):
+        # indexing raises wherever validate_indexable would, so the generic path only runs to report the error
+        current_value = self.memory
+        try:
+            for part in identifier.address:
+                current_value = current_value[part.value]
+        except (LookupError, TypeError):
+            self.quickening.deoptimize(identifier, GenericIdentifier)
+            return self.identity_value(identifier)
+        return current_value
+
+    def adaptive_assign(self, assign: Assign):
+        value = self.execute_assign(assign)
+        address = assign.identifier.address
+        self.quickening.observed += 1
+        if not is_constant(address):
+            assign.__class__ = GenericAssign
+        else:
+            self.quickening.specialize(assign, GlobalAssign if len(address) == 1 else ConstantPathAssign)
+        return value
+
+    def quick_global_assign(self, assign: GlobalAssign):
+        literal_value = self.interpret_type(assign.value)
+        memory, name = self.memory, assign.identifier.address[0].value
+        old_value = memory.get(name)
+        memory[name] = literal_value
+        return literal_value if assign.return_mode == 'after' else old_value
+
+    def quick_constant_path_assign(self, assign: ConstantPathAssign):
+        literal_value = self.interpret_type(assign.value)
+        address = assign.identifier.address
+        memory_cursor = self.memory
+        try:
+            for i in range(len(address) - 1):
+                memory_cursor = memory_cursor[address[i].value]
+        except (LookupError, TypeError):
+            memory_cursor = None
+        key = address[-1].value
+        if type(memory_cursor) is dict:
+            old_value = memory_cursor.get(key)
+        elif type(memory_cursor) is list and type(key) is int and 0 <= key < len(memory_cursor):
+            old_value = memory_cursor[key]
+        else:
+            self.quickening.deoptimize(assign, GenericAssign)
+            return self.store(assign, literal_value)
+        memory_cursor[key] = literal_value
+        return literal_value if assign.return_mode == 'after' else old_value
+
+    # handlers of nodes specialized by type inference (analysis/specialization.py), which proved that the checks
+    # of the generic handlers always pass
+
+    def typed_binary_operation(self, operation: TypedBinaryOperation):
+        left, right = operation.left, operation.right
+        left = left.value if type(left) is Number else self.interpret_type(left)
+        right = right.value if type(right) is Number else self.interpret_type(right)
+        return operation.function(left, right)
+
+    def typed_identity_value(self, identifier: TypedPathIdentifier):
+        address = identifier.address
+        current_value = self.memory[address[0].value]
+        for i in range(1, len(address)):
+            part = address[i]
+            current_value = current_value[part.value if type(part) is Symbol else self.interpret_type(part)]
+        return current_value
+
+    def typed_store(self, assign: TypedPathAssign):
+        literal_value = self.interpret_type(assign.value)
+        address = assign.identifier.address
+        memory_cursor = self.memory[address[0].value]
+        for i in range(1, len(address) - 1):
+            part = address[i]
+            memory_cursor = memory_cursor[part.value if type(part) is Symbol else self.interpret_type(part)]
+        key = self.interpret_type(address[-1])
+        if assign.return_mode == 'after':
+            memory_cursor[key] = literal_value
+            return literal_value
+        old_value = safe_get(memory_cursor, key)
+        memory_cursor[key] = literal_value
+        return old_value
+
+    def execute_block(self, statements: list):
+        interpret_type = self.interpret_type
+        for statement in statements:
+            result = interpret_type(statement)
+            if result is BREAK or result is CONTINUE:
+                return result
+        return None
+
+    def execute_if(self, node: If):
+        return self.execute_block(node.body if self.interpret_type(node.condition) else node.orelse)
+
+    def resolve(self, node):
+        # the handler that will evaluate the node, looked up once for a loop instead of on every iteration;
+        # quickened nodes change their type as they run and profiling has to see every node, so both keep
+        # dispatching through interpret_type
+        if self.quickening is not None or self.profiler is not None:
+            return self.interpret_type
+        handler = self.type_interpretation_handlers.get(type(node))
+        return handler if handler else self.inherited_handler(type(node))
+
+    def execute_while(self, loop: While):
+        condition, test = loop.condition, self.resolve(loop.condition)
+        body = [(self.resolve(statement), statement) for statement in loop.body]
+        if not any(map(can_jump, loop.body)):
+            while test(condition):
+                for handler, statement in body:
+                    handler(statement)
+            return None
+        while test(condition):
+            for handler, statement in body:
+                result = handler(statement)
+                if result is CONTINUE:
+                    break
+                if result is BREAK:
+                    return None
+        return None
+
+    def resolved(self, value):
+        return self.cow.materialize(value) if self.cow else value
+
     def execute_binary_operation(self, operation: BinaryOperation):
         left = self.interpret_type(operation.left)
         right = self.interpret_type(operation.right)
-        left = f'\'{left}\'' if isinstance(left, str) else left
-        right = f'\'{right}\'' if isinstance(right, str) else right
-        return eval(f'{left} {ARITHMETIC_TYPE_TO_CHAR[operation.operator.value]} {right}')
+        return binary_operation(operation.operator, left, right)
 
     def interpret_type(self, node):
         handler = self.type_interpretation_handlers.get(type(node))
         if handler:
             return handler(node)
-        raise TypeError(f"Unsupported type for interpretation: {type(node).__name__}")
+        return self.inherited_handler(type(node))(node)
+
+    def inherited_handler(self, node_type: type):
+        # a node rewritten by another interpreter's quickening is a subclass of the node it stands in for, and an
+        # interpreter that does not know the variant evaluates it like its base
+        for base in node_type.__mro__[1:]:
+            handler = self.type_interpretation_handlers.get(base)
+            if handler:
+                self.type_interpretation_handlers[node_type] = handler
+                return handler
+        raise TypeError(f"Unsupported type for interpretation: {node_type.__name__}")
 
     def interpret(self):
         for statement in self.ast:
-            print(self.interpret_type(statement))
-        print(self.memory)
+            result = self.interpret_type(statement)
+            if prints_result(statement, result):
+                print(self.resolved(result))
+        print(self.resolved(self.memory))
@@ -0,0 +1,218 @@
+import math
+import operator
+from functools import partial
+
+try:
+    import numpy
+except ImportError: # numeric arrays are optional, plain lists work without numpy
+    numpy = None
+
+from interpreter.cow import OwnedList
+from interpreter.operators import ARITHMETIC_OPERATORS, binary_operation, register_equality, register_operator
+from interpreter.snapshot import LazyList
+from lexer.types import ARITHMETIC_TYPE_TO_CHAR, TokenType
+
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+NUMPY_OPERATORS = {
+    TokenType.PLUS: operator.add,
+    TokenType.MINUS: operator.sub,
+    TokenType.MULTIPLY: operator.mul,
+    TokenType.DIVIDE: operator.truediv,
+    TokenType.MODULUS: operator.mod, # numpy.remainder, which takes the sign of the divisor like Python's %
+    TokenType.EXPONENT: operator.pow,
+}
+
+
+class NumericArray(list):
+    # A homogeneous int or float array kept in a numpy array instead of the list storage, which stays empty: int64
+    # or float64, or an object array of Python ints when some int does not fit in int64. Storing anything else,
+    # a float into an int array or an int into a float array included, demotes it in place to an ordinary list
+    # (array = None) rather than retyping the other elements, so every alias sees the change of representation.
+    # `owner` tags it for copy-on-write memories (interpreter/cow.py).
+    __slots__ = ('array', 'owner')
+    script_type_name = 'list'
+
+    @classmethod
+    def wrap(cls, array) -> 'NumericArray':
+        numeric = cls()
+        numeric.array = array
+        return numeric
+
+    def demote(self):
+        array, self.array = self.array, None
+        list.extend(self, array.tolist())
+
+    def tolist(self) -> list:
+        return self.array.tolist() if self.array is not None else list.copy(self)
+
+    def __len__(self):
+        return len(self.array) if self.array is not None else list.__len__(self)
+
+    def __iter__(self):
+        return iter(self.tolist())
+
+    def __getitem__(self, index):
+        array = self.array
+        if array is None:
+            return list.__getitem__(self, index)
+        if type(index) is not int:
+            return self.tolist()[index]
+        try:
+            value = array[index]
+        except IndexError:
+            raise IndexError("list index out of range") from None
+        return value.item() if isinstance(value, numpy.generic) else value # object arrays hold Python ints
+
+    def __setitem__(self, index, value):
+        array = self.array
+        if array is not None and type(index) is int:
+            if not -len(array) <= index < len(array):
+                raise IndexError("list assignment index out of range")
+            kind, dtype = type(value), array.dtype.kind
+            if kind is int and (dtype == 'O' or (dtype == 'i' and INT64_MIN <= value <= INT64_MAX)):
+                array[index] = value
+                return
+            if kind is int and dtype == 'i':
+                self.array = array = array.astype(object)
+                array[index] = value
+                return
+            if kind is float and dtype == 'f':
+                array[index] = value
+                return
+        if array is not None:
+            self.demote()
+        list.__setitem__(self, index, value)
+
+    def __contains__(self, value):
+        return value in self.tolist()
+
+    def __eq__(self, other):
+        return self.tolist() == list(other) if isinstance(other, list) else NotImplemented
+
+    def __ne__(self, other):
+        return self.tolist() != list(other) if isinstance(other, list) else NotImplemented
+
+    def __repr__(self):
+        return repr(self.tolist())
+
+    def copy(self):
+        return NumericArray.wrap(self.array.copy()) if self.array is not None else list.copy(self)
+
+    def __reduce_ex__(self, protocol):
+        return list, (self.tolist(),)
+
+
+def demoting(name: str):
+    method = getattr(list, name)
+
+    def wrapper(self, *args, **kwargs):
+        if self.array is not None:
+            self.demote()
+        return method(self, *args, **kwargs)
+
+    wrapper.__name__ = name
+    return wrapper
+
+
+for _name in ('__delitem__', '__reversed__', '__lt__', '__le__', '__gt__', '__ge__', '__add__', '__iadd__',
+              '__mul__', '__rmul__', '__imul__', 'append', 'extend', 'insert', 'pop', 'remove', 'index', 'count',
+              'reverse', 'sort', 'clear'):
+    setattr(NumericArray, _name, demoting(_name))
+
+
+def numeric_array(values: list) -> list:
+    if numpy is None or not values:
+        return values
+    kinds = set(map(type, values))
+    if kinds == {int}:
+        try:
+            return NumericArray.wrap(numpy.array(values, dtype=numpy.int64))
+        except OverflowError:
+            array = numpy.empty(len(values), dtype=object)
+            array[:] = values
+            return NumericArray.wrap(array)
+    if kinds == {float}:
+        return NumericArray.wrap(numpy.array(values, dtype=numpy.float64))
+    return values # mixed ints and floats stay a list: float64 would turn the ints into floats
+
+
+def operand(value):
+    # the numpy array or Python scalar to compute with, or None when only the Python semantics can handle it
+    if isinstance(value, NumericArray):
+        return value.array if value.array.dtype.kind != 'O' else None
+    if type(value) is int:
+        return value if INT64_MIN <= value <= INT64_MAX else None
+    return value
+
+
+def fits_int64(operator_type: TokenType, left, right) -> bool:
+    # int64 arithmetic silently wraps, so it is only used when the result provably fits
+    def bound(x):
+        return max(abs(int(x.max())), abs(int(x.min()))) if isinstance(x, numpy.ndarray) else abs(x)
+
+    left_bound, right_bound = bound(left), bound(right)
+    if operator_type in (TokenType.PLUS, TokenType.MINUS):
+        return left_bound + right_bound <= INT64_MAX
+    if operator_type == TokenType.MULTIPLY:
+        return left_bound * right_bound <= INT64_MAX
+    if operator_type == TokenType.EXPONENT:
+        lowest = int(right.min()) if isinstance(right, numpy.ndarray) else right
+        highest = int(right.max()) if isinstance(right, numpy.ndarray) else right
+        return lowest >= 0 and (left_bound <= 1 or highest * math.log2(left_bound) < 63)
+    return True
+
+
+def has_zero(value) -> bool:
+    return bool((value == 0).any()) if isinstance(value, numpy.ndarray) else value == 0
+
+
+def python_elementwise(operator_type: TokenType, left, right) -> list:
+    lefts = left.tolist() if isinstance(left, NumericArray) else None
+    rights = right.tolist() if isinstance(right, NumericArray) else None
+    length = len(lefts if lefts is not None else rights)
+    pairs = zip(lefts if lefts is not None else [left] * length, rights if rights is not None else [right] * length)
+    return numeric_array([binary_operation(operator_type, x, y) for x, y in pairs])
+
+
+def elementwise(operator_type: TokenType, left, right):
+    if any(isinstance(x, NumericArray) and x.array is None for x in (left, right)):
+        # a demoted array is an ordinary list again, with the list semantics
+        left, right = (x.tolist() if isinstance(x, NumericArray) else x for x in (left, right))
+        return binary_operation(operator_type, left, right)
+    if isinstance(left, NumericArray) and isinstance(right, NumericArray) and len(left) != len(right):
+        raise ValueError(f"Element-wise {ARITHMETIC_TYPE_TO_CHAR[operator_type]} needs arrays of the same length, "
+                         f"got {len(left)} and {len(right)}")
+    a, b = operand(left), operand(right)
+    if a is None or b is None:
+        return python_elementwise(operator_type, left, right)
+    integral = all((x.dtype.kind == 'i') if isinstance(x, numpy.ndarray) else type(x) is int for x in (a, b))
+    if operator_type in (TokenType.DIVIDE, TokenType.MODULUS) and has_zero(b):
+        raise ZeroDivisionError("division by zero" if operator_type == TokenType.DIVIDE else "modulo by zero")
+    if integral and not fits_int64(operator_type, a, b):
+        return python_elementwise(operator_type, left, right)
+    with numpy.errstate(all='ignore'):
+        result = NUMPY_OPERATORS[operator_type](a, b)
+    if operator_type == TokenType.EXPONENT and result.dtype.kind == 'f' and not numpy.isfinite(result).all():
+        return python_elementwise(operator_type, left, right) # complex results and overflows behave as in Python
+    return NumericArray.wrap(result)
+
+
+def concatenate_lists(left: list, right: list) -> list:
+    # an array and an ordinary list (one that holds something else, or that came from outside numeric mode)
+    # combine like two lists, whatever the array holds
+    return [*left, *right]
+
+
+for _operator_type in ARITHMETIC_OPERATORS:
+    _function = partial(elementwise, _operator_type)
+    register_operator(_operator_type, NumericArray, NumericArray, _function)
+    for _scalar_type in (int, float):
+        register_operator(_operator_type, NumericArray, _scalar_type, _function)
+        register_operator(_operator_type, _scalar_type, NumericArray, _function)
+
+for _list_type in (list, OwnedList, LazyList):
+    register_operator(TokenType.PLUS, NumericArray, _list_type, concatenate_lists)
+    register_operator(TokenType.PLUS, _list_type, NumericArray, concatenate_lists)
+
+register_equality(NumericArray)
@@ -0,0 +1,87 @@
+import operator
+from typing import Any, Callable
+
+from interpreter.strings import Rope, concatenate, repeat
+from lexer.types import BINARY_OPERATOR_TO_CHAR, TokenType
+
+
+ARITHMETIC_OPERATORS: dict[TokenType, Callable[[Any, Any], Any]] = {
+    TokenType.PLUS: operator.add,
+    TokenType.MINUS: operator.sub,
+    TokenType.MULTIPLY: operator.mul,
+    TokenType.DIVIDE: operator.truediv,
+    TokenType.MODULUS: operator.mod,
+    TokenType.EXPONENT: operator.pow,
+}
+
+ORDERING_OPERATORS: dict[TokenType, Callable[[Any, Any], bool]] = {
+    TokenType.LESS: operator.lt,
+    TokenType.LESS_EQUAL: operator.le,
+    TokenType.GREATER: operator.gt,
+    TokenType.GREATER_EQUAL: operator.ge,
+}
+
+NUMERIC_TYPES = (int, float)
+
+# (operator, type(left), type(right)) -> implementation; anything missing is an unsupported operand pair
+OPERATOR_TABLE: dict[tuple[TokenType, type, type], Callable[[Any, Any], Any]] = {}
+
+
+def register_operator(operator_type: TokenType, left_type: type, right_type: type, function: Callable[[Any, Any], Any]):
+    OPERATOR_TABLE[(operator_type, left_type, right_type)] = function
+
+
+for _operator_type, _function in ARITHMETIC_OPERATORS.items():
+    for _left_type in NUMERIC_TYPES:
+        for _right_type in NUMERIC_TYPES:
+            register_operator(_operator_type, _left_type, _right_type, _function)
+
+for _left_type in (str, Rope):
+    for _right_type in (str, Rope):
+        register_operator(TokenType.PLUS, _left_type, _right_type, concatenate)
+    register_operator(TokenType.MULTIPLY, _left_type, int, repeat)
+    register_operator(TokenType.MULTIPLY, int, _left_type, lambda left, right: repeat(right, left))
+register_operator(TokenType.PLUS, list, list, operator.add)
+register_operator(TokenType.MULTIPLY, list, int, operator.mul)
+register_operator(TokenType.MULTIPLY, int, list, operator.mul)
+
+# value types any two of which compare with == and !=
+EQUALITY_TYPES: list[type] = []
+
+
+def register_equality(value_type: type):
+    EQUALITY_TYPES.append(value_type)
+    for other_type in EQUALITY_TYPES:
+        for operator_type, function in ((TokenType.EQUALS, operator.eq), (TokenType.NOT_EQUALS, operator.ne)):
+            register_operator(operator_type, value_type, other_type, function)
+            register_operator(operator_type, other_type, value_type, function)
+
+
+for _value_type in (int, float, bool, str, Rope, list, dict, type(None)):
+    register_equality(_value_type)
+
+for _operator_type, _function in ORDERING_OPERATORS.items():
+    for _left_type in NUMERIC_TYPES:
+        for _right_type in NUMERIC_TYPES:
+            register_operator(_operator_type, _left_type, _right_type, _function)
+    register_operator(_operator_type, str, str, _function)
+    for _left_type, _right_type in ((Rope, str), (str, Rope), (Rope, Rope)):
+        register_operator(_operator_type, _left_type, _right_type,
+                          lambda left, right, function=_function: function(str(left), str(right)))
+
+
+def type_name(value: Any) -> str:
+    # alternative representations (ropes, lazy or numeric containers) report the type scripts see
+    return getattr(type(value), 'script_type_name', type(value).__name__)
+
+
+def unsupported_operands(operator_type: TokenType, left: Any, right: Any) -> TypeError:
+    return TypeError(f"Unsupported operand types for {BINARY_OPERATOR_TO_CHAR[operator_type]}: "
+                     f"'{type_name(left)}' and '{type_name(right)}'")
+
+
+def binary_operation(operator_type: TokenType, left: Any, right: Any):
+    function = OPERATOR_TABLE.get((operator_type, type(left), type(right)))
+    if function is None:
+        raise unsupported_operands(operator_type, left, right)
+    return function(left, right)
@@ -0,0 +1,94 @@
+from bisect import bisect_right
+from time import perf_counter_ns
+
+from parser.types import If, While
+
+# nodes whose children other than the condition are statements of a block
+BLOCK_TYPES = (If, While)
+
+
+class NodeStats:
+    __slots__ = ('calls', 'cumulative', 'own')
+
+    def __init__(self):
+        self.calls = 0
+        self.cumulative = 0 # ns, counted once per outermost activation so recursion is not double counted
+        self.own = 0 # ns spent in the node itself, excluding its children
+
+
+class Profiler:
+    def __init__(self, source: str | None = None):
+        self.source = source
+        self.line_starts = [0] + [i + 1 for i, char in enumerate(source or '') if char == '\n']
+        self.node_stats: dict[str, NodeStats] = {}
+        self.statement_stats: dict[str, NodeStats] = {}
+        self.stacks: dict[tuple[str, ...], int] = {} # collapsed stack -> own ns
+        self.frames: list[str] = []
+        self.nodes: list = [] # the nodes of the open frames
+        self.active: dict[str, int] = {} # node type -> number of activations on the stack
+
+    def location(self, pos: int | None) -> str:
+        if pos is None:
+            return '?'
+        line = bisect_right(self.line_starts, pos)
+        return f"{line}:{pos - self.line_starts[line - 1] + 1}"
+
+    def statement_label(self, node) -> str:
+        return f"{self.location(node.pos)} {type(node).__name__}"
+
+    def wrap(self, interpret_type):
+        # returns a drop-in replacement for Interpreter.interpret_type that times every node it evaluates; top-level
+        # statements and the statements in the blocks of if and while get their own line in the report
+        frames, nodes, active, stacks = self.frames, self.nodes, self.active, self.stacks
+        children_time = [0] # ns spent in children of the current frame, one entry per open frame
+
+        def profiled(node):
+            name = type(node).__name__
+            parent = nodes[-1] if nodes else None
+            statement_node = parent is None or (type(parent) in BLOCK_TYPES and node is not parent.condition)
+            frames.append(self.statement_label(node) if statement_node else name)
+            nodes.append(node)
+            active[name] = active.get(name, 0) + 1
+            children_time.append(0)
+            start = perf_counter_ns()
+            try:
+                return interpret_type(node)
+            finally:
+                elapsed = perf_counter_ns() - start
+                own = elapsed - children_time.pop()
+                children_time[-1] += elapsed
+                active[name] -= 1
+                stats = self.node_stats.get(name) or self.node_stats.setdefault(name, NodeStats())
+                stats.calls += 1
+                stats.own += own
+                if not active[name]:
+                    stats.cumulative += elapsed
+                key = tuple(frames)
+                stacks[key] = stacks.get(key, 0) + own
+                frames.pop()
+                nodes.pop()
+                if statement_node:
+                    label = key[-1]
+                    statement = self.statement_stats.get(label) or self.statement_stats.setdefault(label, NodeStats())
+                    statement.calls += 1
+                    statement.cumulative += elapsed
+                    statement.own += own
+
+        return profiled
+
+    def write_collapsed(self, path: str):
+        # one "frame;frame;frame value" line per stack, the input format of flamegraph.pl and speedscope
+        with open(path, 'w') as file:
+            for stack, own in self.stacks.items():
+                file.write(f"{';'.join(stack)} {own // 1000}\n")
+
+    def report(self, limit: int = 20) -> str:
+        lines = [f"{'node type':<24}{'calls':>10}{'cumulative ms':>16}{'own ms':>12}"]
+        for name, stats in sorted(self.node_stats.items(), key=lambda item: -item[1].own):
+            lines.append(f"{name:<24}{stats.calls:>10}{stats.cumulative / 1e6:>16.3f}{stats.own / 1e6:>12.3f}")
+        lines.append('')
+        lines.append(f"{'statement':<40}{'runs':>10}{'cumulative ms':>16}")
+        hottest = sorted(self.statement_stats.items(), key=lambda item: -item[1].cumulative)[:limit]
+        for label, stats in hottest:
+            lines.append(f"{label:<40}{stats.calls:>10}{stats.cumulative / 1e6:>16.3f}")
+        return '\n'.join(lines)
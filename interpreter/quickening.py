@@ -0,0 +1,109 @@
+from collections import Counter
+from typing import Any, Callable
+
+from lexer.types import BINARY_OPERATOR_TO_CHAR, TokenType
+from parser.types import Assign, BinaryOperation, Identifier, Primitive
+
+
+# Specialized variants of AST nodes. A node is rewritten in place by swapping its class for a subclass with the
+# same (empty) slots, so the variant carries everything it specializes on as class attributes and the node itself
+# stays the same object in the tree. `quickened_from` names the node type the variant stands in for.
+
+class QuickBinaryOperation(BinaryOperation):
+    # base of the per (operator, left type, right type) variants built by binary_operation_variant
+    __slots__ = ()
+    quickened_from = BinaryOperation
+    left_type: type
+    right_type: type
+    function: Callable[[Any, Any], Any]
+
+
+class GenericBinaryOperation(BinaryOperation):
+    # deoptimized: saw more than one operand type pair, stays on the generic path
+    __slots__ = ()
+    quickened_from = BinaryOperation
+
+
+class GlobalIdentifier(Identifier):
+    # a single constant name, read straight from memory
+    __slots__ = ()
+    quickened_from = Identifier
+
+
+class ConstantPathIdentifier(Identifier):
+    # a chain of constant keys and indexes, read without per-part dispatch or validation
+    __slots__ = ()
+    quickened_from = Identifier
+
+
+class GenericIdentifier(Identifier):
+    __slots__ = ()
+    quickened_from = Identifier
+
+
+class GlobalAssign(Assign):
+    __slots__ = ()
+    quickened_from = Assign
+
+
+class ConstantPathAssign(Assign):
+    __slots__ = ()
+    quickened_from = Assign
+
+
+class GenericAssign(Assign):
+    __slots__ = ()
+    quickened_from = Assign
+
+
+BINARY_VARIANTS: dict[tuple, type[QuickBinaryOperation]] = {}
+
+
+def binary_operation_variant(operator_type: TokenType, left_type: type, right_type: type,
+                             function: Callable[[Any, Any], Any]) -> type[QuickBinaryOperation]:
+    # keyed by the function too, so re-registering an operator never leaves a stale variant behind
+    key = (operator_type, left_type, right_type, function)
+    variant = BINARY_VARIANTS.get(key)
+    if variant is None:
+        name = f'QuickBinaryOperation[{left_type.__name__} {BINARY_OPERATOR_TO_CHAR[operator_type]} {right_type.__name__}]'
+        variant = BINARY_VARIANTS[key] = type(name, (QuickBinaryOperation,), {
+            '__slots__': (), 'left_type': left_type, 'right_type': right_type, 'function': staticmethod(function),
+        })
+    return variant
+
+
+def is_constant(address: list) -> bool:
+    return all(isinstance(part, Primitive) for part in address)
+
+
+class Quickening:
+    # counts what the interpreter's adaptive handlers did to the tree
+    def __init__(self):
+        self.observed = 0 # generic nodes evaluated for the first time and considered for specialization
+        self.specialized: Counter[str] = Counter() # variant name -> nodes rewritten into it
+        self.deoptimized: Counter[str] = Counter() # variant name -> nodes that missed its guard and went generic
+
+    def specialize(self, node, variant: type):
+        node.__class__ = variant
+        self.specialized[variant.__name__] += 1
+
+    def deoptimize(self, node, generic: type):
+        self.deoptimized[type(node).__name__] += 1
+        node.__class__ = generic
+
+    @property
+    def specialization_rate(self) -> float:
+        return self.specialized.total() / self.observed if self.observed else 0.0
+
+    @property
+    def deoptimization_rate(self) -> float:
+        specialized = self.specialized.total()
+        return self.deoptimized.total() / specialized if specialized else 0.0
+
+    def report(self) -> str:
+        lines = [f"QuickeningReport(observed: {self.observed}, specialized: {self.specialized.total()} "
+                 f"({self.specialization_rate:.1%}), deoptimized: {self.deoptimized.total()} "
+                 f"({self.deoptimization_rate:.1%} of specialized))"]
+        for name, count in self.specialized.most_common():
+            lines.append(f"  {name:<48} {count:>8} specialized {self.deoptimized[name]:>8} deoptimized")
+        return '\n'.join(lines)
@@ -0,0 +1,236 @@
+import mmap
+import operator
+import os
+import struct
+
+from interpreter.operators import register_equality, register_operator
+from interpreter.strings import Rope
+from lexer.types import TokenType
+
+# Layout: MAGIC, then the root entry, then records. An entry is a one byte tag and an 8 byte payload that holds a
+# scalar inline or the file offset of a record; records are strings, big ints (length + bytes), lists (count +
+# entries) and dicts (count + key/value entry pairs). Entries have a fixed size, so a container's record is
+# reserved before its children are written and filled in after them: a child that refers back to a container
+# still being written, a cycle, gets the offset of its record like any other alias.
+MAGIC = b'SABSNAP2'
+ENTRY = struct.Struct('<cq')
+FLOAT_ENTRY = struct.Struct('<cd')
+COUNT = struct.Struct('<Q')
+LENGTH = struct.Struct('<Q')
+
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+WRITE_BUFFER_SIZE = 1 << 20 # records are patched in memory while still buffered, and on disk after that
+
+
+class SnapshotWriter:
+    def __init__(self, file, offset: int = 0):
+        self.file = file
+        self.offset = offset
+        self.buffer = bytearray()
+        self.buffered = offset # file offset of the start of the buffer
+        self.written: dict[int, bytes] = {} # id(container) -> entry, so shared containers stay shared on restore
+        self.keep_alive = []
+
+    def write(self, data: bytes) -> int:
+        offset = self.offset
+        self.buffer += data
+        self.offset += len(data)
+        if len(self.buffer) >= WRITE_BUFFER_SIZE:
+            self.flush()
+        return offset
+
+    def patch(self, offset: int, data: bytes):
+        if offset >= self.buffered:
+            self.buffer[offset - self.buffered:offset - self.buffered + len(data)] = data
+            return
+        self.file.seek(offset)
+        self.file.write(data)
+        self.file.seek(self.buffered)
+
+    def flush(self):
+        self.file.write(self.buffer)
+        self.buffered = self.offset
+        self.buffer.clear()
+
+    def entry(self, value) -> bytes:
+        if value is None:
+            return ENTRY.pack(b'N', 0)
+        if value is True or value is False:
+            return ENTRY.pack(b'T' if value else b'F', 0)
+        if type(value) is int and INT64_MIN <= value <= INT64_MAX:
+            return ENTRY.pack(b'i', value)
+        if isinstance(value, int):
+            data = value.to_bytes((value.bit_length() + 8) // 8, 'little', signed=True)
+            return ENTRY.pack(b'I', self.write(LENGTH.pack(len(data)) + data))
+        if isinstance(value, float):
+            return FLOAT_ENTRY.pack(b'f', value)
+        if isinstance(value, (str, Rope)):
+            data = str(value).encode('utf-8', 'surrogatepass')
+            return ENTRY.pack(b's', self.write(LENGTH.pack(len(data)) + data))
+        if isinstance(value, (list, dict)):
+            entry = self.written.get(id(value))
+            if entry is None:
+                entry = self.container(value)
+            return entry
+        raise TypeError(f"Cannot snapshot value of type {type(value).__name__}")
+
+    def container(self, value: list | dict) -> bytes:
+        width = ENTRY.size if isinstance(value, list) else 2 * ENTRY.size
+        offset = self.write(COUNT.pack(len(value)) + bytes(len(value) * width))
+        self.keep_alive.append(value)
+        entry = self.written[id(value)] = ENTRY.pack(b'l' if isinstance(value, list) else b'd', offset)
+        if isinstance(value, list):
+            entries = [self.entry(element) for element in value]
+        else:
+            entries = [self.entry(key) + self.entry(item) for key, item in value.items()]
+        self.patch(offset + COUNT.size, b''.join(entries))
+        return entry
+
+
+def write_snapshot(memory: dict, path: str):
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as file:
+        file.write(MAGIC + ENTRY.pack(b'N', 0)) # the root entry is patched in once the records are written
+        writer = SnapshotWriter(file, len(MAGIC) + ENTRY.size)
+        root = writer.entry(memory)
+        writer.flush()
+        file.seek(len(MAGIC))
+        file.write(root)
+    os.replace(tmp_path, path)
+
+
+class Snapshot:
+    def __init__(self, path: str):
+        with open(path, 'rb') as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.map[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"Not a memory snapshot: {path}")
+        self.loaded: dict[int, list | dict] = {} # offset -> container, so aliases restore as one object
+
+    def root(self) -> dict:
+        root = self.value(len(MAGIC))
+        if not isinstance(root, dict):
+            raise ValueError("Snapshot root is not an object")
+        return root
+
+    def value(self, position: int):
+        tag, payload = ENTRY.unpack_from(self.map, position)
+        if tag == b'i':
+            return payload
+        if tag == b's':
+            length = LENGTH.unpack_from(self.map, payload)[0]
+            start = payload + LENGTH.size
+            return self.map[start:start + length].decode('utf-8', 'surrogatepass')
+        if tag == b'f':
+            return FLOAT_ENTRY.unpack_from(self.map, position)[1]
+        if tag in (b'l', b'd'):
+            container = self.loaded.get(payload)
+            if container is None:
+                container = self.loaded[payload] = (LazyList if tag == b'l' else LazyDict).unloaded(self, payload)
+            return container
+        if tag == b'N':
+            return None
+        if tag in (b'T', b'F'):
+            return tag == b'T'
+        if tag == b'I':
+            length = LENGTH.unpack_from(self.map, payload)[0]
+            start = payload + LENGTH.size
+            return int.from_bytes(self.map[start:start + length], 'little', signed=True)
+        raise ValueError(f"Corrupt snapshot entry at {position}")
+
+    def elements(self, offset: int) -> list:
+        count = COUNT.unpack_from(self.map, offset)[0]
+        start = offset + COUNT.size
+        return [self.value(start + i * ENTRY.size) for i in range(count)]
+
+    def items(self, offset: int) -> list:
+        count = COUNT.unpack_from(self.map, offset)[0]
+        start = offset + COUNT.size
+        return [(self.value(start + i * 2 * ENTRY.size), self.value(start + (i * 2 + 1) * ENTRY.size))
+                for i in range(count)]
+
+
+def materializing(base: type, name: str):
+    method = getattr(base, name)
+
+    def wrapper(self, *args, **kwargs):
+        if self.snapshot is not None:
+            self.materialize()
+        for arg in args:
+            # the list and dict methods read another container's storage directly, so a lazy one is loaded first
+            if isinstance(arg, (LazyList, LazyDict)) and arg.snapshot is not None:
+                arg.materialize()
+        return method(self, *args, **kwargs)
+
+    wrapper.__name__ = name
+    return wrapper
+
+
+class LazyList(list):
+    # an array still in the snapshot: empty until anything touches it, then filled in place from the file,
+    # its own container elements staying lazy until they are touched in turn
+    __slots__ = ('snapshot', 'offset')
+    script_type_name = 'list'
+
+    @classmethod
+    def unloaded(cls, snapshot: Snapshot, offset: int) -> 'LazyList':
+        lazy = cls()
+        lazy.snapshot, lazy.offset = snapshot, offset
+        return lazy
+
+    def materialize(self):
+        snapshot, self.snapshot = self.snapshot, None
+        list.extend(self, snapshot.elements(self.offset))
+
+    def __radd__(self, other):
+        if self.snapshot is not None:
+            self.materialize()
+        return list.__add__(other, self)
+
+    def __reduce_ex__(self, protocol):
+        # the elements are added after the list is memoized, so a list that contains itself copies too
+        return list, (), None, iter(self)
+
+
+class LazyDict(dict):
+    __slots__ = ('snapshot', 'offset')
+    script_type_name = 'dict'
+
+    @classmethod
+    def unloaded(cls, snapshot: Snapshot, offset: int) -> 'LazyDict':
+        lazy = cls()
+        lazy.snapshot, lazy.offset = snapshot, offset
+        return lazy
+
+    def materialize(self):
+        snapshot, self.snapshot = self.snapshot, None
+        dict.update(self, snapshot.items(self.offset))
+
+    def __reduce_ex__(self, protocol):
+        return dict, (), None, None, iter(self.items())
+
+
+for _name in ('__getitem__', '__setitem__', '__delitem__', '__contains__', '__iter__', '__reversed__', '__len__',
+              '__eq__', '__ne__', '__lt__', '__le__', '__gt__', '__ge__', '__repr__', '__add__', '__iadd__',
+              '__mul__', '__rmul__', '__imul__', 'append', 'extend', 'insert', 'pop', 'remove', 'index', 'count',
+              'reverse', 'sort', 'copy', 'clear'):
+    setattr(LazyList, _name, materializing(list, _name))
+
+for _name in ('__getitem__', '__setitem__', '__delitem__', '__contains__', '__iter__', '__reversed__', '__len__',
+              '__eq__', '__ne__', '__repr__', '__or__', '__ior__', 'get', 'keys', 'values', 'items', 'pop',
+              'popitem', 'setdefault', 'update', 'copy', 'clear'):
+    setattr(LazyDict, _name, materializing(dict, _name))
+
+# restored arrays combine with plain ones exactly like lists do
+register_operator(TokenType.PLUS, LazyList, list, operator.add)
+register_operator(TokenType.PLUS, list, LazyList, operator.add)
+register_operator(TokenType.PLUS, LazyList, LazyList, operator.add)
+register_operator(TokenType.MULTIPLY, LazyList, int, operator.mul)
+register_operator(TokenType.MULTIPLY, int, LazyList, operator.mul)
+register_equality(LazyList)
+register_equality(LazyDict)
+
+
+def restore_snapshot(path: str) -> dict:
+    return Snapshot(path).root()
@@ -0,0 +1,66 @@
+ROPE_THRESHOLD = 4096 # concatenations shorter than this just copy, like plain str
+
+
+class Rope:
+    # An immutable string kept as the first `count` chunks of an append-only buffer. Appending to the rope that
+    # owns the end of the buffer extends the buffer in place and shares it with the new rope, so `s += chunk`
+    # in a loop is amortized linear; appending to an older rope copies its chunk list first. The text is only
+    # joined, once, when something needs the characters.
+    __slots__ = ('chunks', 'count', 'length', 'flat')
+    script_type_name = 'str'
+
+    def __init__(self, chunks: list[str], length: int):
+        self.chunks = chunks
+        self.count = len(chunks)
+        self.length = length
+        self.flat: str | None = None
+
+    def append(self, text: str) -> 'Rope':
+        if self.flat is not None:
+            chunks = [self.flat] # start a fresh buffer from the joined text instead of the old chunks
+        elif self.count == len(self.chunks):
+            chunks = self.chunks
+        else:
+            chunks = self.chunks[:self.count]
+        chunks.append(text)
+        return Rope(chunks, self.length + len(text))
+
+    def __str__(self) -> str:
+        if self.flat is None:
+            self.flat = ''.join(self.chunks[:self.count]) if self.count != len(self.chunks) else ''.join(self.chunks)
+        return self.flat
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        return str(self)[index]
+
+    def __setitem__(self, index, value):
+        raise TypeError(f"'{self.script_type_name}' object does not support item assignment")
+
+    def __eq__(self, other):
+        if isinstance(other, (Rope, str)):
+            return self.length == len(other) and str(self) == str(other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(str(self))
+
+    def __repr__(self):
+        return repr(str(self))
+
+    def __reduce__(self):
+        return str, (str(self),)
+
+
+def concatenate(left: str | Rope, right: str | Rope) -> str | Rope:
+    if type(left) is Rope:
+        return left.append(str(right) if type(right) is Rope else right)
+    if len(left) + len(right) < ROPE_THRESHOLD:
+        return left + str(right)
+    return Rope([left], len(left)).append(str(right) if type(right) is Rope else right)
+
+
+def repeat(text: str | Rope, times: int) -> str:
+    return str(text) * times
@@ -0,0 +1,91 @@
+import re
+
+from lexer.symbols import SYMBOLS
+from lexer.types import *
+
+
+SYMBOL_TOKENS = {**SINGLE_CHAR_TOKENS, **OPERATOR_TOKENS}
+
+WORD_TOKENS = {
+    **{word: (token_type, word) for word, token_type in RESERVED_KEYWORDS.items()},
+    **{word: (token_type, word == 'true') for word, token_type in BOOLEAN_OPERATORS.items()},
+}
+
+TOKEN_PATTERN = re.compile(r'\s*(?:' + '|'.join((
+    r'(?P<WORD>[^\W\d]\w*)',
+    f'(?P<SYMBOL>{"|".join(re.escape(s) for s in sorted(SYMBOL_TOKENS, key=len, reverse=True))})',
+    r'(?a:(?P<INTEGER>\d+(?![.\d])))', # ASCII digits, as the Lexer's DIGITS
+    r'(?a:(?P<FLOAT>\d+\.\d*))',
+    r'(?P<STRING>\'(?P<SINGLE_QUOTED>(?:\\.|[^\'\\])*)\'?|"(?P<DOUBLE_QUOTED>(?:\\.|[^"\\])*)"?)',
+    r'(?P<INVALID>\S)',
+)) + ')', re.DOTALL)
+
+
+def token_from_match(match: re.Match, offset: int = 0) -> Token:
+    kind = match.lastgroup
+    pos = offset + match.start(kind)
+    if kind == 'WORD':
+        lexeme = match['WORD']
+        if not (lexeme[0].isalpha() or lexeme[0] == '_'): # \w also holds for '²' and '½', which start no word
+            raise Exception(f"Invalid character: {lexeme[0]}")
+        if lexeme in WORD_TOKENS:
+            token_type, value = WORD_TOKENS[lexeme]
+            return Token(type=token_type, value=value, pos=pos)
+        symbol = SYMBOLS.intern(lexeme)
+        return Token(type=TokenType.IDENTIFIER, value=SYMBOLS.name(symbol), pos=pos, symbol=symbol)
+    if kind == 'SYMBOL':
+        lexeme = match['SYMBOL']
+        return Token(type=SYMBOL_TOKENS[lexeme], value=lexeme, pos=pos)
+    if kind == 'INTEGER':
+        return Token(type=TokenType.NUMBER, value=int(match['INTEGER']), pos=pos)
+    if kind == 'FLOAT':
+        return Token(type=TokenType.NUMBER, value=float(match['FLOAT']), pos=pos)
+    if kind == 'STRING':
+        value = match['SINGLE_QUOTED']
+        return Token(type=TokenType.STRING, value=value if value is not None else match['DOUBLE_QUOTED'], pos=pos)
+    raise Exception(f"Invalid character: {match['INVALID']}")
+
+
+def overrun(match: re.Match | None) -> int:
+    # the Lexer steps one past the end of the text looking for the quote of an unterminated string, and places
+    # EOF there
+    if match is None or match.lastgroup != 'STRING':
+        return 0
+    content = match['SINGLE_QUOTED'] if match['SINGLE_QUOTED'] is not None else match['DOUBLE_QUOTED']
+    return int(len(match['STRING']) == len(content) + 1)
+
+
+class BulkLexer:
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens: list[Token] | None = None
+        self.error: Exception | None = None # raised once the tokens before it are used up, as the Lexer would
+        self.index = 0
+
+    def scan(self) -> list[Token]:
+        # the tokens up to the first invalid character, with EOF if there is none
+        tokens, match = [], None
+        try:
+            for match in TOKEN_PATTERN.finditer(self.text):
+                tokens.append(token_from_match(match))
+        except Exception as e:
+            self.error = e
+            return tokens
+        tokens.append(Token(type=TokenType.EOF, value=None, pos=len(self.text) + overrun(match)))
+        return tokens
+
+    def tokenize_all(self) -> list[Token]:
+        tokens = self.scan()
+        if self.error is not None:
+            raise self.error
+        return tokens
+
+    def get_next_token(self) -> Token:
+        if self.tokens is None:
+            self.tokens = self.scan()
+        if self.index == len(self.tokens):
+            raise self.error
+        token = self.tokens[self.index]
+        if token.type != TokenType.EOF:
+            self.index += 1
+        return token
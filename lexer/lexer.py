@@ -1,3 +1,4 @@
+from lexer.symbols import SYMBOLS
 from lexer.types import *
 
 
@@ -13,6 +14,9 @@ class Lexer:
             '=': self.tokenize_equals,
             '-': self.tokenize_minus,
             '+': self.tokenize_plus,
+            '!': self.tokenize_bang,
+            '<': self.tokenize_less,
+            '>': self.tokenize_greater,
         }
 
     def peek(self):
@@ -31,7 +35,7 @@ class Lexer:
     def number(self):
         result = ''
         floating_point = False
-        while self.current_char is not None and (self.current_char.isdigit() or (self.current_char == '.' and not floating_point)):
+        while self.current_char is not None and (self.current_char in DIGITS or (self.current_char == '.' and not floating_point)):
             if self.current_char == '.':
                 floating_point = True
             result += self.current_char
@@ -59,7 +63,8 @@ class Lexer:
             return Token(type=RESERVED_KEYWORDS[result], value=result)
         if result in BOOLEAN_OPERATORS:
             return Token(type=TokenType.BOOL, value=True if result == 'true' else False)
-        return Token(type=TokenType.IDENTIFIER, value=result)
+        symbol = SYMBOLS.intern(result)
+        return Token(type=TokenType.IDENTIFIER, value=SYMBOLS.name(symbol), symbol=symbol)
 
     def tokenize_asterisk(self):
         self.advance()
@@ -95,6 +100,27 @@ class Lexer:
             return Token(type=TokenType.EQUALS, value='==')
         return Token(type=TokenType.ASSIGN, value='=')
 
+    def tokenize_bang(self):
+        self.advance()
+        if self.current_char == '=':
+            self.advance()
+            return Token(type=TokenType.NOT_EQUALS, value='!=')
+        raise Exception("Invalid character: !")
+
+    def tokenize_less(self):
+        self.advance()
+        if self.current_char == '=':
+            self.advance()
+            return Token(type=TokenType.LESS_EQUAL, value='<=')
+        return Token(type=TokenType.LESS, value='<')
+
+    def tokenize_greater(self):
+        self.advance()
+        if self.current_char == '=':
+            self.advance()
+            return Token(type=TokenType.GREATER_EQUAL, value='>=')
+        return Token(type=TokenType.GREATER, value='>')
+
     def tokenize_minus(self):
         self.advance()
         if self.current_char == '-':
@@ -116,21 +142,25 @@ class Lexer:
         return Token(type=TokenType.PLUS, value='+')
 
     def get_next_token(self) -> Token:
-        while self.current_char is not None:
-            char = self.current_char
-            if char.isspace():
-                self.skip_whitespace()
-                continue
-            if char.isdigit():
-                return self.number()
-            if char.isalpha() or char == '_':
-                return self.keyword() # identifiers and keywords
-            if char in ('"', "'"):
-                return self.string(char)
-            if char in SINGLE_CHAR_TOKENS:
-                self.advance()
-                return Token(type=SINGLE_CHAR_TOKENS[char], value=char)
-            if char in self.special_tokenizers:
-                return self.special_tokenizers[char]()
-            raise Exception(f"Invalid character: {char}")
-        return Token(type=TokenType.EOF, value=None)
+        self.skip_whitespace()
+        start = self.pos
+        token = self.next_token()
+        token.pos = start
+        return token
+
+    def next_token(self) -> Token:
+        char = self.current_char
+        if char is None:
+            return Token(type=TokenType.EOF, value=None)
+        if char in DIGITS:
+            return self.number()
+        if char.isalpha() or char == '_':
+            return self.keyword() # identifiers and keywords
+        if char in ('"', "'"):
+            return self.string(char)
+        if char in SINGLE_CHAR_TOKENS:
+            self.advance()
+            return Token(type=SINGLE_CHAR_TOKENS[char], value=char)
+        if char in self.special_tokenizers:
+            return self.special_tokenizers[char]()
+        raise Exception(f"Invalid character: {char}")
@@ -0,0 +1,32 @@
+from typing import Iterator, TextIO
+
+from lexer.bulk_lexer import TOKEN_PATTERN, overrun, token_from_match
+from lexer.types import Token, TokenType
+
+
+class StreamLexer:
+    def __init__(self, stream: TextIO, chunk_size: int = 1 << 16):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.offset = 0 # source offset of the start of the unconsumed buffer
+        self.tokens = self.iter_tokens()
+
+    def iter_tokens(self) -> Iterator[Token]:
+        buffer, last = '', None
+        exhausted = False
+        while not exhausted:
+            chunk = self.stream.read(self.chunk_size)
+            exhausted = not chunk
+            buffer += chunk
+            resume = 0
+            for match in TOKEN_PATTERN.finditer(buffer):
+                if match.end() >= len(buffer) - 1 and not exhausted:
+                    break # the token may continue (or an escape may complete) in the next chunk, rescan it
+                resume, last = match.end(), match
+                yield token_from_match(match, self.offset)
+            buffer = buffer[resume:]
+            self.offset += resume
+        self.offset += len(buffer) + overrun(last)
+
+    def get_next_token(self) -> Token:
+        return next(self.tokens, None) or Token(type=TokenType.EOF, value=None, pos=self.offset)
@@ -0,0 +1,41 @@
+import sys
+
+
+class SymbolTable:
+    # every distinct identifier is interned once and numbered; ids are only meaningful within one process. An id
+    # is never handed out twice, not even after a clear, so one that a kept tree holds never names another
+    # identifier: the table forgets the names, and interning one of them again numbers it anew
+    def __init__(self):
+        self.ids: dict[str, int] = {}
+        self.names: list[str] = []
+        self.base = 0 # the id of names[0]; the ids below it were cleared
+
+    def intern(self, name: str) -> int:
+        symbol = self.ids.get(name)
+        if symbol is None:
+            name = sys.intern(name)
+            symbol = self.ids[name] = self.base + len(self.names)
+            self.names.append(name)
+        return symbol
+
+    def name(self, symbol: int) -> str:
+        if not self.base <= symbol < self.base + len(self.names):
+            raise KeyError(f"Symbol id {symbol} is not in the table")
+        return self.names[symbol - self.base]
+
+    def matches(self, symbol: int, name: str) -> bool:
+        # a cleared id cannot be checked against its name any more, but no other identifier can have it either
+        if 0 <= symbol < self.base:
+            return True
+        return self.base <= symbol < self.base + len(self.names) and self.names[symbol - self.base] == name
+
+    def clear(self):
+        self.base += len(self.names)
+        self.ids.clear()
+        self.names.clear()
+
+    def __len__(self):
+        return len(self.names)
+
+
+SYMBOLS = SymbolTable()
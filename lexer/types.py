@@ -1,6 +1,5 @@
 from enum import Enum
 from typing import Any
-from pydantic import BaseModel
 
 
 class TokenType(str, Enum):
@@ -12,6 +11,11 @@ class TokenType(str, Enum):
 
     # comparison operators
     EQUALS = 'EQUALS'
+    NOT_EQUALS = 'NOT_EQUALS'
+    LESS = 'LESS'
+    LESS_EQUAL = 'LESS_EQUAL'
+    GREATER = 'GREATER'
+    GREATER_EQUAL = 'GREATER_EQUAL'
 
     # punctuation
     COLON = 'COLON'
@@ -68,6 +72,11 @@ UNARY_OPERATORS = {
     TokenType.DECREMENT
 }
 
+UNARY_OPERATOR_TO_ARITHMETIC = {
+    TokenType.INCREMENT: TokenType.PLUS,
+    TokenType.DECREMENT: TokenType.MINUS
+}
+
 END_LINE_TOKENS = {
     TokenType.SEMICOLON,
     TokenType.EOF
@@ -116,6 +125,20 @@ ARITHMETIC_TYPE_TO_CHAR = {
     TokenType.EXPONENT: '**'
 }
 
+COMPARISON_TYPE_TO_CHAR = {
+    TokenType.EQUALS: '==',
+    TokenType.NOT_EQUALS: '!=',
+    TokenType.LESS: '<',
+    TokenType.LESS_EQUAL: '<=',
+    TokenType.GREATER: '>',
+    TokenType.GREATER_EQUAL: '>='
+}
+
+BINARY_OPERATOR_TO_CHAR = {**ARITHMETIC_TYPE_TO_CHAR, **COMPARISON_TYPE_TO_CHAR}
+
+# numbers are ASCII: str.isdigit() also holds for characters like '²' that int() rejects
+DIGITS = frozenset('0123456789')
+
 SINGLE_CHAR_TOKENS = {
     '(': TokenType.LPAREN,
     ')': TokenType.RPAREN,
@@ -130,10 +153,46 @@ SINGLE_CHAR_TOKENS = {
     '@': TokenType.AT,
 }
 
+OPERATOR_TOKENS = {
+    '**=': TokenType.EXPONENT_ASSIGN,
+    '**': TokenType.EXPONENT,
+    '*=': TokenType.MULTIPLICATION_ASSIGN,
+    '*': TokenType.MULTIPLY,
+    '/=': TokenType.DIVISION_ASSIGN,
+    '/': TokenType.DIVIDE,
+    '%=': TokenType.MODULUS_ASSIGN,
+    '%': TokenType.MODULUS,
+    '==': TokenType.EQUALS,
+    '!=': TokenType.NOT_EQUALS,
+    '<=': TokenType.LESS_EQUAL,
+    '<': TokenType.LESS,
+    '>=': TokenType.GREATER_EQUAL,
+    '>': TokenType.GREATER,
+    '=': TokenType.ASSIGN,
+    '--': TokenType.DECREMENT,
+    '-=': TokenType.SUBTRACTION_ASSIGN,
+    '-': TokenType.MINUS,
+    '++': TokenType.INCREMENT,
+    '+=': TokenType.ADDITION_ASSIGN,
+    '+': TokenType.PLUS,
+}
+
+
+class Token:
+    __slots__ = ('type', 'value', 'pos', 'symbol')
+
+    def __init__(self, *, type: TokenType = TokenType.BLANK, value: Any = None, pos: int | None = None,
+                 symbol: int | None = None):
+        self.type = type
+        self.value = value
+        self.pos = pos # offset of the first character in the source
+        self.symbol = symbol # symbol table id of an identifier, derived from its value
+
+    def __eq__(self, other):
+        return type(other) is Token and self.type == other.type and self.value == other.value and self.pos == other.pos
 
-class Token(BaseModel):
-    type: TokenType = TokenType.BLANK
-    value: Any = None
+    def __str__(self):
+        return f"type={self.type!r} value={self.value!r}"
 
     def __repr__(self):
         return f"Token({self.type.value}: {self.value})"
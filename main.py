@@ -1,8 +1,61 @@
+import argparse
+import io
+
+from analysis.inference import TypeInference
+from analysis.specialization import specialize
+from engines import ENGINES
 from parser.parser import Parser
 from lexer.lexer import Lexer
-from interpreter.interpreter import Interpreter
+from lexer.stream_lexer import StreamLexer
+from natives.natives import memo_stats, set_memo_size
+from interpreter.profiler import Profiler
+from interpreter.snapshot import restore_snapshot, write_snapshot
+from optimizer.optimizer import Optimizer
+from parser.cache import ParseCache
+from parser.hash_consing import HashConsing
+from parser.parallel import parse_parallel
 
 if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('script', nargs='?', help='Saban script to run instead of the built-in sample')
+    arg_parser.add_argument('--engine', choices=ENGINES, default='tree')
+    arg_parser.add_argument('--no-optimize', action='store_true')
+    arg_parser.add_argument('--cache-dir', help='reuse parsed ASTs from this directory')
+    arg_parser.add_argument('--stream', action='store_true', help='lex, parse and run the script one statement at a time')
+    arg_parser.add_argument('--parse-workers', type=int, metavar='N',
+                            help='lex and parse chunks of the script in N processes, 0 for one per CPU')
+    arg_parser.add_argument('--profile', action='store_true', help='report time per node type and statement (tree engine)')
+    arg_parser.add_argument('--numeric-arrays', action='store_true',
+                            help='store numeric arrays in numpy and apply arithmetic element-wise (tree engine, '
+                                 'numpy is optional: see requirements-optional.txt)')
+    arg_parser.add_argument('--quicken', action='store_true',
+                            help='rewrite nodes into variants specialized on what they see and report it (tree engine)')
+    arg_parser.add_argument('--infer-types', action='store_true',
+                            help='infer the types of the script and skip the checks they prove, then report them')
+    arg_parser.add_argument('--dump-types', action='store_true',
+                            help='print every node with its inferred type (implies --infer-types)')
+    arg_parser.add_argument('--hash-cons', action='store_true', help='share structurally equal subtrees of the AST')
+    arg_parser.add_argument('--memoize', type=int, default=0, metavar='SIZE',
+                            help='cache up to SIZE results of each pure built-in function')
+    arg_parser.add_argument('--restore', metavar='PATH', help='start from the memory saved in this snapshot')
+    arg_parser.add_argument('--snapshot', metavar='PATH', help='save the final memory to this snapshot')
+    arg_parser.add_argument('--flamegraph', metavar='PATH', help='write profiled stacks in collapsed format (implies --profile)')
+    args = arg_parser.parse_args()
+    if (args.profile or args.flamegraph) and (args.engine != 'tree' or args.stream):
+        arg_parser.error('--profile and --flamegraph require the tree engine without --stream')
+    if args.numeric_arrays and args.engine != 'tree':
+        arg_parser.error('--numeric-arrays requires the tree engine')
+    if args.quicken and args.engine != 'tree':
+        arg_parser.error('--quicken requires the tree engine')
+    if (args.infer_types or args.dump_types) and (args.stream or args.numeric_arrays):
+        arg_parser.error('--infer-types and --dump-types cannot be combined with --stream or --numeric-arrays')
+    if args.cache_dir and args.stream:
+        arg_parser.error('--cache-dir cannot be combined with --stream')
+    if args.parse_workers is not None and (args.stream or args.cache_dir):
+        arg_parser.error('--parse-workers cannot be combined with --stream or --cache-dir')
+    if args.memoize < 0:
+        arg_parser.error('--memoize requires a non-negative size')
+    set_memo_size(args.memoize)
 
     i1 = """object.prop['0'][0]"""
     i2 = """object('prop', prop(), 1)"""
@@ -15,10 +68,67 @@ if __name__ == '__main__':
     i7 = """a= {1: 2, 'b': {1: 22}};"""
     i8 = """a = [1, 2, 3]; a;a[0] = 4; a;"""
     i9 = """a = 2; a += b=3"""
-    lx = Lexer(i9)
-    parser = Parser(lx)
-    ast = parser.parse()
-    interpreter = Interpreter(ast)
-    for st in ast:
-        print(st)
-    interpreter.interpret()
+    optimizer = Optimizer(enabled=not args.no_optimize)
+    hash_consing = HashConsing() if args.hash_cons else None # applied after the optimizer, which rebuilds trees
+    if args.stream:
+        with open(args.script) if args.script else io.StringIO(i9) as stream:
+            statements = optimizer.optimize_stream(Parser(StreamLexer(stream)).statements())
+            if hash_consing:
+                statements = map(hash_consing.share, statements)
+            engine_options = {'numeric_arrays': True} if args.numeric_arrays else {}
+            if args.quicken:
+                engine_options['quicken'] = True
+            memory = restore_snapshot(args.restore) if args.restore else None
+            interpreter = ENGINES[args.engine](statements, memory=memory, **engine_options)
+            interpreter.interpret()
+        print(optimizer.report)
+        if hash_consing:
+            print(hash_consing)
+        if args.quicken:
+            print(interpreter.quickening.report())
+        if args.memoize:
+            print(memo_stats())
+        if args.snapshot:
+            write_snapshot(interpreter.memory, args.snapshot)
+    else:
+        source = open(args.script).read() if args.script else i9
+        if args.cache_dir:
+            parse_cache = ParseCache(args.cache_dir)
+            ast = parse_cache.parse(source)
+            print(parse_cache.stats())
+        elif args.parse_workers is not None:
+            ast = parse_parallel(source, args.parse_workers)
+        else:
+            ast = Parser(Lexer(source)).parse()
+        ast = optimizer.optimize(ast)
+        print(optimizer.report)
+        if hash_consing:
+            ast = [hash_consing.share(statement) for statement in ast]
+            print(hash_consing)
+        if args.infer_types or args.dump_types: # last, the optimizer rebuilds the nodes it would rewrite
+            inference = TypeInference().infer(ast)
+            specialize(ast, inference)
+            print(inference.report())
+            if args.dump_types:
+                print(inference.dump(ast))
+        memory = restore_snapshot(args.restore) if args.restore else None
+        profiler = Profiler(source) if args.profile or args.flamegraph else None
+        engine_options = {'numeric_arrays': True} if args.numeric_arrays else {}
+        if profiler:
+            engine_options['profiler'] = profiler
+        if args.quicken:
+            engine_options['quicken'] = True
+        interpreter = ENGINES[args.engine](ast, memory=memory, **engine_options)
+        for st in ast:
+            print(st)
+        interpreter.interpret()
+        if args.quicken:
+            print(interpreter.quickening.report())
+        if args.memoize:
+            print(memo_stats())
+        if profiler:
+            print(profiler.report())
+            if args.flamegraph:
+                profiler.write_collapsed(args.flamegraph)
+        if args.snapshot:
+            write_snapshot(interpreter.memory, args.snapshot)
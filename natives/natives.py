@@ -0,0 +1,161 @@
+import math
+from typing import Any, Callable
+
+# results of these types cannot be changed by the script, so a memoized call can hand the same one out again
+IMMUTABLE_TYPES = (int, float, bool, str, type(None))
+
+
+def is_text(value) -> bool:
+    # ropes and other alternative string representations report str as the type scripts see
+    return getattr(type(value), 'script_type_name', None) == 'str'
+
+
+def as_text(value):
+    return str(value) if is_text(value) else value
+
+
+class Native:
+    # A built-in function implemented in Python. Calls are resolved to the Native itself when the script is parsed,
+    # which also checks the arity, so a call costs evaluating the arguments and one Python call. A pure native can
+    # memoize its results in a bounded LRU keyed by the arguments and their types (1 and 1.0 are equal keys but
+    # not equal results), with floats keyed by their bits (0.0 and -0.0 are equal too); calls with unhashable
+    # arguments and mutable results bypass the memo. A foldable native
+    # is pure and bounded by the size of its arguments, so the optimizer may call it on literals; one whose result
+    # can still be much longer than its arguments gives result_length, a bound the optimizer checks first.
+    __slots__ = ('name', 'function', 'min_args', 'max_args', 'pure', 'foldable', 'result_length', 'memo',
+                 'memo_size', 'hits', 'misses')
+
+    def __init__(self, name: str, function: Callable, min_args: int, max_args: int | None, pure: bool,
+                 foldable: bool, result_length: Callable[..., int] | None = None):
+        self.name = name
+        self.function = function
+        self.min_args = min_args
+        self.max_args = max_args # None for variadic
+        self.pure = pure
+        self.foldable = foldable
+        self.result_length = result_length
+        self.memo: dict | None = None
+        self.memo_size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def check_arity(self, count: int):
+        if count < self.min_args or (self.max_args is not None and count > self.max_args):
+            if self.max_args is None:
+                expected = f"at least {self.min_args}"
+            elif self.min_args == self.max_args:
+                expected = str(self.min_args)
+            else:
+                expected = f"{self.min_args} to {self.max_args}"
+            raise TypeError(f"{self.name}() takes {expected} argument{'' if expected == '1' else 's'}, got {count}")
+
+    def set_memo_size(self, size: int):
+        if size and not self.pure:
+            raise ValueError(f"Only pure natives can be memoized, {self.name}() is not pure")
+        self.memo_size = size
+        self.memo = {} if size else None
+        self.hits = self.misses = 0
+
+    def call(self, args: tuple):
+        try:
+            return self.function(*args)
+        except TypeError:
+            if not any(map(is_text, args)):
+                raise
+        # a rope is a str to scripts, so a native that does not take one fails, or works, exactly as on the text
+        return self.function(*map(as_text, args))
+
+    def __call__(self, *args):
+        if self.memo is None:
+            try:
+                return self.function(*args)
+            except TypeError:
+                if not any(map(is_text, args)):
+                    raise
+            return self.function(*map(as_text, args))
+        key = (*args, *[arg.hex() if type(arg) is float else type(arg) for arg in args])
+        memo = self.memo
+        try:
+            result = memo.pop(key)
+        except KeyError:
+            result = self.call(args)
+            if type(result) in IMMUTABLE_TYPES:
+                try:
+                    memo[key] = result
+                except TypeError: # unhashable arguments that an empty memo did not hash on lookup
+                    return result
+                if len(memo) > self.memo_size:
+                    del memo[next(iter(memo))] # least recently used: hits are moved to the end
+            self.misses += 1
+            return result
+        except TypeError: # unhashable arguments, lists and objects
+            return self.call(args)
+        self.hits += 1
+        memo[key] = result
+        return result
+
+    def __repr__(self):
+        return f"<native {self.name}>"
+
+
+# shared by the parser, which resolves and checks calls, the optimizer, which folds them, and the engines, which
+# make them, so it depends on none of them
+NATIVES: dict[str, Native] = {}
+
+
+def register_native(name: str, function: Callable, arity: int | tuple[int, int | None], pure: bool = False,
+                    foldable: bool | None = None, result_length: Callable[..., int] | None = None) -> Native:
+    min_args, max_args = (arity, arity) if isinstance(arity, int) else arity
+    native = NATIVES[name] = Native(name, function, min_args, max_args, pure, pure if foldable is None else foldable,
+                                    result_length)
+    return native
+
+
+def set_memo_size(size: int):
+    # memoize every pure native in at most `size` entries each, 0 turns memoization off
+    for native in NATIVES.values():
+        if native.pure:
+            native.set_memo_size(size)
+
+
+def memo_stats() -> dict[str, dict[str, int]]:
+    return {native.name: {'hits': native.hits, 'misses': native.misses, 'size': len(native.memo)}
+            for native in NATIVES.values() if native.memo is not None and native.hits + native.misses}
+
+
+def script_print(*values: Any):
+    print(*values)
+
+
+def text(value) -> str:
+    return str(value) # ropes and other string representations become plain str
+
+
+def replaced_length(value, old, new) -> int:
+    # at most every occurrence of old, or every gap when old is empty, becomes new
+    value, old, new = text(value), text(old), text(new)
+    return len(value) + (value.count(old) if old else len(value) + 1) * len(new)
+
+
+register_native('print', script_print, (0, None))
+register_native('len', len, 1, pure=True)
+register_native('str', text, 1, pure=True)
+register_native('int', int, 1, pure=True)
+register_native('float', float, 1, pure=True)
+register_native('abs', abs, 1, pure=True)
+register_native('round', round, (1, 2), pure=True)
+register_native('min', min, (1, None), pure=True)
+register_native('max', max, (1, None), pure=True)
+register_native('sum', sum, 1, pure=True)
+register_native('pow', pow, (2, 3), pure=True, foldable=False) # pow(2, 10 ** 9) would stall the optimizer
+register_native('sqrt', math.sqrt, 1, pure=True)
+register_native('floor', math.floor, 1, pure=True)
+register_native('ceil', math.ceil, 1, pure=True)
+register_native('upper', lambda value: text(value).upper(), 1, pure=True)
+register_native('lower', lambda value: text(value).lower(), 1, pure=True)
+register_native('replace', lambda value, old, new: text(value).replace(text(old), text(new)), 3, pure=True,
+                result_length=replaced_length)
+register_native('split', lambda value, separator: text(value).split(text(separator)), 2, pure=True)
+register_native('join', lambda values, separator: text(separator).join(map(text, values)), 2, pure=True)
+register_native('keys', lambda value: list(value), 1, pure=True)
+register_native('range', lambda *bounds: list(range(*bounds)), (1, 3), pure=True, foldable=False)
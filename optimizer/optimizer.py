@@ -0,0 +1,192 @@
+from typing import Iterable, Iterator
+
+from interpreter.operators import OPERATOR_TABLE, NUMERIC_TYPES
+from lexer.types import ARITHMETIC_TYPE_TO_CHAR, TokenType
+from parser.types import *
+
+
+LITERAL_NODES = {int: Number, float: Number, str: String, bool: Boolean}
+
+MAX_FOLDED_STRING_LENGTH = 4096
+MAX_FOLDED_INT_BITS = 512
+
+# operators whose result is always numeric when they succeed: a number, or with --numeric-arrays an element-wise
+# array of numbers, on which the identities simplify() relies on hold element by element
+NUMERIC_RESULT_OPERATORS = {TokenType.MINUS, TokenType.DIVIDE, TokenType.MODULUS, TokenType.EXPONENT}
+
+# operators whose result is an int when both operands are ints
+INT_RESULT_OPERATORS = {TokenType.PLUS, TokenType.MINUS, TokenType.MULTIPLY, TokenType.MODULUS}
+
+
+def count_nodes(node) -> int:
+    if not isinstance(node, Type):
+        return 1
+    return 1 + sum(count_nodes(child) for child in node.children())
+
+
+def is_literal(node) -> bool:
+    return type(node) in (Number, String, Symbol, Boolean)
+
+
+def is_numeric(node) -> bool:
+    if type(node) is Number:
+        return type(node.value) in NUMERIC_TYPES
+    if type(node) is BinaryOperation and node.operator in ARITHMETIC_TYPE_TO_CHAR: # comparisons are bool
+        return node.operator in NUMERIC_RESULT_OPERATORS or (is_numeric(node.left) and is_numeric(node.right))
+    return False
+
+
+def is_int(node) -> bool:
+    # + 0 is only an identity for ints: -0.0 + 0 is 0.0
+    if type(node) is Number:
+        return type(node.value) is int
+    if type(node) is BinaryOperation and node.operator in INT_RESULT_OPERATORS:
+        return is_int(node.left) and is_int(node.right)
+    return False
+
+
+def is_int_literal(node, value: int) -> bool:
+    return type(node) is Number and type(node.value) is int and node.value == value
+
+
+def folded_length(operator_type: TokenType, left, right) -> int:
+    # the length of a string or list a fold would build, computed without building it, 0 for anything else
+    if operator_type == TokenType.MULTIPLY:
+        if isinstance(left, (str, list)) and type(right) is int:
+            return len(left) * right
+        if isinstance(right, (str, list)) and type(left) is int:
+            return len(right) * left
+    elif operator_type == TokenType.PLUS and isinstance(left, (str, list)) and isinstance(right, (str, list)):
+        return len(left) + len(right)
+    return 0
+
+
+def folded_bits(operator_type: TokenType, left, right) -> int:
+    # the size of an int power a fold would compute, bounded without computing it, 0 for anything else
+    if operator_type == TokenType.EXPONENT and isinstance(left, int) and isinstance(right, int) and right > 0:
+        return right * left.bit_length()
+    return 0
+
+
+class OptimizationReport:
+    def __init__(self):
+        self.nodes_before = 0
+        self.nodes_after = 0
+        self.folded = 0
+        self.simplified = 0
+
+    @property
+    def nodes_removed(self) -> int:
+        return self.nodes_before - self.nodes_after
+
+    def __str__(self):
+        return (f"OptimizationReport(nodes: {self.nodes_before} -> {self.nodes_after}, removed: {self.nodes_removed}, "
+                f"folded: {self.folded}, simplified: {self.simplified})")
+
+
+class Optimizer:
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.report = OptimizationReport()
+        self.node_optimizers = {
+            BinaryOperation: self.optimize_binary_operation,
+            NativeCall: self.optimize_native_call,
+            Number: lambda x: x,
+            String: lambda x: x,
+            Symbol: lambda x: x,
+            Boolean: lambda x: x,
+        }
+
+    def optimize(self, ast: list) -> list:
+        return list(self.optimize_stream(ast))
+
+    def optimize_stream(self, statements: Iterable) -> Iterator:
+        for statement in statements:
+            self.report.nodes_before += count_nodes(statement)
+            if self.enabled:
+                statement = self.optimize_node(statement)
+            self.report.nodes_after += count_nodes(statement)
+            yield statement
+
+    def optimize_node(self, node):
+        if not isinstance(node, Type):
+            return node
+        node_optimizer = self.node_optimizers.get(type(node))
+        if node_optimizer:
+            return node_optimizer(node)
+        return self.rebuild(node)
+
+    def rebuild(self, node: Type):
+        values = {}
+        for field in node.fields:
+            value = getattr(node, field)
+            values[field] = [self.optimize_node(item) for item in value] if isinstance(value, list) else self.optimize_node(value)
+        return type(node)(**values, pos=node.pos)
+
+    def optimize_binary_operation(self, operation: BinaryOperation):
+        left, right = self.optimize_node(operation.left), self.optimize_node(operation.right)
+        if is_literal(left) and is_literal(right):
+            folded = self.fold(operation.operator, left.value, right.value)
+            if folded is not None:
+                self.report.folded += 1
+                folded.pos = operation.pos
+                return folded
+        simplified = self.simplify(operation.operator, left, right)
+        if simplified is not None:
+            self.report.simplified += 1
+            return simplified
+        return BinaryOperation(operator=operation.operator, left=left, right=right, pos=operation.pos)
+
+    def optimize_native_call(self, call: NativeCall):
+        args = [self.optimize_node(arg) for arg in call.args]
+        if call.native.foldable and all(is_literal(arg) for arg in args):
+            values = [arg.value for arg in args]
+            try:
+                result_length = call.native.result_length
+                if result_length is not None and result_length(*values) > MAX_FOLDED_STRING_LENGTH:
+                    result = None # too long to fold, and maybe too long to build at all
+                else:
+                    result = call.native.function(*values)
+            except (ArithmeticError, ValueError, TypeError):
+                result = None # keep the failing call so it still raises at runtime
+            node_type = LITERAL_NODES.get(type(result))
+            if node_type is not None and not (node_type is String and len(result) > MAX_FOLDED_STRING_LENGTH):
+                self.report.folded += 1
+                return node_type(value=result, pos=call.pos)
+        return NativeCall(native=call.native, args=args, pos=call.pos)
+
+    @staticmethod
+    def fold(operator_type: TokenType, left, right):
+        function = OPERATOR_TABLE.get((operator_type, type(left), type(right)))
+        if function is None:
+            return None # leave unsupported operands for the interpreter to report
+        if folded_bits(operator_type, left, right) > MAX_FOLDED_INT_BITS:
+            return None # checked before computing it: 3 ** 1000000000 would stall the optimizer
+        if folded_length(operator_type, left, right) > MAX_FOLDED_STRING_LENGTH:
+            return None # checked before building it: 'ab' * 4000000000 may never run, or even fit in memory
+        try:
+            result = function(left, right)
+        except (ArithmeticError, ValueError):
+            return None # keep the failing operation so it still raises at runtime
+        node_type = LITERAL_NODES.get(type(result))
+        if node_type is None or (node_type is String and len(result) > MAX_FOLDED_STRING_LENGTH):
+            return None
+        return node_type(value=result)
+
+    @staticmethod
+    def simplify(operator_type: TokenType, left, right):
+        # identities only apply when the other operand is provably numeric, so str/list operands keep their errors
+        if operator_type == TokenType.MULTIPLY:
+            if is_int_literal(right, 1) and is_numeric(left):
+                return left
+            if is_int_literal(left, 1) and is_numeric(right):
+                return right
+        elif operator_type == TokenType.PLUS:
+            if is_int_literal(right, 0) and is_int(left):
+                return left
+            if is_int_literal(left, 0) and is_int(right):
+                return right
+        elif operator_type in (TokenType.MINUS, TokenType.EXPONENT):
+            if is_int_literal(right, 0 if operator_type == TokenType.MINUS else 1) and is_numeric(left):
+                return left
+        return None
@@ -0,0 +1,98 @@
+import hashlib
+import os
+
+from lexer.bulk_lexer import BulkLexer
+from parser.parser import Parser
+from parser.serialization import Serializer, FORMAT_VERSION
+from version import __version__
+
+
+class ParseCache:
+    suffix = '.ast'
+
+    def __init__(self, directory: str, max_bytes: int = 256 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.serializer = Serializer()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+        self.total_bytes = sum(size for _, _, size in self.entries())
+
+    def key(self, source: str) -> str:
+        digest = hashlib.sha256(f'{__version__}:{FORMAT_VERSION}:'.encode())
+        digest.update(source.encode('utf-8', 'surrogatepass'))
+        return digest.hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key + self.suffix)
+
+    def entries(self):
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if entry.name.endswith(self.suffix) and entry.is_file():
+                    stat = entry.stat()
+                    yield entry.path, stat.st_mtime, stat.st_size
+
+    def load(self, source: str) -> list | None:
+        path = self.path(self.key(source))
+        try:
+            with open(path, 'rb') as file:
+                data = file.read()
+            ast = self.serializer.loads(data)
+        except FileNotFoundError:
+            return None
+        except (ValueError, EOFError, TypeError, KeyError, IndexError):
+            self.remove(path) # corrupt or stale entry
+            return None
+        os.utime(path) # mtime doubles as the LRU timestamp
+        return ast
+
+    def store(self, source: str, ast: list):
+        path = self.path(self.key(source))
+        data = self.serializer.dumps(ast)
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'wb') as file:
+            file.write(data)
+        os.replace(temp_path, path)
+        self.total_bytes += len(data)
+        if self.total_bytes > self.max_bytes:
+            self.evict()
+
+    def remove(self, path: str):
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except FileNotFoundError:
+            return
+        self.total_bytes -= size
+
+    def evict(self):
+        entries = sorted(self.entries(), key=lambda entry: entry[1])
+        self.total_bytes = sum(size for _, _, size in entries)
+        for path, _, size in entries:
+            if self.total_bytes <= self.max_bytes:
+                break
+            self.remove(path)
+            self.evictions += 1
+
+    def parse(self, source: str, lexer_type=BulkLexer) -> list:
+        ast = self.load(source)
+        if ast is not None:
+            self.hits += 1
+            return ast
+        self.misses += 1
+        ast = Parser(lexer_type(source)).parse()
+        self.store(source, ast)
+        return ast
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'bytes': self.total_bytes,
+        }
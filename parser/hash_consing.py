@@ -0,0 +1,67 @@
+from typing import Any
+
+from parser.types import Primitive, Type
+
+MAX_TABLE_SIZE = 1 << 20 # canonical nodes kept before the table starts over, so streamed scripts stay bounded
+
+
+class HashConsing:
+    # Replaces structurally equal subtrees with one shared node. Children are shared first, so two subtrees are
+    # equal exactly when their types, plain fields and child identities match, and the key only holds ids. The
+    # table keeps every canonical node alive, so the ids stay unique for as long as it exists. A shared node
+    # keeps the position of its first occurrence. Evaluating a node never changes its fields, which is what makes
+    # sharing safe. Quickening and type specialization do swap a node's class in place, but a quickened variant
+    # guards on what it specialized on, and a typed one is proven for every place the shared node runs in.
+    # Passes that rewrite the tree (the optimizer) build new nodes and so undo the sharing. A full table is
+    # cleared between statements: nodes already shared stay shared, later ones only share with each other.
+    def __init__(self, max_size: int = MAX_TABLE_SIZE):
+        self.table: dict[tuple, Type] = {}
+        self.max_size = max_size
+        self.nodes = 0 # distinct node objects seen
+        self.shared = 0 # nodes replaced by an equal node seen before
+
+    @property
+    def unique(self) -> int:
+        return self.nodes - self.shared # canonical nodes, the table may have been cleared since
+
+    @staticmethod
+    def key(node: Type) -> tuple:
+        if isinstance(node, Primitive):
+            # 1, 1.0 and True are equal in Python but not as literals, and neither are 0.0 and -0.0
+            value = node.value.hex() if type(node.value) is float else node.value
+            return type(node), type(node.value), value, *(getattr(node, f) for f in node.fields if f != 'value')
+        return type(node), *(field_key(getattr(node, field)) for field in node.fields)
+
+    def share(self, node: Type, seen: dict[int, Type] | None = None) -> Type:
+        # seen maps nodes of this tree already handled to their canonical node, as the parser itself shares some
+        # nodes (the operand of ++ is both the assignment target and the left operand)
+        if seen is None:
+            seen = {}
+            if len(self.table) >= self.max_size:
+                self.table.clear()
+        canonical = seen.get(id(node))
+        if canonical is not None:
+            return canonical
+        for field in node.fields:
+            value = getattr(node, field)
+            if isinstance(value, Type):
+                setattr(node, field, self.share(value, seen))
+            elif isinstance(value, list):
+                value[:] = [self.share(item, seen) if isinstance(item, Type) else item for item in value]
+        self.nodes += 1
+        canonical = self.table.setdefault(self.key(node), node)
+        if canonical is not node:
+            self.shared += 1
+        seen[id(node)] = canonical
+        return canonical
+
+    def __str__(self):
+        return f"HashConsingReport(nodes: {self.nodes}, unique: {self.unique}, shared: {self.shared})"
+
+
+def field_key(value: Any):
+    if isinstance(value, Type):
+        return id(value)
+    if isinstance(value, list):
+        return tuple(id(item) if isinstance(item, Type) else item for item in value)
+    return value
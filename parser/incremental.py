@@ -0,0 +1,150 @@
+from bisect import bisect_left
+
+from lexer.bulk_lexer import BulkLexer, TOKEN_PATTERN, token_from_match
+from lexer.types import END_LINE_TOKENS, Token, TokenType
+from parser.parser import Parser
+from parser.types import Type
+from parser.validation import validate
+
+
+class TokenCursor:
+    # feeds a parser from an already lexed token list, starting at any index
+    def __init__(self, tokens: list[Token], index: int = 0):
+        self.tokens = tokens
+        self.index = index
+        self.current = index # index of the token the parser is looking at
+
+    def get_next_token(self) -> Token:
+        self.current = self.index
+        token = self.tokens[self.index]
+        if token.type != TokenType.EOF:
+            self.index += 1
+        return token
+
+
+def positioned_nodes(statement: Type) -> list[Type]:
+    # every node of a statement that has a position, once each: the parser shares nodes, e.g. the operand of ++
+    # is both the assignment target and the left operand
+    nodes, seen, stack = [], set(), [statement]
+    while stack:
+        node = stack.pop()
+        if id(node) not in seen:
+            seen.add(id(node))
+            if node.pos is not None:
+                nodes.append(node)
+            stack.extend(node.children())
+    return nodes
+
+
+class IncrementalParser:
+    # Keeps the tokens and statements of a buffer between edits. An edit re-lexes from the token before it until
+    # a new token starts where an old one did past the edit (the rest of the text is unchanged, so the rest of the
+    # tokens are too), and re-parses from the first statement that saw a changed token until a statement starts
+    # on an unchanged token where an old one started. Statements outside that window are reused as they are,
+    # with their positions shifted; the positioned nodes of each statement are listed up front so that shifting
+    # is a flat loop rather than a tree walk.
+    def __init__(self, text: str, strict: bool = False):
+        self.strict = strict
+        self.text = text
+        self.tokens: list[Token] | None = None
+        self.statements: list[Type] = []
+        self.starts: list[int] = [] # token index of each statement's first token
+        self.ends: list[int] = [] # token index the parser was looking at when the statement was done
+        self.nodes: list[list[Type]] = [] # positioned nodes of each statement
+        self.relexed = 0
+        self.reparsed = 0
+        self.parse()
+
+    def parse(self) -> list[Type]:
+        # full parse, also used to recover after an edit left the buffer unparsable
+        self.tokens = None
+        tokens = BulkLexer(self.text).tokenize_all()
+        self.statements, self.starts, self.ends = self.parse_from(tokens, 0, None)
+        self.nodes = [positioned_nodes(statement) for statement in self.statements]
+        self.tokens = tokens
+        self.relexed, self.reparsed = len(tokens), len(self.statements)
+        return self.statements
+
+    def edit(self, offset: int, deleted: int, inserted: str) -> list[Type]:
+        if not 0 <= offset <= offset + deleted <= len(self.text):
+            raise ValueError(f"Edit of {deleted} characters at {offset} is outside the text")
+        self.text = self.text[:offset] + inserted + self.text[offset + deleted:]
+        if self.tokens is None:
+            return self.parse()
+        try:
+            return self.apply(offset, deleted, len(inserted))
+        except Exception:
+            self.tokens = None # the next edit starts over from the text
+            raise
+
+    def apply(self, offset: int, deleted: int, inserted: int) -> list[Type]:
+        old_tokens, delta = self.tokens, inserted - deleted
+        # an edit can extend or merge the token right before it, so lexing restarts there
+        first = max(bisect_left(old_tokens, offset, key=lambda token: token.pos) - 1, 0)
+        old_index, unchanged_from = first, offset + deleted
+        new_tokens = []
+        for match in TOKEN_PATTERN.finditer(self.text, min(old_tokens[first].pos, offset)):
+            token = token_from_match(match)
+            old_pos = token.pos - delta
+            if old_pos >= unchanged_from:
+                while old_tokens[old_index].pos < old_pos:
+                    old_index += 1
+                if old_tokens[old_index].pos == old_pos:
+                    break # resynchronized: the rest of the text, and so of the tokens, is unchanged
+            new_tokens.append(token)
+        else:
+            old_index = len(old_tokens) - 1 # only the EOF token carries over
+        tail = old_tokens[old_index:]
+        for token in tail:
+            token.pos += delta
+        tokens = old_tokens[:first] + new_tokens + tail
+        resync, shift = first + len(new_tokens), first + len(new_tokens) - old_index
+
+        # statements that never looked at a changed token are kept; the parser looks one token past a statement
+        kept = bisect_left(self.ends, first)
+        restart = self.ends[kept - 1] if kept else 0
+        def reusable(start: int) -> bool:
+            if start < resync:
+                return False
+            i = bisect_left(self.starts, start - shift, kept)
+            return i < len(self.starts) and self.starts[i] == start - shift
+
+        statements, starts, ends = self.parse_from(tokens, restart, reusable)
+        self.reparsed = len(statements)
+        nodes = [positioned_nodes(statement) for statement in statements]
+        if len(starts) > len(ends): # parsing stopped at an old statement, reuse it and the ones after it
+            reused = bisect_left(self.starts, starts.pop() - shift, kept)
+            if delta:
+                for statement_nodes in self.nodes[reused:]:
+                    for node in statement_nodes:
+                        node.pos += delta
+            statements += self.statements[reused:]
+            nodes += self.nodes[reused:]
+            starts += [start + shift for start in self.starts[reused:]]
+            ends += [end + shift for end in self.ends[reused:]]
+        self.statements = self.statements[:kept] + statements
+        self.nodes = self.nodes[:kept] + nodes
+        self.starts = self.starts[:kept] + starts
+        self.ends = self.ends[:kept] + ends
+        self.tokens = tokens
+        self.relexed = len(new_tokens)
+        return self.statements
+
+    def parse_from(self, tokens: list[Token], index: int, reusable) -> tuple[list[Type], list[int], list[int]]:
+        # parses statements until EOF, or until reusable(start) says the statement at start is already known;
+        # in that case its start is left unmatched in starts
+        cursor = TokenCursor(tokens, index)
+        parser = Parser(cursor)
+        statements, starts, ends = [], [], []
+        while parser.current_token.type != TokenType.EOF:
+            if parser.current_token.type in END_LINE_TOKENS:
+                parser.eat(parser.current_token.type)
+                continue
+            starts.append(cursor.current)
+            if reusable and reusable(cursor.current):
+                break
+            statements.append(parser.statement())
+            ends.append(cursor.current)
+            if self.strict:
+                validate(statements[-1])
+        return statements, starts, ends
@@ -0,0 +1,113 @@
+import os
+import re
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+from lexer.bulk_lexer import TOKEN_PATTERN, token_from_match
+from lexer.types import Token, TokenType
+from parser.incremental import TokenCursor
+from parser.parser import Parser
+from parser.serialization import Serializer, gc_paused
+from parser.types import Type
+
+# strings exactly as the lexer reads them (unterminated ones run to the end), brackets of every kind and semicolons
+SPLIT_PATTERN = re.compile(r"""'(?:\\.|[^'\\])*'?|"(?:\\.|[^"\\])*"?|[\[\](){};]""", re.DOTALL)
+
+MIN_CHUNK_SIZE = 1 << 16 # smaller chunks cost more to ship and decode than parsing them in place
+CHUNKS_PER_WORKER = 4 # statements vary in cost, smaller chunks balance the workers
+
+
+class ParseError(Exception):
+    # a lexing or parsing error at an offset into the whole source, whichever chunk it was found in
+    def __init__(self, message: str, pos: int, line: int | None = None, column: int | None = None):
+        super().__init__(message, pos, line, column)
+        self.message = message
+        self.pos = pos
+        self.line = line
+        self.column = column
+
+    def __str__(self):
+        if self.line is None:
+            return f"{self.message} at offset {self.pos}"
+        return f"{self.message} at line {self.line}, column {self.column}"
+
+
+def split_points(text: str, chunks: int) -> list[int]:
+    # offsets just past semicolons outside strings and brackets, about len(text) / chunks apart; a statement
+    # never spans one, so the text between two of them parses on its own into the statements it holds in the
+    # whole text. Unbalanced closing brackets are ignored here and left for the parser to report.
+    step = len(text) // chunks if chunks > 1 else len(text) + 1
+    points, target, depth = [], step, 0
+    for match in SPLIT_PATTERN.finditer(text):
+        char = text[match.start()]
+        if char in '([{':
+            depth += 1
+        elif char in ')]}':
+            depth = max(depth - 1, 0)
+        elif char == ';' and not depth and match.end() >= target:
+            points.append(match.end())
+            target = match.end() + step
+    return points
+
+
+def error_message(error: Exception) -> str:
+    return str(error) if type(error) is Exception else f"{type(error).__name__}: {error}"
+
+
+def parse_chunk(text: str, offset: int, strict: bool = False) -> list[Type]:
+    # lexes with global positions, so the nodes and any ParseError need no fixing up afterwards. The error
+    # reported is the first one in the text: tokens up to an invalid character are still parsed, and a parse
+    # error before it wins, so any split of a text reports the same error.
+    tokens, lexing_error = [], None
+    for match in TOKEN_PATTERN.finditer(text):
+        try:
+            tokens.append(token_from_match(match, offset))
+        except Exception as e:
+            lexing_error = ParseError(error_message(e), offset + match.start())
+            break
+    end = lexing_error.pos if lexing_error else offset + len(text)
+    tokens.append(Token(type=TokenType.EOF, value=None, pos=end))
+    cursor = TokenCursor(tokens)
+    try:
+        statements = Parser(cursor, strict=strict).parse()
+    except Exception as e:
+        if lexing_error is None or tokens[cursor.current].pos < end:
+            raise ParseError(error_message(e), tokens[cursor.current].pos) from None
+    if lexing_error:
+        raise lexing_error
+    return statements
+
+
+def parse_chunk_serialized(text: str, offset: int, strict: bool) -> bytes:
+    # runs in a worker; symbol ids are per process, and the serializer re-interns names when the main process
+    # loads the statements. Parse trees hold no cycles, so the worker skips collecting while it builds one.
+    with gc_paused():
+        return Serializer().dumps(parse_chunk(text, offset, strict))
+
+
+def located(text: str, error: ParseError) -> ParseError:
+    line_start = text.rfind('\n', 0, error.pos) + 1
+    return ParseError(error.message, error.pos, text.count('\n', 0, error.pos) + 1, error.pos - line_start + 1)
+
+
+def parse_parallel(text: str, workers: int | None = None, strict: bool = False,
+                   executor: Executor | None = None) -> list[Type]:
+    # Parses like Parser(BulkLexer(text), strict).parse(), with chunks of the text lexed and parsed in worker
+    # processes and their statements merged in source order. Raises ParseError for the first error in the text,
+    # the one the sequential parser raises.
+    workers = workers or os.cpu_count() or 1
+    chunks = min(workers * CHUNKS_PER_WORKER, len(text) // MIN_CHUNK_SIZE)
+    bounds = [0, *split_points(text, chunks), len(text)] if workers > 1 else [0, len(text)]
+    try:
+        if len(bounds) == 2:
+            return parse_chunk(text, 0, strict)
+        pool = executor or ProcessPoolExecutor(workers)
+        try:
+            parts = pool.map(parse_chunk_serialized, [text[start:end] for start, end in zip(bounds, bounds[1:])],
+                             bounds[:-1], [strict] * (len(bounds) - 1))
+            serializer = Serializer()
+            return [statement for part in parts for statement in serializer.loads(part)]
+        finally:
+            if executor is None:
+                pool.shutdown(cancel_futures=True)
+    except ParseError as e:
+        raise located(text, e) from None
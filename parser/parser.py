@@ -1,27 +1,25 @@
-from typing import Callable
+from typing import Callable, Iterator
 
 from lexer.types import ASSIGNMENT_OPERATORS, END_LINE_TOKENS, Token, RESERVED_KEYWORDS, \
-    AUGMENTED_ASSIGNMENT_TO_ARITHMETIC
+    AUGMENTED_ASSIGNMENT_TO_ARITHMETIC, UNARY_OPERATORS, UNARY_OPERATOR_TO_ARITHMETIC, COMPARISON_TYPE_TO_CHAR, \
+    TokenType
+from natives.natives import NATIVES
+from parser.hash_consing import HashConsing
 from parser.types import *
-
-class BuiltIns:
-    root = '7a8d77e7-300a-4580-a4b2-84c20ee3d294'
-    registered = ['print']
-
-    @classmethod
-    def get_identifier(cls, name: str) -> Identifier:
-        if name not in cls.registered:
-            raise Exception(f"Built-in function '{name}' does not exist")
-        return Identifier(address=[String(value=cls.root), String(value=name)])
+from parser.validation import validate
 
 
 class Parser:
-    def __init__(self, lexer):
+    def __init__(self, lexer, strict: bool = False, hash_cons: bool = False):
         self.lexer = lexer
+        self.strict = strict
+        self.hash_consing = HashConsing() if hash_cons else None # shares equal subtrees across the whole parse
+        self.loop_depth = 0 # break and continue are only valid inside a while body
         self.current_token: Token = self.lexer.get_next_token()
         self.type_handlers = {
             TokenType.NUMBER: self.number,
             TokenType.STRING: self.string,
+            TokenType.BOOL: self.boolean,
             TokenType.IDENTIFIER: self.identifier,
             TokenType.LPAREN: self.paren_expr,
             TokenType.LCURLY: self.object,
@@ -34,6 +32,12 @@ class Parser:
             TokenType.LBRACKET: self.handle_identity_lbracket,
             TokenType.LPAREN: self.handle_identity_lparen,
         }
+        self.keyword_handlers = {
+            TokenType.IF: self.if_statement,
+            TokenType.WHILE: self.while_statement,
+            TokenType.BREAK: self.loop_jump,
+            TokenType.CONTINUE: self.loop_jump,
+        }
 
     def eat(self, token_type):
         if self.current_token.type == token_type:
@@ -43,26 +47,42 @@ class Parser:
 
     def number(self, token: Token):
         self.eat(TokenType.NUMBER)
-        return Number(value=token.value)
+        return Number(value=token.value, pos=token.pos)
 
     def string(self, token: Token):
         self.eat(TokenType.STRING)
-        return String(value=token.value)
+        return String(value=token.value, pos=token.pos)
+
+    def boolean(self, token: Token):
+        self.eat(TokenType.BOOL)
+        return Boolean(value=token.value, pos=token.pos)
 
     def identifier(self, token: Token):
         identifier = self.get_identity()  # identifier or function call (which results in Identifier)
         token = self.current_token
         if token.type in UNARY_OPERATORS:
             self.eat(token.type)
-            value = BinaryOperation(operator=token.type, left=identifier)
-            return Assign(identifier=identifier, value=value, return_mode='before')
+            return self.assign(identifier, self.unary_operation(token, identifier), return_mode='before')
         return identifier
 
     def unary(self, token: Token):
         self.eat(token.type)
-        expr = self.expr() # if this is not an Identifier, it will raise an exception
-        value = BinaryOperation(operator=token.type, left=expr)
-        return Assign(identifier=expr, value=value, return_mode='after')
+        expr = self.expr()
+        return self.assign(expr, self.unary_operation(token, expr), return_mode='after', pos=token.pos)
+
+    @staticmethod
+    def unary_operation(token: Token, operand: Type) -> BinaryOperation:
+        return BinaryOperation(operator=UNARY_OPERATOR_TO_ARITHMETIC[token.type], left=operand,
+                               right=Number(value=1, pos=token.pos), pos=token.pos)
+
+    @staticmethod
+    def assign(identifier: Type, value: Type, return_mode: str = 'after', pos: int | None = None) -> Assign:
+        if not isinstance(identifier, Identifier):
+            raise Exception(f"Cannot assign value to non-identifier: {type(identifier).__name__}")
+        if type(identifier.address[0]) is NativeCall:
+            raise Exception(f"Cannot assign value to the result of {identifier.address[0].native.name}()")
+        return Assign(identifier=identifier, value=value, return_mode=return_mode,
+                      pos=pos if pos is not None else identifier.pos)
 
     def paren_expr(self, token: Token):
         self.eat(TokenType.LPAREN)
@@ -71,19 +91,21 @@ class Parser:
         return expr
 
     def object(self, token: Token):
-        obj = Object()
+        obj = Object(pos=token.pos)
         self.eat(TokenType.LCURLY)
         while self.current_token.type != TokenType.RCURLY:
             key = self.expr()
+            if not isinstance(key, Primitive):
+                raise Exception(f"Object key must be a primitive type, got {type(key).__name__}")
             self.eat(TokenType.COLON)
-            obj.properties.append(ObjectProperty(key=key, value=self.expr()))
+            obj.properties.append(ObjectProperty(key=key, value=self.expr(), pos=key.pos))
             if self.current_token.type == TokenType.COMMA:
                 self.eat(TokenType.COMMA)
         self.eat(TokenType.RCURLY)
         return obj
 
     def array(self, token: Token):
-        arr = Array()
+        arr = Array(pos=token.pos)
         self.eat(TokenType.LBRACKET)
         while self.current_token.type != TokenType.RBRACKET:
             arr.elements.append(self.expr())
@@ -110,7 +132,7 @@ class Parser:
         if not access_dot:
             raise Exception(f"Unexpected identifier: {token.value}")
         self.eat(TokenType.IDENTIFIER)
-        identity.address.append(String(value=token.value))
+        identity.address.append(Symbol(value=token.value, symbol=token.symbol, pos=token.pos))
 
     def handle_identity_dot(self, identity: Identifier, token: Token, access_dot: bool):
         if access_dot:
@@ -127,10 +149,17 @@ class Parser:
         self.eat(TokenType.LPAREN)
         args = self.args() if self.current_token.type != TokenType.RPAREN else []
         self.eat(TokenType.RPAREN)
-        return Identifier(address=[FunctionCall(identifier=identity, args=args)])
+        address = identity.address
+        native = NATIVES.get(address[0].value) if len(address) == 1 and type(address[0]) is Symbol else None
+        if native is None:
+            call = FunctionCall(identifier=identity, args=args, pos=identity.pos)
+        else:
+            native.check_arity(len(args)) # raises TypeError before the script runs
+            call = NativeCall(native=native, args=args, pos=identity.pos)
+        return Identifier(address=[call], pos=identity.pos)
 
     def get_identity(self):
-        identity = Identifier()
+        identity = Identifier(pos=self.current_token.pos)
         access_dot: bool = True
         while self.current_token.type in self.identity_handlers:
             token = self.current_token
@@ -140,63 +169,125 @@ class Parser:
             access_dot = True if token.type == TokenType.DOT else False
         if access_dot:
             raise Exception("Unexpected dot at the end of identifier")
+        if len(identity.address) == 1 and type(identity.address[0]) is NativeCall:
+            return identity.address[0] # a bare call, not a path into its result
         return identity
 
     def macro_print(self):
+        pos = self.current_token.pos
         self.eat(TokenType.AT)
         args = self.args()
-        if self.current_token.type not in (TokenType.SEMICOLON, TokenType.EOF):
+        if self.current_token.type not in (TokenType.SEMICOLON, TokenType.EOF, TokenType.RCURLY):
             raise Exception(f"Unexpected token after print arguments: {self.current_token.type}")
-        self.eat(self.current_token.type)
-        print_identifier = BuiltIns.get_identifier('print')
-        return Identifier(address=[FunctionCall(identifier=print_identifier, args=args)])
+        if self.current_token.type != TokenType.RCURLY: # the closing brace belongs to the block
+            self.eat(self.current_token.type)
+        return NativeCall(native=NATIVES['print'], args=args, pos=pos)
 
     def assignment(self, node: Type):
         token = self.current_token
         self.eat(token.type)
         value = self.expr()
         value = value if token.type == TokenType.ASSIGN else (
-            BinaryOperation(operator=AUGMENTED_ASSIGNMENT_TO_ARITHMETIC[token.type], left=node, right=value))
-        return Assign(identifier=node, value=value) # will raise if node is not an Identifier
+            BinaryOperation(operator=AUGMENTED_ASSIGNMENT_TO_ARITHMETIC[token.type], left=node, right=value, pos=node.pos))
+        return self.assign(node, value)
 
     def exponent(self):
         node = self.factor()
         while self.current_token.type == TokenType.EXPONENT:
             token = self.current_token
             self.eat(TokenType.EXPONENT)
-            node = BinaryOperation(operator=token.type, left=node, right=self.factor())
+            node = BinaryOperation(operator=token.type, left=node, right=self.factor(), pos=node.pos)
         return node
 
     def term(self):
         node = self.exponent()
-        while self.current_token.type in (TokenType.MULTIPLY, TokenType.DIVIDE):
+        while self.current_token.type in (TokenType.MULTIPLY, TokenType.DIVIDE, TokenType.MODULUS):
             token = self.current_token
             self.eat(token.type)
-            node = BinaryOperation(operator=token.type, left=node, right=self.exponent())
+            node = BinaryOperation(operator=token.type, left=node, right=self.exponent(), pos=node.pos)
         return node
 
-    def expr(self):
+    def sum(self):
         node = self.term()
         while self.current_token.type in (TokenType.PLUS, TokenType.MINUS):
             token = self.current_token
             self.eat(token.type)
-            node = BinaryOperation(operator=token.type, left=node, right=self.term())
+            node = BinaryOperation(operator=token.type, left=node, right=self.term(), pos=node.pos)
+        return node
+
+    def comparison(self):
+        node = self.sum()
+        while self.current_token.type in COMPARISON_TYPE_TO_CHAR:
+            token = self.current_token
+            self.eat(token.type)
+            node = BinaryOperation(operator=token.type, left=node, right=self.sum(), pos=node.pos)
+        return node
+
+    def expr(self):
+        node = self.comparison()
         if self.current_token.type in ASSIGNMENT_OPERATORS:
             return self.assignment(node)
         return node
 
+    def block(self) -> list[Type]:
+        self.eat(TokenType.LCURLY)
+        statements = []
+        while self.current_token.type not in (TokenType.RCURLY, TokenType.EOF):
+            if self.current_token.type == TokenType.SEMICOLON:
+                self.eat(TokenType.SEMICOLON)
+                continue
+            statements.append(self.statement())
+        self.eat(TokenType.RCURLY)
+        return statements
+
+    def if_statement(self, token: Token):
+        self.eat(TokenType.IF)
+        condition = self.comparison()
+        body = self.block()
+        orelse = []
+        if self.current_token.type == TokenType.ELSE:
+            self.eat(TokenType.ELSE)
+            orelse = [self.if_statement(self.current_token)] if self.current_token.type == TokenType.IF else self.block()
+        return If(condition=condition, body=body, orelse=orelse, pos=token.pos)
+
+    def while_statement(self, token: Token):
+        self.eat(TokenType.WHILE)
+        condition = self.comparison()
+        self.loop_depth += 1
+        try:
+            body = self.block()
+        finally:
+            self.loop_depth -= 1
+        return While(condition=condition, body=body, pos=token.pos)
+
+    def loop_jump(self, token: Token):
+        if not self.loop_depth:
+            raise Exception(f"'{token.value}' outside of a loop")
+        self.eat(token.type)
+        return Break(pos=token.pos) if token.type == TokenType.BREAK else Continue(pos=token.pos)
+
     def statement(self):
-        if self.current_token.type in RESERVED_KEYWORDS.values():
-            return # TODO handle reserved keywords
-        if self.current_token.type == TokenType.AT:
+        token = self.current_token
+        if token.type in RESERVED_KEYWORDS.values():
+            handler = self.keyword_handlers.get(token.type)
+            if handler is None:
+                raise Exception(f"Unexpected keyword: {token.value}")
+            return handler(token)
+        if token.type == TokenType.AT:
             return self.macro_print()
         return self.expr()
 
-    def parse(self):
-        ast = []
+    def statements(self) -> Iterator[Type]:
         while self.current_token.type != TokenType.EOF:
             if self.current_token.type in END_LINE_TOKENS:
                 self.eat(self.current_token.type)
                 continue
-            ast.append(self.statement())
-        return ast
+            statement = self.statement()
+            if self.strict:
+                validate(statement)
+            if self.hash_consing:
+                statement = self.hash_consing.share(statement)
+            yield statement
+
+    def parse(self):
+        return list(self.statements())
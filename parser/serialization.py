@@ -0,0 +1,97 @@
+import gc
+import marshal
+from contextlib import contextmanager
+
+from natives.natives import NATIVES
+
+from lexer.symbols import SYMBOLS
+from lexer.types import TokenType
+from parser.types import *
+
+
+FORMAT_VERSION = 5
+
+
+@contextmanager
+def gc_paused():
+    # decoding allocates only acyclic trees, so cyclic collections triggered by the allocation count are pure overhead
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+class Serializer:
+    def __init__(self):
+        # every record ends with the node's source offset
+        self.encoders = {
+            Number: lambda x: (0, x.value, x.pos),
+            String: lambda x: (1, x.value, x.pos),
+            Identifier: lambda x: (2, tuple(self.encode(part) for part in x.address), x.pos),
+            Array: lambda x: (3, tuple(self.encode(element) for element in x.elements), x.pos),
+            Object: lambda x: (4, tuple((self.encode(prop.key), self.encode(prop.value), prop.pos) for prop in x.properties), x.pos),
+            BinaryOperation: lambda x: (5, x.operator.value, self.encode(x.left), self.encode(x.right), x.pos),
+            FunctionCall: lambda x: (6, self.encode(x.identifier), tuple(self.encode(arg) for arg in x.args), x.pos),
+            Assign: lambda x: (7, self.encode(x.identifier), self.encode(x.value), x.return_mode, x.pos),
+            Symbol: lambda x: (8, x.value, x.pos), # symbol ids are per process, so names are re-interned on load
+            NativeCall: lambda x: (9, x.native.name, tuple(self.encode(arg) for arg in x.args), x.pos),
+            Boolean: lambda x: (10, x.value, x.pos),
+            If: lambda x: (11, self.encode(x.condition), self.encode_block(x.body), self.encode_block(x.orelse), x.pos),
+            While: lambda x: (12, self.encode(x.condition), self.encode_block(x.body), x.pos),
+            Break: lambda x: (13, x.pos),
+            Continue: lambda x: (14, x.pos),
+        }
+        self.decoders = {
+            0: lambda x: Number(value=x[1], pos=x[2]),
+            1: lambda x: String(value=x[1], pos=x[2]),
+            2: lambda x: Identifier(address=[self.decode(part) for part in x[1]], pos=x[2]),
+            3: lambda x: Array(elements=[self.decode(element) for element in x[1]], pos=x[2]),
+            4: lambda x: Object(properties=[ObjectProperty(key=self.decode(k), value=self.decode(v), pos=p) for k, v, p in x[1]], pos=x[2]),
+            5: lambda x: BinaryOperation(operator=TokenType(x[1]), left=self.decode(x[2]), right=self.decode(x[3]), pos=x[4]),
+            6: lambda x: FunctionCall(identifier=self.decode(x[1]), args=[self.decode(arg) for arg in x[2]], pos=x[3]),
+            7: lambda x: Assign(identifier=self.decode(x[1]), value=self.decode(x[2]), return_mode=x[3], pos=x[4]),
+            8: lambda x: self.symbol(x[1], x[2]),
+            9: lambda x: NativeCall(native=NATIVES[x[1]], args=[self.decode(arg) for arg in x[2]], pos=x[3]),
+            10: lambda x: Boolean(value=x[1], pos=x[2]),
+            11: lambda x: If(condition=self.decode(x[1]), body=self.decode_block(x[2]), orelse=self.decode_block(x[3]), pos=x[4]),
+            12: lambda x: While(condition=self.decode(x[1]), body=self.decode_block(x[2]), pos=x[3]),
+            13: lambda x: Break(pos=x[1]),
+            14: lambda x: Continue(pos=x[1]),
+        }
+
+    @staticmethod
+    def symbol(name: str, pos: int | None) -> Symbol:
+        symbol = SYMBOLS.intern(name)
+        return Symbol(value=SYMBOLS.name(symbol), symbol=symbol, pos=pos)
+
+    def encode(self, node):
+        if node is None:
+            return None
+        encoder = self.encoders.get(type(node))
+        if encoder is None:
+            raise TypeError(f"Cannot serialize node type: {type(node).__name__}")
+        return encoder(node)
+
+    def decode(self, data):
+        if data is None:
+            return None
+        return self.decoders[data[0]](data)
+
+    def encode_block(self, statements: list) -> tuple:
+        return tuple(self.encode(statement) for statement in statements)
+
+    def decode_block(self, data: tuple) -> list:
+        return [self.decode(statement) for statement in data]
+
+    def dumps(self, ast: list) -> bytes:
+        return marshal.dumps((FORMAT_VERSION, tuple(self.encode(statement) for statement in ast)))
+
+    def loads(self, data: bytes) -> list:
+        version, statements = marshal.loads(data)
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported AST format version: {version}")
+        with gc_paused():
+            return [self.decode(statement) for statement in statements]
@@ -1,19 +1,42 @@
-from pydantic import BaseModel, model_validator
-from typing import List, Any, Literal, Optional
+from typing import Any, Callable, Literal
 
-from lexer.types import TokenType, UNARY_OPERATORS
+from lexer.types import TokenType
 
 
-class Type(BaseModel):
+class Type:
+    __slots__ = ('pos',) # source offset of the node's first token, not part of its structure
+    fields: tuple[str, ...] = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.fields = tuple(field for klass in reversed(cls.__mro__) if klass is not Type
+                           for field in klass.__dict__.get('__slots__', ()))
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(getattr(self, f) == getattr(other, f) for f in self.fields)
+
+    def children(self):
+        for field in self.fields:
+            value = getattr(self, field)
+            if isinstance(value, Type):
+                yield value
+            elif isinstance(value, list):
+                yield from (item for item in value if isinstance(item, Type))
+
     def __repr__(self):
         return self.__str__()
 
 
 class Primitive(Type):
-    value: Any
+    __slots__ = ('value',)
+
+    def __init__(self, *, value: Any, pos: int | None = None):
+        self.value = value
+        self.pos = pos
 
 
 class Number(Primitive):
+    __slots__ = ()
     value: int | float
 
     def __str__(self):
@@ -21,14 +44,40 @@ class Number(Primitive):
 
 
 class String(Primitive):
+    __slots__ = ()
     value: str
 
     def __str__(self):
         return f"String({self.value})"
 
 
+class Boolean(Primitive):
+    __slots__ = ()
+    value: bool
+
+    def __str__(self):
+        return f"Boolean({self.value})"
+
+
+class Symbol(String):
+    # an identifier or property name, interned in the lexer's symbol table
+    __slots__ = ('symbol',)
+
+    def __init__(self, *, value: str, symbol: int, pos: int | None = None):
+        self.value = value
+        self.symbol = symbol
+        self.pos = pos
+
+    def __str__(self):
+        return f"Symbol({self.value})"
+
+
 class Identifier(Type):
-    address: List[Type] = list()
+    __slots__ = ('address',)
+
+    def __init__(self, *, address: list[Type] | None = None, pos: int | None = None):
+        self.address = address if address is not None else []
+        self.pos = pos
 
     @property
     def dereferenced(self) -> Number | String:
@@ -39,76 +88,131 @@ class Identifier(Type):
 
 
 class Array(Type):
-    elements: List[Type] = list()
+    __slots__ = ('elements',)
+
+    def __init__(self, *, elements: list[Type] | None = None, pos: int | None = None):
+        self.elements = elements if elements is not None else []
+        self.pos = pos
 
     def __str__(self):
         return f"Array({', '.join(str(e) for e in self.elements)})"
 
 
 class ObjectProperty(Type):
-    key: Primitive
-    value: Type
+    __slots__ = ('key', 'value')
+
+    def __init__(self, *, key: Primitive, value: Type, pos: int | None = None):
+        self.key = key
+        self.value = value
+        self.pos = pos
 
     def __str__(self):
         return f"ObjectProperty({self.key}: {self.value})"
 
-    @model_validator(mode='before')
-    @classmethod
-    def validate_object_property(cls, values):
-        if not isinstance(values['key'], Primitive):
-            raise ValueError(f'Object key must be a primitive type, got {type(values['key']).__name__}')
-        return values
-
 
 class Object(Type):
-    properties: List[ObjectProperty] = []
+    __slots__ = ('properties',)
+
+    def __init__(self, *, properties: list[ObjectProperty] | None = None, pos: int | None = None):
+        self.properties = properties if properties is not None else []
+        self.pos = pos
 
     def __str__(self):
         return f"Object({self.properties})"
 
 
 class BinaryOperation(Type):
-    operator: Literal[TokenType.PLUS, TokenType.MINUS, TokenType.MULTIPLY, TokenType.DIVIDE, TokenType.EXPONENT, TokenType.INCREMENT, TokenType.DECREMENT]
-    left: Type
-    right: Optional[Type]
+    __slots__ = ('operator', 'left', 'right')
+
+    def __init__(self, *, operator: TokenType, left: Type, right: Type, pos: int | None = None):
+        self.operator = operator
+        self.left = left
+        self.right = right
+        self.pos = pos
 
     def __str__(self):
         return f"BinaryOperation({self.left} {self.operator.value} {self.right})"
 
-    @model_validator(mode='before')
-    @classmethod
-    def validate_binary_operation(cls, values):
-        if values['operator'] in UNARY_OPERATORS:
-            values['right'] = Number(value=1)
-            if values['operator'] == TokenType.INCREMENT:
-                values['operator'] = TokenType.PLUS
-            elif values['operator'] == TokenType.DECREMENT:
-                values['operator'] = TokenType.MINUS
-        elif values['right'] is None:
-            raise ValueError("BinaryOperation requires a right operand for non-unary operators")
-        return values
 
 class FunctionCall(Type):
-    identifier: Identifier # identifier of the function
-    args: List[Type] = list()
+    __slots__ = ('identifier', 'args')
+
+    def __init__(self, *, identifier: Identifier, args: list[Type] | None = None, pos: int | None = None):
+        self.identifier = identifier # identifier of the function
+        self.args = args if args is not None else []
+        self.pos = pos
 
     def __str__(self):
         return f'{self.identifier.__str__()}({self.args})'
 
 
+class NativeCall(Type):
+    # a call to a built-in function, resolved to its Native (natives/natives.py) and arity-checked when parsed
+    __slots__ = ('native', 'args')
+
+    def __init__(self, *, native: Callable, args: list[Type] | None = None, pos: int | None = None):
+        self.native = native
+        self.args = args if args is not None else []
+        self.pos = pos
+
+    def __str__(self):
+        return f"NativeCall({self.native.name}({self.args}))"
+
+
 class Assign(Type):
-    identifier: Identifier
-    value: Type
-    return_mode: Literal['before', 'after'] = 'after'
+    __slots__ = ('identifier', 'value', 'return_mode')
+
+    def __init__(self, *, identifier: Identifier, value: Type, return_mode: Literal['before', 'after'] = 'after', pos: int | None = None):
+        self.identifier = identifier
+        self.value = value
+        self.return_mode = return_mode
+        self.pos = pos
 
     def __str__(self):
         return f"Assign({self.identifier} = {self.value})"
 
-    @model_validator(mode='before')
-    @classmethod
-    def validate_assign(cls, values):
-        if not isinstance(values['identifier'], Identifier):
-            raise ValueError(f"Cannot assign value to non-identifier: {type(values['identifier']).__name__}")
-        if not isinstance(values['value'], Type):
-            raise ValueError(f"Assign value must be a Type, got {type(values['value']).__name__}")
-        return values
+
+class If(Type):
+    __slots__ = ('condition', 'body', 'orelse')
+
+    def __init__(self, *, condition: Type, body: list[Type] | None = None, orelse: list[Type] | None = None,
+                 pos: int | None = None):
+        self.condition = condition
+        self.body = body if body is not None else []
+        self.orelse = orelse if orelse is not None else [] # `else if` is an If as the only statement here
+        self.pos = pos
+
+    def __str__(self):
+        return f"If({self.condition}: {self.body} else {self.orelse})"
+
+
+class While(Type):
+    __slots__ = ('condition', 'body')
+
+    def __init__(self, *, condition: Type, body: list[Type] | None = None, pos: int | None = None):
+        self.condition = condition
+        self.body = body if body is not None else []
+        self.pos = pos
+
+    def __str__(self):
+        return f"While({self.condition}: {self.body})"
+
+
+class Break(Type):
+    __slots__ = ()
+
+    def __init__(self, *, pos: int | None = None):
+        self.pos = pos
+
+    def __str__(self):
+        return "Break"
+
+
+class Continue(Type):
+    __slots__ = ()
+
+    def __init__(self, *, pos: int | None = None):
+        self.pos = pos
+
+    def __str__(self):
+        return "Continue"
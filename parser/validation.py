@@ -0,0 +1,144 @@
+from natives.natives import NATIVES
+from lexer.symbols import SYMBOLS
+from lexer.types import BINARY_OPERATOR_TO_CHAR
+from parser.types import *
+
+
+def validate_number(node: Number):
+    if type(node.value) not in (int, float):
+        raise ValueError(f"Number value must be int or float, got {type(node.value).__name__}")
+
+
+def validate_string(node: String):
+    if not isinstance(node.value, str):
+        raise ValueError(f"String value must be str, got {type(node.value).__name__}")
+
+
+def validate_boolean(node: Boolean):
+    if type(node.value) is not bool:
+        raise ValueError(f"Boolean value must be bool, got {type(node.value).__name__}")
+
+
+def validate_symbol(node: Symbol):
+    validate_string(node)
+    if not isinstance(node.symbol, int) or not SYMBOLS.matches(node.symbol, node.value):
+        raise ValueError(f"Symbol {node.value!r} does not match symbol id {node.symbol}")
+
+
+def validate_identifier(node: Identifier):
+    for part in node.address:
+        validate(part)
+
+
+def validate_array(node: Array):
+    for element in node.elements:
+        validate(element)
+
+
+def validate_object_property(node: ObjectProperty):
+    if not isinstance(node.key, Primitive):
+        raise ValueError(f"Object key must be a primitive type, got {type(node.key).__name__}")
+    validate(node.key)
+    validate(node.value)
+
+
+def validate_object(node: Object):
+    for prop in node.properties:
+        if not isinstance(prop, ObjectProperty):
+            raise ValueError(f"Object property must be an ObjectProperty, got {type(prop).__name__}")
+        validate(prop)
+
+
+def validate_binary_operation(node: BinaryOperation):
+    if node.operator not in BINARY_OPERATOR_TO_CHAR:
+        raise ValueError(f"Unsupported binary operator: {node.operator}")
+    if node.right is None:
+        raise ValueError("BinaryOperation requires a right operand for non-unary operators")
+    validate(node.left)
+    validate(node.right)
+
+
+def validate_function_call(node: FunctionCall):
+    validate(node.identifier)
+    for arg in node.args:
+        validate(arg)
+
+
+def validate_native_call(node: NativeCall):
+    if NATIVES.get(getattr(node.native, 'name', None)) is not node.native:
+        raise ValueError(f"Unknown built-in function: {node.native!r}")
+    node.native.check_arity(len(node.args))
+    for arg in node.args:
+        validate(arg)
+
+
+def validate_assign(node: Assign):
+    if not isinstance(node.identifier, Identifier):
+        raise ValueError(f"Cannot assign value to non-identifier: {type(node.identifier).__name__}")
+    if node.identifier.address and type(node.identifier.address[0]) is NativeCall:
+        raise ValueError(f"Cannot assign value to the result of {node.identifier.address[0].native.name}()")
+    if not isinstance(node.value, Type):
+        raise ValueError(f"Assign value must be a Type, got {type(node.value).__name__}")
+    if node.return_mode not in ('before', 'after'):
+        raise ValueError(f"Invalid assign return mode: {node.return_mode}")
+    validate(node.identifier)
+    validate(node.value)
+
+
+def validate_block(statements: list, loops: int = 0):
+    if not isinstance(statements, list):
+        raise ValueError(f"Block must be a list of statements, got {type(statements).__name__}")
+    for statement in statements:
+        validate(statement, loops)
+
+
+def validate_if(node: If, loops: int = 0):
+    validate(node.condition)
+    validate_block(node.body, loops)
+    validate_block(node.orelse, loops)
+
+
+def validate_while(node: While, loops: int = 0):
+    validate(node.condition)
+    validate_block(node.body, loops + 1)
+
+
+def validate_loop_jump(node: Break | Continue, loops: int = 0):
+    # the parser only creates them inside a while body, but cached and hand-built trees skip the parser
+    if not loops:
+        raise ValueError(f"{type(node).__name__} outside of a loop")
+
+
+VALIDATORS = {
+    Number: validate_number,
+    String: validate_string,
+    Boolean: validate_boolean,
+    Symbol: validate_symbol,
+    Identifier: validate_identifier,
+    Array: validate_array,
+    ObjectProperty: validate_object_property,
+    Object: validate_object,
+    BinaryOperation: validate_binary_operation,
+    FunctionCall: validate_function_call,
+    NativeCall: validate_native_call,
+    Assign: validate_assign,
+}
+
+# statements that can hold a break or continue, validated with the number of while loops around them
+BLOCK_VALIDATORS = {
+    If: validate_if,
+    While: validate_while,
+    Break: validate_loop_jump,
+    Continue: validate_loop_jump,
+}
+
+
+def validate(node: Type, loops: int = 0):
+    validator = BLOCK_VALIDATORS.get(type(node))
+    if validator is not None:
+        validator(node, loops)
+        return
+    validator = VALIDATORS.get(type(node))
+    if validator is None:
+        raise ValueError(f"Unsupported node type: {type(node).__name__}")
+    validator(node)
@@ -0,0 +1,73 @@
+import argparse
+import json
+import os
+import socket
+import sys
+import time
+
+# the client only needs the standard library, so it starts in a fraction of the time main.py takes to import
+# the interpreter
+DEFAULT_SOCKET = os.environ.get('SABAN_SOCKET') or os.path.join(os.environ.get('TMPDIR', '/tmp'),
+                                                                 f'saban-{os.getuid()}.sock')
+
+
+class Client:
+    # one connection to the daemon; requests and replies are single JSON lines, several per connection
+    def __init__(self, path: str = DEFAULT_SOCKET):
+        self.connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.connection.connect(path)
+        self.replies = self.connection.makefile('rb')
+
+    def request(self, message: dict) -> dict:
+        self.connection.sendall(json.dumps(message).encode() + b'\n')
+        line = self.replies.readline()
+        if not line:
+            raise ConnectionError("The daemon closed the connection without replying")
+        return json.loads(line)
+
+    def run(self, source: str, name: str = '<client>') -> dict:
+        return self.request({'source': source, 'name': name})
+
+    def stats(self) -> dict:
+        return self.request({'command': 'stats'})
+
+    def close(self):
+        self.replies.close()
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description='run a Saban script on a running daemon (python -m server.daemon)')
+    arg_parser.add_argument('script', nargs='?', help="script to run, '-' for standard input")
+    arg_parser.add_argument('--socket', default=DEFAULT_SOCKET)
+    arg_parser.add_argument('--stats', action='store_true', help="print the daemon's latency statistics")
+    arg_parser.add_argument('--json', action='store_true', help='print the whole reply as JSON')
+    args = arg_parser.parse_args()
+    if not args.stats and not args.script:
+        arg_parser.error('a script is required unless --stats is given')
+
+    start = time.perf_counter()
+    with Client(args.socket) as client:
+        if args.stats:
+            print(json.dumps(client.stats(), indent=2))
+            sys.exit(0)
+        source = sys.stdin.read() if args.script == '-' else open(args.script).read()
+        reply = client.run(source, args.script)
+    if args.json:
+        print(json.dumps(reply))
+    else:
+        sys.stdout.write(reply['output'])
+        if reply['ok']:
+            print(json.dumps(reply['memory']))
+        else:
+            print(reply['error'], file=sys.stderr)
+        print(f"{'ok' if reply['ok'] else 'failed'} in {(time.perf_counter() - start) * 1e3:.1f}ms "
+              f"(daemon latency {reply['latency_seconds'] * 1e3:.1f}ms, run {reply['run_seconds'] * 1e3:.1f}ms)",
+              file=sys.stderr)
+    sys.exit(0 if reply['ok'] else 1)
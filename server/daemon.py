@@ -0,0 +1,156 @@
+import argparse
+import asyncio
+import json
+import os
+import signal
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from batch.batch import encode, failed, init_worker, run_source
+from engines import ENGINES
+from server.client import DEFAULT_SOCKET
+
+
+class LatencyStats:
+    # latency of the most recent requests, from the request line arriving to its reply being ready
+    def __init__(self, window: int = 10000):
+        self.latencies: deque[float] = deque(maxlen=window)
+        self.requests = 0
+        self.failures = 0
+
+    def record(self, seconds: float, ok: bool):
+        self.latencies.append(seconds)
+        self.requests += 1
+        self.failures += not ok
+
+    def summary(self) -> dict:
+        ordered = sorted(self.latencies)
+
+        def percentile(fraction: float) -> float:
+            return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)] * 1e3 if ordered else 0.0
+
+        return {
+            'requests': self.requests,
+            'failures': self.failures,
+            'mean_ms': sum(ordered) / len(ordered) * 1e3 if ordered else 0.0,
+            'p50_ms': percentile(0.5),
+            'p95_ms': percentile(0.95),
+            'p99_ms': percentile(0.99),
+            'max_ms': ordered[-1] * 1e3 if ordered else 0.0,
+        }
+
+
+class Daemon:
+    # Serves scripts over a Unix socket. Each request is a JSON line {"source": ..., "name": ...} and gets one JSON
+    # line back: the batch runner's result (output, memory, timings) plus latency_seconds, or the latency
+    # statistics for {"command": "stats"}. Scripts run on a pool of worker processes forked from this one once
+    # everything is imported, so a request pays for neither interpreter startup nor imports, and clients are
+    # served concurrently up to the number of workers.
+    def __init__(self, path: str = DEFAULT_SOCKET, workers: int | None = None, engine: str = 'tree',
+                 optimize: bool = True, timeout: float | None = None, cache_dir: str | None = None, log: bool = True):
+        self.path = path
+        self.workers = workers or os.cpu_count() or 1
+        self.worker_args = (engine, optimize, timeout, cache_dir)
+        self.log = log
+        self.stats = LatencyStats()
+        self.executor: ProcessPoolExecutor | None = None
+
+    def start_pool(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=init_worker,
+                                            initargs=self.worker_args)
+
+    async def warm_up(self):
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.executor, run_source, '', '<warm-up>')
+                               for _ in range(self.workers)))
+
+    async def run(self, source: str, name: str) -> dict:
+        executor = self.executor
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, run_source, source, name)
+        except BrokenProcessPool as e:
+            # a worker died and the next request gets a fresh pool; every request in flight on the broken pool
+            # fails here, and only the first one replaces it, so requests queued on the new pool are not cancelled
+            if self.executor is executor:
+                self.start_pool()
+            return failed(name, f'BrokenProcessPool: {e}')
+
+    async def respond(self, line: bytes) -> str:
+        # the reply is encoded before the request is counted, so a result that cannot be encoded is both sent and
+        # recorded as a failure
+        received = time.perf_counter()
+        try:
+            request = json.loads(line)
+            if request.get('command') == 'stats':
+                return json.dumps(self.stats.summary())
+            name = str(request.get('name', '<request>'))
+            source = request['source']
+        except (ValueError, KeyError, AttributeError) as e:
+            error = failed('<request>', f"Invalid request: {type(e).__name__}: {e}")
+            return json.dumps(error | {'latency_seconds': 0.0})
+        result = await self.run(source, name)
+        result['latency_seconds'] = latency = time.perf_counter() - received
+        reply, ok = encode(result)
+        self.stats.record(latency, ok)
+        if self.log:
+            print(f"{name}: {'ok' if ok else 'failed'} in {latency * 1e3:.1f}ms "
+                  f"(parse {result['parse_seconds'] * 1e3:.1f}ms, run {result['run_seconds'] * 1e3:.1f}ms, "
+                  f"worker {result['worker']})", file=sys.stderr, flush=True)
+        return reply
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while line := await reader.readline():
+                reply = await self.respond(line)
+                writer.write(reply.encode() + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass # the client went away, its request still ran
+        finally:
+            writer.close()
+
+    async def serve(self, ready: asyncio.Event | None = None):
+        # the pool is forked before the socket and signal handlers exist, so workers inherit neither
+        self.start_pool()
+        await self.warm_up()
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signal_number in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signal_number, stop.set)
+        if os.path.exists(self.path):
+            os.unlink(self.path) # left behind by a daemon that did not shut down cleanly
+        server = await asyncio.start_unix_server(self.handle, path=self.path, limit=2 ** 26)
+        if self.log:
+            print(f"listening on {self.path} with {self.workers} workers", file=sys.stderr, flush=True)
+        if ready is not None:
+            ready.set()
+        try:
+            async with server:
+                await stop.wait()
+        finally:
+            for signal_number in (signal.SIGINT, signal.SIGTERM):
+                loop.remove_signal_handler(signal_number)
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+            self.executor.shutdown(cancel_futures=True)
+            if self.log:
+                print(json.dumps(self.stats.summary()), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description='keep Saban interpreters warm behind a Unix socket')
+    arg_parser.add_argument('--socket', default=DEFAULT_SOCKET)
+    arg_parser.add_argument('--workers', type=int, help='defaults to the number of CPUs')
+    arg_parser.add_argument('--engine', choices=ENGINES, default='tree')
+    arg_parser.add_argument('--no-optimize', action='store_true')
+    arg_parser.add_argument('--timeout', type=float, help='per-script time limit in seconds')
+    arg_parser.add_argument('--cache-dir', help='reuse parsed ASTs from this directory')
+    arg_parser.add_argument('--quiet', action='store_true', help='do not log every request')
+    args = arg_parser.parse_args()
+    asyncio.run(Daemon(args.socket, args.workers, args.engine, not args.no_optimize, args.timeout, args.cache_dir,
+                       log=not args.quiet).serve())
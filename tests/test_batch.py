@@ -0,0 +1,60 @@
+import json
+import os
+import signal
+import tempfile
+import unittest
+
+from batch.batch import discover, encode, run_batch
+
+
+class BatchRunner(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def script(self, name: str, source: str) -> str:
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w') as file:
+            file.write(source)
+        return path
+
+    def test_results_and_failures(self):
+        self.script('ok.sb', "a = 1; b = a + 1;")
+        self.script('missing.sb', "a = b;")
+        self.script('cycle.sb', "self = {}; self.me = [self]; n = len(self.me);")
+        self.script('notes.txt', "not a script")
+        results = {os.path.basename(result['path']): result for result in
+                   run_batch(discover(self.directory.name), workers=2)}
+        self.assertEqual(sorted(results), ['cycle.sb', 'missing.sb', 'ok.sb'])
+        self.assertEqual(results['ok.sb']['memory'], {'a': 1, 'b': 2})
+        self.assertEqual(results['ok.sb']['output'], "1\n2\n{'a': 1, 'b': 2}\n")
+        self.assertEqual(results['missing.sb']['error'], "KeyError: \"Identifier 'b' not found in memory\"")
+        line, ok = encode(results['cycle.sb'])
+        self.assertTrue(ok)
+        self.assertEqual(json.loads(line)['memory'], {'self': {'me': ['{...}']}, 'n': 1})
+
+    def test_manifest(self):
+        path = self.script('a.sb', "a = 1;")
+        manifest = self.script('manifest', "# scripts\na.sb\n\n")
+        self.assertEqual(discover(manifest), [path])
+
+    def test_timeout(self):
+        path = self.script('slow.sb', "a = 1;" * 200000)
+        result, = run_batch([path], workers=1, timeout=0.05)
+        self.assertFalse(result['ok'])
+        self.assertTrue(result['error'].startswith('ScriptTimeout'))
+
+    def test_batch_goes_on_after_a_worker_dies(self):
+        paths = [self.script(f'{i}.sb', "a = 1;" * 30000) for i in range(8)]
+        results = run_batch(paths, workers=1)
+        first = next(results)
+        os.kill(first['worker'], signal.SIGKILL)
+        rest = list(results)
+        self.assertEqual(len(rest), 7)
+        self.assertTrue(any(result['error'] and 'BrokenProcessPool' in result['error'] for result in rest))
+        self.assertTrue(rest[-1]['ok'])
+        self.assertNotEqual(rest[-1]['worker'], first['worker'])
+
+
+if __name__ == '__main__':
+    unittest.main()
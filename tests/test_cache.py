@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+
+from parser.cache import ParseCache
+from test_parity import SCRIPTS, parse
+
+
+class ParseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def cache(self, **options) -> ParseCache:
+        return ParseCache(self.directory.name, **options)
+
+    def age(self, cache: ParseCache, source: str, mtime: float):
+        os.utime(cache.path(cache.key(source)), (mtime, mtime))
+
+    def test_hits_load_the_parsed_tree(self):
+        cache = self.cache()
+        for source in SCRIPTS.values():
+            cache.parse(source)
+        reopened = self.cache()
+        for name, source in SCRIPTS.items():
+            with self.subTest(script=name):
+                self.assertEqual(reopened.parse(source), parse(source))
+        self.assertEqual((reopened.hits, reopened.misses), (len(SCRIPTS), 0))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        sources = [f"a{i} = {i};" for i in range(3)]
+        cache = self.cache()
+        for i, source in enumerate(sources):
+            cache.parse(source)
+            self.age(cache, source, 1000 + i)
+        size = cache.total_bytes // 3
+        cache.max_bytes = 3 * size + size // 2
+        cache.parse(sources[0]) # a hit refreshes the mtime, so the oldest entry is now sources[1]
+        cache.parse("a3 = 3;")
+        self.assertEqual(cache.evictions, 1)
+        self.assertFalse(os.path.exists(cache.path(cache.key(sources[1]))))
+        for source in (sources[0], sources[2], "a3 = 3;"):
+            self.assertTrue(os.path.exists(cache.path(cache.key(source))))
+        self.assertLessEqual(cache.total_bytes, cache.max_bytes)
+
+    def test_hit_refreshes_the_mtime(self):
+        cache = self.cache()
+        cache.parse("a = 1;")
+        self.age(cache, "a = 1;", 1000)
+        cache.parse("a = 1;")
+        self.assertGreater(os.path.getmtime(cache.path(cache.key("a = 1;"))), 1000)
+
+    def test_corrupt_entries_are_misses(self):
+        cache = self.cache()
+        cache.parse("a = 1;")
+        with open(cache.path(cache.key("a = 1;")), 'wb') as file:
+            file.write(b'not an ast')
+        self.assertEqual(cache.parse("a = 1;"), parse("a = 1;"))
+        self.assertEqual((cache.hits, cache.misses), (0, 2))
+
+    def test_stats(self):
+        cache = self.cache()
+        cache.parse("a = 1;")
+        cache.parse("a = 1;")
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['hit_rate'], stats['evictions']), (1, 1, 0.5, 0))
+        self.assertEqual(stats['bytes'], os.path.getsize(cache.path(cache.key("a = 1;"))))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import asyncio
+import unittest
+
+from interpreter.interpreter import BREAK, Interpreter
+from parser.serialization import Serializer
+from parser.types import Boolean, If, While
+from test_parity import ENGINE_RUNS, outcome, parse
+from vm.scheduler import AsyncScript, BudgetExceeded
+from vm.vm import VM, Frame
+
+
+LOOP = "i = 0; total = 0; while i < 10 { i += 1; if i % 3 == 0 { continue; } else if i > 7 { break; } total += i; }"
+
+
+class Parsing(unittest.TestCase):
+    def test_else_if_nests_an_if(self):
+        statement, = parse("if a { b = 1; } else if c { b = 2; } else { b = 3; }")
+        self.assertIs(type(statement), If)
+        nested, = statement.orelse
+        self.assertIs(type(nested), If)
+        self.assertEqual(len(nested.orelse), 1)
+
+    def test_comparisons_bind_looser_than_arithmetic(self):
+        statement, = parse("a = 1 + 2 < 2 * 2;")
+        self.assertEqual(statement.value.operator.name, 'LESS')
+        self.assertEqual(parse("a = true; b = false;")[1].value, Boolean(value=False))
+
+    def test_invalid_blocks(self):
+        for source in ("if a { b = 1;", "while { }", "continue;", "if a { break; }", "fn = 1;", "return 1;"):
+            with self.subTest(source=source), self.assertRaises(Exception):
+                parse(source)
+
+    def test_serialized(self):
+        ast = parse(LOOP)
+        self.assertEqual(Serializer().loads(Serializer().dumps(ast)), ast)
+
+
+class Running(unittest.TestCase):
+    def assertEnginesPrint(self, source: str, expected: str):
+        for engine, run in ENGINE_RUNS.items():
+            with self.subTest(engine=engine):
+                self.assertEqual(outcome(lambda: run(parse(source))), expected)
+
+    def test_loop_results(self):
+        # an if or while statement prints None, it has no result of its own
+        self.assertEnginesPrint(LOOP, "0\n0\nNone\n{'i': 8, 'total': 19}\n")
+
+    def test_conditions_use_truthiness(self):
+        self.assertEnginesPrint("a = []; if a { b = 1; } else { b = 2; } if 'x' { c = 3; } while a { }",
+                                "[]\nNone\nNone\nNone\n{'a': [], 'b': 2, 'c': 3}\n")
+
+    def test_comparisons(self):
+        self.assertEnginesPrint("a = [1 < 2.5, 'a' >= 'b', 1 == 1.0, [1] != {}, 'x' == 1, 2 <= 2];",
+                                "[True, False, True, True, False, True]\n{'a': [True, False, True, True, False, True]}\n")
+        self.assertIn("Unsupported operand types for <: 'str' and 'int'",
+                      outcome(lambda: Interpreter(parse("a = 'a' < 1;")).interpret()))
+
+    def test_break_does_not_leave_the_block_result(self):
+        interpreter = Interpreter(parse("while true { break; }"))
+        self.assertIsNot(interpreter.interpret_type(interpreter.ast[0]), BREAK)
+
+
+class Budgets(unittest.TestCase):
+    def test_executed_counts_every_iteration(self):
+        # backward jumps must not let a budgeted run go past its limit, or count differently from a full one
+        source = "i = 0; while i < 50 { i += 1; }"
+        totals = {}
+        for limit in (None, 7):
+            vm = VM(parse(source))
+            totals[limit] = 0
+            for statement in vm.ast:
+                frame = Frame(vm.compiler.compile(statement))
+                executed = 0
+                while not vm.resume(frame, limit):
+                    self.assertEqual(frame.executed - executed, limit)
+                    executed = frame.executed
+                totals[limit] += frame.executed
+            self.assertEqual(vm.memory, {'i': 50})
+        self.assertEqual(totals[7], totals[None])
+        self.assertGreater(totals[None], 50 * 3)
+
+    def test_budget_stops_an_endless_loop(self):
+        script = AsyncScript(parse("i = 0; while true { i += 1; }"), slice_size=64, budget=1000)
+        with self.assertRaises(BudgetExceeded):
+            asyncio.run(script.run())
+        self.assertEqual(script.executed, 1000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+
+from interpreter.interpreter import Interpreter
+from test_parity import parse
+
+
+def run(interpreter: Interpreter) -> str:
+    with redirect_stdout(io.StringIO()) as output:
+        interpreter.interpret()
+    return output.getvalue()
+
+
+class Forking(unittest.TestCase):
+    def setUp(self):
+        self.base = Interpreter(parse("a = {'b': [1, 2], 'c': {'d': 3}}; e = a.b; f = 'x';"))
+        run(self.base)
+
+    def memory(self, interpreter: Interpreter) -> dict:
+        return interpreter.resolved(interpreter.memory)
+
+    def test_writes_stay_on_their_side(self):
+        fork = self.base.fork(parse("a.b[0] = 9; f = 'y'; g = 1;"))
+        run(fork)
+        self.assertEqual(self.memory(fork), {'a': {'b': [9, 2], 'c': {'d': 3}}, 'e': [9, 2], 'f': 'y', 'g': 1})
+        self.assertEqual(self.memory(self.base), {'a': {'b': [1, 2], 'c': {'d': 3}}, 'e': [1, 2], 'f': 'x'})
+        run(self.base.fork(parse("a.c.d = 4;")))
+        self.assertEqual(self.memory(self.base)['a']['c'], {'d': 3})
+
+    def test_aliases_see_the_copy(self):
+        fork = self.base.fork(parse("e[1] = 7; x = a.b; a.b[0] += e[1];"))
+        output = run(fork)
+        self.assertEqual(self.memory(fork)['a']['b'], [8, 7])
+        self.assertEqual(self.memory(fork)['x'], [8, 7])
+        self.assertEqual(output.splitlines()[-1], str(self.memory(fork)))
+
+    def test_copies_compare_equal(self):
+        fork = self.base.fork(parse("e[0] = 1; g = a.b == e; h = a.c == {'d': 3}; i = a.b != [1, 2];"))
+        run(fork)
+        self.assertEqual([self.memory(fork)[name] for name in 'ghi'], [True, True, False])
+
+    def test_base_writes_after_a_fork_are_not_seen(self):
+        fork = self.base.fork(parse("y = a.b;"))
+        self.base.interpret_type(parse("a.b[0] = 5;")[0])
+        run(fork)
+        self.assertEqual(self.memory(fork)['y'], [1, 2])
+        self.assertEqual(self.memory(self.base)['e'], [5, 2])
+
+    def test_forks_of_forks(self):
+        child = self.base.fork(parse("a.b[0] = 10;"))
+        run(child)
+        grandchild = child.fork(parse("a.b[1] = 20;"))
+        run(grandchild)
+        self.assertEqual(self.memory(grandchild)['e'], [10, 20])
+        self.assertEqual(self.memory(child)['e'], [10, 2])
+        self.assertEqual(self.memory(self.base)['e'], [1, 2])
+
+    def test_forks_see_the_memory_they_were_forked_from(self):
+        # enough forks, with writes in between, for the shared translations to be flattened more than once
+        base = Interpreter(parse("a = {'b': [0]}; c = a.b;"))
+        run(base)
+        forks = []
+        with redirect_stdout(io.StringIO()):
+            for i in range(50):
+                base.interpret_type(parse(f"a.b[0] = {i};")[0])
+                forks.append(base.fork(parse("c[0] += 100;")))
+                forks[-1].interpret()
+        for i, fork in enumerate(forks):
+            self.assertEqual(fork.resolved(fork.memory), {'a': {'b': [i + 100]}, 'c': [i + 100]})
+        self.assertEqual(base.resolved(base.memory), {'a': {'b': [49]}, 'c': [49]})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import asyncio
+import json
+import os
+import signal
+import tempfile
+import unittest
+
+from batch.batch import failed
+from server.client import Client
+from server.daemon import Daemon, LatencyStats
+
+
+class Latencies(unittest.TestCase):
+    def test_summary(self):
+        stats = LatencyStats(window=100)
+        for i in range(1, 201):
+            stats.record(i / 1000, ok=i % 50 != 0)
+        summary = stats.summary()
+        self.assertEqual((summary['requests'], summary['failures']), (200, 4))
+        # only the window is kept: 101ms to 200ms
+        self.assertAlmostEqual(summary['mean_ms'], 150.5)
+        self.assertAlmostEqual(summary['p50_ms'], 151)
+        self.assertAlmostEqual(summary['p99_ms'], 200)
+        self.assertAlmostEqual(summary['max_ms'], 200)
+
+    def test_empty_summary(self):
+        self.assertEqual(LatencyStats().summary()['p95_ms'], 0.0)
+
+
+class Requests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.daemon = Daemon(workers=2, log=False)
+        self.daemon.start_pool()
+        self.addCleanup(lambda: self.daemon.executor.shutdown(cancel_futures=True))
+
+    async def request(self, message: dict) -> dict:
+        return json.loads(await self.daemon.respond(json.dumps(message).encode()))
+
+    async def test_replies_and_stats(self):
+        reply = await self.request({'source': "a = 1; b = a + 1;", 'name': 'ok'})
+        self.assertTrue(reply['ok'])
+        self.assertEqual((reply['path'], reply['memory']), ('ok', {'a': 1, 'b': 2}))
+        self.assertEqual(reply['output'], "1\n2\n{'a': 1, 'b': 2}\n")
+        self.assertGreater(reply['latency_seconds'], 0)
+        reply = await self.request({'source': "a = b;"})
+        self.assertEqual(reply['error'], "KeyError: \"Identifier 'b' not found in memory\"")
+        stats = await self.request({'command': 'stats'})
+        self.assertEqual((stats['requests'], stats['failures']), (2, 1))
+
+    async def test_invalid_requests(self):
+        for line in (b'not json', b'[]', b'{"name": "no source"}'):
+            with self.subTest(line=line):
+                reply = json.loads(await self.daemon.respond(line))
+                self.assertFalse(reply['ok'])
+                self.assertTrue(reply['error'].startswith('Invalid request'))
+        self.assertEqual(self.daemon.stats.requests, 0)
+
+    async def test_unencodable_reply_is_a_failure(self):
+        nested = []
+        for _ in range(100000):
+            nested = [nested]
+
+        async def run(source: str, name: str) -> dict:
+            return failed(name, '') | {'ok': True, 'error': None, 'memory': {'a': nested}}
+
+        self.daemon.run = run
+        reply = await self.request({'source': ''})
+        self.assertFalse(reply['ok'])
+        self.assertTrue(reply['error'].startswith('Cannot encode the memory: RecursionError'))
+        self.assertEqual(self.daemon.stats.failures, 1)
+
+    async def test_pool_is_replaced_once_after_a_worker_dies(self):
+        replaced = []
+        start_pool = self.daemon.start_pool
+
+        def counting_start_pool():
+            replaced.append(True)
+            start_pool()
+
+        self.daemon.start_pool = counting_start_pool
+        slow = [asyncio.create_task(self.request({'source': "a = 1;" * 100000, 'name': str(i)})) for i in range(4)]
+        while not self.daemon.executor._processes:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.1)
+        os.kill(next(iter(self.daemon.executor._processes)), signal.SIGKILL)
+        replies = await asyncio.gather(*slow)
+        self.assertTrue(any(reply['error'] and reply['error'].startswith('BrokenProcessPool') for reply in replies))
+        self.assertEqual(len(replaced), 1)
+        reply = await self.request({'source': "a = 1;"})
+        self.assertTrue(reply['ok'])
+
+
+class Serving(unittest.IsolatedAsyncioTestCase):
+    async def test_client_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            daemon = Daemon(os.path.join(directory, 'daemon.sock'), workers=1, log=False)
+            ready = asyncio.Event()
+            serving = asyncio.create_task(daemon.serve(ready))
+            await ready.wait()
+
+            def talk():
+                with Client(daemon.path) as client:
+                    return client.run("a = [1] * 2;", 'client'), client.stats()
+
+            reply, stats = await asyncio.to_thread(talk)
+            serving.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await serving
+            self.assertEqual(reply['memory'], {'a': [1, 1]})
+            self.assertEqual(stats['requests'], 1)
+            self.assertFalse(os.path.exists(daemon.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+
+from interpreter.interpreter import Interpreter
+from lexer.lexer import Lexer
+from parser.hash_consing import HashConsing
+from parser.parser import Parser
+from test_parity import ENGINE_RUNS, optimized, outcome, parse
+
+
+def hash_consed(source: str, hash_consing: HashConsing | None = None) -> list:
+    parser = Parser(Lexer(source), hash_cons=True)
+    if hash_consing is not None:
+        parser.hash_consing = hash_consing
+    return parser.parse()
+
+
+class HashConsingShares(unittest.TestCase):
+    def test_equal_subtrees_are_shared(self):
+        first, second = hash_consed("a = [1, 2] + b.c; d = [1, 2] + b.c;")
+        self.assertIs(first.value, second.value)
+        self.assertIsNot(first.identifier, second.identifier)
+        self.assertEqual([first, second], parse("a = [1, 2] + b.c; d = [1, 2] + b.c;"))
+
+    def test_shared_nodes_keep_their_first_position(self):
+        first, second = hash_consed("a = 1 + 2;\nb = 1 + 2;")
+        self.assertIs(second.value, first.value)
+        self.assertEqual(second.value.pos, first.value.pos)
+
+    def test_equal_values_of_other_types_stay_apart(self):
+        hash_consing = HashConsing()
+        # the optimizer folds (0 - 1) * 0.0 into the literal -0.0, which the parser has no syntax for
+        source = "a = 1; b = 1.0; c = 0.0; d = (0 - 1) * 0.0; e = 0.0;"
+        statements = [hash_consing.share(statement) for statement in optimized(source)]
+        values = [statement.value for statement in statements]
+        self.assertEqual(len({id(value) for value in values[:4]}), 4)
+        self.assertIs(values[4], values[2])
+
+    def test_report(self):
+        hash_consing = HashConsing()
+        hash_consed("a = 1; b = 1; a = 1;", hash_consing)
+        self.assertEqual((hash_consing.nodes, hash_consing.unique, hash_consing.shared), (12, 7, 5))
+        self.assertEqual(str(hash_consing), "HashConsingReport(nodes: 12, unique: 7, shared: 5)")
+
+    def test_table_is_bounded(self):
+        hash_consing = HashConsing(max_size=4)
+        statements = hash_consed("a = 1; b = 2; c = 3; a = 1;", hash_consing)
+        self.assertLessEqual(len(hash_consing.table), 4 + 3) # cleared before a statement, which adds at most 3
+        self.assertIsNot(statements[3].value, statements[0].value) # shared with nothing from before the clear
+        self.assertEqual(statements, parse("a = 1; b = 2; c = 3; a = 1;"))
+
+    def test_engines_run_shared_trees(self):
+        source = "a = [1, 2]; b = [1, 2]; b[0] = 5; c = a + b; a += [3]; d = a[0] + a[0];"
+        expected = outcome(lambda: Interpreter(parse(source)).interpret())
+        for engine, run in ENGINE_RUNS.items():
+            with self.subTest(engine=engine):
+                self.assertEqual(outcome(lambda: run(hash_consed(source))), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
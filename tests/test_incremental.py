@@ -0,0 +1,64 @@
+import unittest
+
+from parser.incremental import IncrementalParser
+from test_parity import parse
+
+
+SOURCE = "a = 1;\nb = [a, 2];\nc = {'k': b};\nd = c.k[0] + 3;\n"
+
+
+class IncrementalEdits(unittest.TestCase):
+    def assertEdit(self, parser: IncrementalParser, offset: int, deleted: int, inserted: str):
+        statements = parser.edit(offset, deleted, inserted)
+        self.assertEqual(statements, parse(parser.text))
+        self.assertEqual([node.pos for node in statements], [node.pos for node in parse(parser.text)])
+        return statements
+
+    def test_edits_match_a_full_parse(self):
+        # (text the edit starts at, characters deleted, text inserted)
+        edits = [('1;', 1, '42'), ('a =', 0, 'z = 0;\n'), ('', 0, 'e = d;'), ('2]', 0, ' '), ('b}', 1, 'bx'),
+                 ('z', 7, ''), ('42', 2, ''), ("{'k'", 5, "'"), ("' bx", 5, "{'k': bx}"), ('= ;', 2, '= 7'),
+                 ('+ 3', 1, '* [1] *'), ('d = c', 0, 'c.k = 1; '), ('b = [a', 13, ''), ('[1]', 0, '[1] + ')]
+        parser = IncrementalParser(SOURCE)
+        for anchor, deleted, inserted in edits:
+            offset = parser.text.index(anchor) if anchor else len(parser.text)
+            text = parser.text[:offset] + inserted + parser.text[offset + deleted:]
+            with self.subTest(text=text):
+                try:
+                    parse(text)
+                except Exception:
+                    self.assertRaises(Exception, parser.edit, offset, deleted, inserted)
+                else:
+                    self.assertEdit(parser, offset, deleted, inserted)
+
+    def test_unchanged_statements_are_reused(self):
+        parser = IncrementalParser(SOURCE * 50)
+        before = list(parser.statements)
+        statements = self.assertEdit(parser, 4, 1, '5')
+        self.assertIsNot(statements[0], before[0])
+        self.assertTrue(all(new is old for new, old in zip(statements[1:], before[1:])))
+        self.assertLessEqual(parser.reparsed, 2)
+        self.assertLessEqual(parser.relexed, 4)
+
+    def test_positions_shift_after_an_edit(self):
+        parser = IncrementalParser(SOURCE)
+        last = parser.statements[-1]
+        self.assertEdit(parser, 0, 0, 'z = 10;\n')
+        self.assertIs(parser.statements[-1], last)
+        self.assertEqual(last.pos, SOURCE.index('d =') + 8)
+
+    def test_recovers_after_an_unparsable_edit(self):
+        parser = IncrementalParser(SOURCE)
+        with self.assertRaises(Exception):
+            parser.edit(4, 1, '')
+        self.assertEdit(parser, 4, 0, '7')
+
+    def test_edit_outside_the_text(self):
+        parser = IncrementalParser(SOURCE)
+        for offset, deleted in ((-1, 0), (len(SOURCE), 1)):
+            with self.subTest(offset=offset), self.assertRaises(ValueError):
+                parser.edit(offset, deleted, 'x')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import io
+import unittest
+
+from lexer.bulk_lexer import BulkLexer
+from lexer.lexer import Lexer
+from lexer.stream_lexer import StreamLexer
+from lexer.types import TokenType
+from parser.parser import Parser
+
+
+SOURCES = {
+    'assignments': "a = 2; a += b=3; c -= 1; d *= 2; e /= 4; f %= 5; g **= 2; h++; i--;",
+    'operators': "x = a+b-c*d/e%f**g; y = a==b; z = a!=b<c<=d>e>=f;",
+    'blocks': "while i < 3 { if i { break; } else if i != 0 {} continue; }",
+    'containers': "o = {1: 2, 'b': {1: 22}}; l = [1, 2.5, 3.]; o.prop['0'][0]; o('prop', prop(), 1);",
+    'strings': """s = 'it\\'s'; t = "say \\"hi\\""; u = ''; v = 'a"b';""",
+    'words': "fn return true false _under score9 value_2;",
+    'empty': "",
+    'unterminated string': "a = 'abc",
+    'unterminated escape': 'a = "abc\\"',
+    'unicode words': "café = x² + _ü1;",
+}
+
+# each stops the lexers at an invalid character
+INVALID_SOURCES = {
+    'symbol': "a = 1 $ 2;",
+    'superscript digit': "a = ²;",
+    'fraction': "a = ½ + 1;",
+    'non-ascii digit': "a = ٣;",
+    'after a string': "a = 'x'\\",
+}
+
+
+def tokens_until_error(lexer) -> tuple[list, str]:
+    result = []
+    try:
+        while not result or result[-1].type != TokenType.EOF:
+            result.append(lexer.get_next_token())
+    except Exception as e:
+        return result, f"{type(e).__name__}: {e}"
+    return result, ''
+
+
+def tokens(lexer) -> list:
+    result = [lexer.get_next_token()]
+    while result[-1].type != TokenType.EOF:
+        result.append(lexer.get_next_token())
+    return result
+
+
+class BulkLexerParity(unittest.TestCase):
+    def test_tokens_match_the_lexer(self):
+        for name, source in SOURCES.items():
+            with self.subTest(source=name):
+                expected = tokens(Lexer(source))
+                self.assertEqual(tokens(BulkLexer(source)), expected)
+                self.assertEqual(tokens(StreamLexer(io.StringIO(source), chunk_size=3)), expected)
+
+    def test_tokenize_all_ends_with_eof(self):
+        self.assertEqual(BulkLexer("a = 1;").tokenize_all(), tokens(Lexer("a = 1;")))
+
+    def test_eof_repeats(self):
+        lexer = BulkLexer("a")
+        tokens(lexer)
+        self.assertEqual(lexer.get_next_token().type, TokenType.EOF)
+
+    def test_invalid_characters(self):
+        for name, source in INVALID_SOURCES.items():
+            expected, error = tokens_until_error(Lexer(source))
+            self.assertTrue(error.startswith('Exception: Invalid character'))
+            for lexer in (BulkLexer(source), StreamLexer(io.StringIO(source), chunk_size=3)):
+                with self.subTest(source=name, lexer=type(lexer).__name__):
+                    self.assertEqual(tokens_until_error(lexer), (expected, error))
+            with self.subTest(source=name, lexer='tokenize_all'):
+                self.assertRaisesRegex(Exception, 'Invalid character', BulkLexer(source).tokenize_all)
+
+    def test_errors_are_raised_where_they_are_reached(self):
+        # the parse error comes first in the text, so it is the one raised
+        for lexer in (Lexer, BulkLexer):
+            with self.subTest(lexer=lexer.__name__), self.assertRaisesRegex(Exception, 'Unexpected token'):
+                Parser(lexer("a = 1 +; b = $;")).parse()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import os
+import subprocess
+import sys
+import unittest
+
+from interpreter.interpreter import Interpreter
+from natives.natives import NATIVES, register_native
+from optimizer.optimizer import Optimizer
+from parser.serialization import Serializer
+from parser.types import NativeCall, Number
+from parser.validation import validate
+from test_parity import ENGINE_RUNS, outcome, parse
+from vm.vm import VM
+
+
+class NativeCalls(unittest.TestCase):
+    def assertEnginesPrint(self, source: str, expected: str):
+        for engine, run in ENGINE_RUNS.items():
+            with self.subTest(engine=engine):
+                self.assertEqual(outcome(lambda: run(parse(source))), expected)
+
+    def test_calls_are_resolved_when_parsed(self):
+        call, path = [statement.value for statement in parse("a = len('ab'); b = max([{'k': 1}]).k;")]
+        self.assertIs(type(call), NativeCall)
+        self.assertIs(call.native, NATIVES['len'])
+        self.assertIs(path.address[0].native, NATIVES['max'])
+        self.assertIs(type(parse("a = missing(1);")[0].value.address[0]).__name__, 'FunctionCall')
+
+    def test_parser_does_not_load_the_engines(self):
+        script = ("import sys, parser.parser, parser.serialization, parser.validation; "
+                  "print(sorted({name.split('.')[0] for name in sys.modules} & {'interpreter', 'vm', 'optimizer'}))")
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        output = subprocess.run([sys.executable, '-c', script], cwd=root, capture_output=True, text=True, check=True)
+        self.assertEqual(output.stdout.strip(), '[]')
+
+    def test_arity_is_checked_when_parsed(self):
+        for source, message in (("a = len();", r"len\(\) takes 1 argument, got 0"),
+                                ("a = round(1, 2, 3);", r"round\(\) takes 1 to 2 arguments, got 3"),
+                                ("a = min();", r"min\(\) takes at least 1 arguments, got 0")):
+            with self.subTest(source=source), self.assertRaisesRegex(TypeError, message):
+                parse(source)
+
+    def test_call_results_cannot_be_assigned(self):
+        with self.assertRaises(Exception):
+            parse("len('a') = 1;")
+        with self.assertRaises(Exception):
+            parse("keys({}).k = 1;")
+
+    def test_print_has_no_result_to_print(self):
+        self.assertEnginesPrint("print(1); @2; x = print(3);", "1\n2\n3\nNone\n{'x': None}\n")
+
+    def test_paths_into_results(self):
+        self.assertEnginesPrint("a = [[1, 2], [3]]; b = max(a)[0] + len(a[0]);",
+                                "[[1, 2], [3]]\n5\n{'a': [[1, 2], [3]], 'b': 5}\n")
+
+    def test_natives_can_be_variables(self):
+        self.assertEnginesPrint("len = 2; b = len('x' * (len + 1));", "2\n3\n{'len': 2, 'b': 3}\n")
+
+    def test_runtime_errors(self):
+        expected = outcome(lambda: Interpreter(parse("a = len(1);")).interpret())
+        self.assertIn("TypeError", expected)
+        self.assertEnginesPrint("a = len(1);", expected)
+
+    def test_serialized_by_name(self):
+        ast = parse("a = upper('x') + str(len([1])); @a;")
+        loaded = Serializer().loads(Serializer().dumps(ast))
+        self.assertEqual(loaded, ast)
+        self.assertIs(loaded[0].value.left.native, NATIVES['upper'])
+
+    def test_unregistered_native_is_invalid(self):
+        impostor = register_native('impostor', len, 1, pure=True)
+        del NATIVES['impostor']
+        with self.assertRaises(ValueError):
+            validate(NativeCall(native=impostor, args=[Number(value=1)]))
+        with self.assertRaises(TypeError):
+            validate(NativeCall(native=NATIVES['len'], args=[]))
+
+
+class Folding(unittest.TestCase):
+    def test_foldable_calls_on_literals_fold(self):
+        statement, = Optimizer().optimize(parse("a = len('abc') + max(1, 2);"))
+        self.assertEqual(statement.value, Number(value=5))
+
+    def test_unfoldable_calls_are_kept(self):
+        for source in ("a = range(3);", "a = pow(2, 10);", "a = print(1);", "a = len(1);",
+                       "a = replace('a' * 4000, '', 'b' * 4000);"):
+            with self.subTest(source=source):
+                statement, = Optimizer().optimize(parse(source))
+                self.assertIs(type(statement.value), NativeCall)
+
+
+class Memoization(unittest.TestCase):
+    def setUp(self):
+        for name in ('abs', 'str'):
+            NATIVES[name].set_memo_size(2)
+            self.addCleanup(NATIVES[name].set_memo_size, 0)
+
+    def test_results_are_reused(self):
+        native = NATIVES['abs']
+        self.assertEqual([native(-1), native(-1), native(-2)], [1, 1, 2])
+        self.assertEqual((native.hits, native.misses), (1, 2))
+
+    def test_keys_keep_types_and_float_signs_apart(self):
+        native = NATIVES['str']
+        self.assertEqual([native(1), native(1.0), native(True)], ['1', '1.0', 'True'])
+        native.set_memo_size(2)
+        self.assertEqual([native(0.0), native(-0.0)], ['0.0', '-0.0'])
+
+    def test_least_recently_used_is_evicted(self):
+        native = NATIVES['abs']
+        native(-1), native(-2), native(-1), native(-3)
+        self.assertEqual(list(native.memo), [(-1, int), (-3, int)])
+
+    def test_unhashable_arguments_and_impure_natives(self):
+        self.assertEqual(NATIVES['str']([1]), '[1]')
+        self.assertEqual(NATIVES['str'].misses, 0)
+        with self.assertRaises(ValueError):
+            NATIVES['print'].set_memo_size(1)
+
+    def test_engines_agree_with_a_memo(self):
+        source = "a = [abs(0 - 1), abs(0 - 1), str(1), str(1.0)]; b = str(a);"
+        for engine in (Interpreter, VM):
+            with self.subTest(engine=engine.__name__):
+                self.assertEqual(outcome(lambda: engine(parse(source)).interpret()),
+                                 "[1, 1, '1', '1.0']\n[1, 1, '1', '1.0']\n"
+                                 "{'a': [1, 1, '1', '1.0'], 'b': \"[1, 1, '1', '1.0']\"}\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
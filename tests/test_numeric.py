@@ -0,0 +1,68 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+
+from interpreter.interpreter import Interpreter
+from interpreter.numeric import NumericArray, numpy
+from test_parity import parse
+
+
+@unittest.skipIf(numpy is None, "numeric arrays need numpy")
+class NumericArrays(unittest.TestCase):
+    def run_numeric(self, source: str) -> Interpreter:
+        interpreter = Interpreter(parse(source), numeric_arrays=True)
+        with redirect_stdout(io.StringIO()):
+            interpreter.interpret()
+        return interpreter
+
+    def assertMemory(self, source: str, memory: dict):
+        self.assertEqual(repr(self.run_numeric(source).memory), repr(memory)) # repr, since 2 == 2.0
+
+    def test_literals(self):
+        memory = self.run_numeric("a = [1, 2]; b = [0.5]; c = [1, 'x']; d = [2 ** 70, 1]; e = [];").memory
+        self.assertEqual([type(memory[name]) for name in 'abcde'], [NumericArray, NumericArray, list, NumericArray, list])
+
+    def test_elementwise_arithmetic(self):
+        self.assertMemory("a = [1, 2, 3]; b = a * 2 + a; c = 10 - a; d = a / 2; e = a % 2; f = a ** 2;",
+                          {'a': [1, 2, 3], 'b': [3, 6, 9], 'c': [9, 8, 7], 'd': [0.5, 1.0, 1.5], 'e': [1, 0, 1],
+                           'f': [1, 4, 9]})
+
+    def test_results_match_python(self):
+        self.assertMemory("a = [9223372036854775807, 1] + 1; b = [0 - 7] % 3; c = [2] ** 100; d = [0 - 8.0] ** 0.5;",
+                          {'a': [9223372036854775808, 2], 'b': [2], 'c': [2 ** 100], 'd': [(-8.0) ** 0.5]})
+
+    def test_length_mismatch(self):
+        with self.assertRaises(ValueError):
+            self.run_numeric("a = [1, 2] + [1, 2, 3];")
+
+    def test_division_by_zero(self):
+        for source in ("a = [1, 2] / [1, 0];", "a = [1.0] % 0;"):
+            with self.subTest(source=source), self.assertRaises(ZeroDivisionError):
+                self.run_numeric(source)
+
+    def test_demoted_arrays_keep_their_aliases(self):
+        self.assertMemory("a = [1, 2]; b = {'k': a}; a[0] = 'x'; c = b.k; d = a + ['y'];",
+                          {'a': ['x', 2], 'b': {'k': ['x', 2]}, 'c': ['x', 2], 'd': ['x', 2, 'y']})
+
+    def test_equality(self):
+        self.assertMemory("a = [1, 2] == [1, 2]; b = [1, 2] != [1, 2.5]; c = [1] == [1, 2]; d = [1, 2] == 1;",
+                          {'a': True, 'b': True, 'c': False, 'd': False})
+
+    def test_array_plus_list_concatenates(self):
+        self.assertMemory("a = [1, 2] + ['a']; b = ['a'] + [1.5];", {'a': [1, 2, 'a'], 'b': ['a', 1.5]})
+
+    def test_mixed_literal_keeps_its_ints(self):
+        self.assertMemory("a = [9007199254740993, 0.5]; b = a[0];",
+                          {'a': [9007199254740993, 0.5], 'b': 9007199254740993})
+
+    def test_storing_a_float_keeps_the_other_ints(self):
+        self.assertMemory("a = [1, 2]; a[0] = 0.5; b = a[1]; c = [99999999999999999999, 1]; c[0] = 0.5; d = c[1];",
+                          {'a': [0.5, 2], 'b': 2, 'c': [0.5, 1], 'd': 1})
+
+    def test_out_of_range(self):
+        with self.assertRaises(IndexError):
+            self.run_numeric("a = [1, 2]; a[2] = 3;")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+
+from interpreter.operators import OPERATOR_TABLE, binary_operation
+from lexer.types import TokenType
+
+
+class OperatorTable(unittest.TestCase):
+    def test_supported_pairs(self):
+        cases = [
+            (TokenType.PLUS, 1, 2.5, 3.5),
+            (TokenType.MINUS, 1, 3, -2),
+            (TokenType.DIVIDE, 7, 2, 3.5),
+            (TokenType.MODULUS, -7, 3, 2),
+            (TokenType.EXPONENT, 2, 10, 1024),
+            (TokenType.PLUS, "it's", '"', 'it\'s"'),
+            (TokenType.MULTIPLY, 'ab', 2, 'abab'),
+            (TokenType.MULTIPLY, 2, [1], [1, 1]),
+            (TokenType.PLUS, [1], [2], [1, 2]),
+        ]
+        for operator_type, left, right, expected in cases:
+            with self.subTest(operator=operator_type, left=left, right=right):
+                self.assertEqual(binary_operation(operator_type, left, right), expected)
+
+    def test_unsupported_pairs(self):
+        cases = [
+            (TokenType.MINUS, [1], {'k': 1}, "Unsupported operand types for -: 'list' and 'dict'"),
+            (TokenType.PLUS, 'a', 1, "Unsupported operand types for +: 'str' and 'int'"),
+            (TokenType.MULTIPLY, 'a', 1.5, "Unsupported operand types for *: 'str' and 'float'"),
+            (TokenType.DIVIDE, [1], 2, "Unsupported operand types for /: 'list' and 'int'"),
+            (TokenType.PLUS, {}, {}, "Unsupported operand types for +: 'dict' and 'dict'"),
+        ]
+        for operator_type, left, right, message in cases:
+            with self.subTest(message=message), self.assertRaises(TypeError) as raised:
+                binary_operation(operator_type, left, right)
+            self.assertEqual(str(raised.exception), message)
+
+    def test_subclasses_are_not_matched(self):
+        # the table is keyed by exact types, so a str subclass is only supported once registered
+        class Name(str):
+            pass
+
+        self.assertNotIn((TokenType.PLUS, Name, str), OPERATOR_TABLE)
+        with self.assertRaises(TypeError):
+            binary_operation(TokenType.PLUS, Name('a'), 'b')
+
+    def test_python_errors_pass_through(self):
+        with self.assertRaises(ZeroDivisionError):
+            binary_operation(TokenType.MODULUS, 1, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+
+from lexer.lexer import Lexer
+from optimizer.optimizer import MAX_FOLDED_STRING_LENGTH, Optimizer
+from parser.parser import Parser
+from parser.types import BinaryOperation, Number, String
+from test_parity import ENGINE_RUNS, outcome, parse
+
+
+def optimize(source: str) -> tuple[list, Optimizer]:
+    optimizer = Optimizer()
+    return optimizer.optimize(Parser(Lexer(source)).parse()), optimizer
+
+
+class OptimizerKeepsOutput(unittest.TestCase):
+    def assertSameOutput(self, source: str):
+        for engine, run in ENGINE_RUNS.items():
+            with self.subTest(engine=engine):
+                self.assertEqual(outcome(lambda: run(optimize(source)[0])), outcome(lambda: run(parse(source))))
+
+    def test_repeated_stores_keep_their_printed_results(self):
+        self.assertSameOutput("i = 0; j = 0; i = 0; i = 1; i = 2;")
+
+    def test_repeated_stores_keep_the_memory_order(self):
+        self.assertSameOutput("j = 0; i = 0; j = 1; i = 1;")
+
+    def test_adding_zero_to_negative_zero(self):
+        self.assertSameOutput("x = 0; y = (x - 1) * 0.0 + 0; z = 0 + (x - 1) * 0.0;")
+
+    def test_failing_operations_still_fail(self):
+        self.assertSameOutput("a = 'x' + 1;")
+        self.assertSameOutput("a = 1 / 0;")
+        self.assertSameOutput("a = 2; b = a * 1; c = 'a' * 1; d = [1] + 0;")
+
+    def test_long_strings_are_not_built_to_be_folded(self):
+        # neither fold may be built first: the repetition alone is 8 GB, and the statement before them stops the script
+        self.assertSameOutput("x = missing; s = 'ab' * 4000000000; t = replace('a' * 4000, '', 'b' * 4000);")
+
+
+class Folding(unittest.TestCase):
+    def test_literals_fold(self):
+        ast, optimizer = optimize("a = 2 ** 3 * 4 - 1; b = 'ab' + 'c' * 2;")
+        self.assertEqual([statement.value for statement in ast], [Number(value=31), String(value='abcc')])
+        self.assertEqual(optimizer.report.folded, 5)
+
+    def test_oversized_results_are_left_for_runtime(self):
+        ast, _ = optimize(f"a = 'a' * {MAX_FOLDED_STRING_LENGTH + 1}; b = 2 ** 1000;")
+        self.assertTrue(all(type(statement.value) is BinaryOperation for statement in ast))
+
+    def test_huge_powers_are_not_computed(self):
+        ast, _ = optimize("a = 3 ** 1000000000; b = 2 ** 64; c = 2.5 ** 1000000000;")
+        self.assertEqual(type(ast[0].value), BinaryOperation)
+        self.assertEqual(ast[1].value, Number(value=2 ** 64))
+        self.assertEqual(type(ast[2].value), BinaryOperation) # overflows, left to raise at runtime
+
+    def test_statements_without_foldable_parts_are_unchanged(self):
+        source = "i = 0; j = [1, 'a']; i = 1; i = {'k': j}; j = i.k;"
+        ast, optimizer = optimize(source)
+        self.assertEqual(ast, parse(source))
+        self.assertEqual(optimizer.report.nodes_removed, 0)
+
+    def test_disabled_optimizer_keeps_the_tree(self):
+        source = "a = 1 + 2; a = 3;"
+        self.assertEqual(Optimizer(enabled=False).optimize(parse(source)), parse(source))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from parser.parallel import ParseError, parse_chunk, parse_parallel, split_points
+from test_parity import SCRIPTS, parse
+
+
+# every script repeated until the text splits into several chunks
+SOURCE = '\n'.join(SCRIPTS.values()) * 100
+
+
+class Splitting(unittest.TestCase):
+    def test_splits_only_between_top_level_statements(self):
+        text = "a = ';'; b = [1, {'c': 2}]; while a { b = 1; } d = \"x;\\\";\"; e = (1);"
+        points = split_points(text, len(text))
+        # after the statements of a, b, d and e: none inside a string, a container or the while block
+        self.assertEqual(points, [8, 27, 59, 68])
+        for point in points:
+            self.assertEqual(parse(text[:point]) + parse(text[point:]), parse(text))
+
+    def test_chunks_keep_global_positions(self):
+        text = "a = 1; b = a + 2;"
+        self.assertEqual([node.pos for node in parse_chunk(text[7:], 7)], [node.pos for node in parse(text)[1:]])
+
+
+class ParallelParsing(unittest.TestCase):
+    def test_matches_a_sequential_parse(self):
+        expected = parse(SOURCE)
+        self.assertEqual(parse_parallel(SOURCE, workers=2), expected)
+        self.assertEqual(parse_parallel(SOURCE, workers=1), expected)
+        with ProcessPoolExecutor(2) as executor:
+            self.assertEqual(parse_parallel(SOURCE, workers=4, strict=True, executor=executor), expected)
+
+    def test_reports_the_first_error_wherever_the_splits_fall(self):
+        executor = ProcessPoolExecutor(3)
+        self.addCleanup(executor.shutdown)
+        for broken, message, column in (("x = 1 +;", "Unexpected token", 8), ("x = $;", "Invalid character: $", 4),
+                                         ("x = 1 +; y = $;", "Unexpected token", 8)):
+            for where in (0, len(SOURCE) // 2):
+                text = SOURCE[:where] + '\n' + broken + '\n' + SOURCE[where:]
+                for workers in (1, 3):
+                    with self.subTest(broken=broken, where=where, workers=workers), \
+                            self.assertRaises(ParseError) as raised:
+                        parse_parallel(text, workers=workers, executor=executor)
+                    error = raised.exception
+                    self.assertIn(message, str(error))
+                    self.assertEqual((error.line, error.column), (text.count('\n', 0, where) + 2, column))
+                    self.assertEqual(error.pos, where + column)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,206 @@
+import asyncio
+import io
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from analysis.inference import TypeInference
+from analysis.specialization import specialize
+from interpreter.interpreter import Interpreter
+from lexer.bulk_lexer import BulkLexer
+from lexer.types import TokenType
+from lexer.lexer import Lexer
+from lexer.stream_lexer import StreamLexer
+from optimizer.optimizer import Optimizer
+from parser.cache import ParseCache
+from parser.incremental import IncrementalParser
+from parser.parallel import parse_parallel
+from parser.parser import Parser
+from parser.types import Assign, BinaryOperation, Identifier, Number, String
+from vm.compiler import Program
+from vm.scheduler import AsyncScript
+from vm.vm import VM
+
+
+# small scripts that exercise what every engine and parser has to agree on; the last statement of some of them fails
+SCRIPTS = {
+    'arithmetic': "a = 7; b = 2; c = a / b + a % b - 2 ** 10 * 1.5; d = (a - 9) % 4; e = a == 7 != false;",
+    'strings': "s = 'ab'; s += 'cd' * 3; t = s + str(len(s)); u = upper(t); v = split('a,b,,c', ',');",
+    'escapes': "s = 'it\\'s' + \"a\\\"b\"; t = 2 * s; u = [s] * 2 + [t];",
+    'loops': """
+        i = 0; total = 0; odds = [];
+        while i < 20 {
+            i += 1;
+            if i % 2 == 0 { continue; }
+            if i > 15 { break; }
+            total += i; odds = odds + [i];
+        }
+        j = 3; while j { j = j - 1; }""",
+    'nested_loops': """
+        rows = [[1, 2, 3], [4, 5, 6]]; r = 0; sums = [0, 0];
+        while r < len(rows) {
+            c = 0;
+            while true { if c == 3 { break; } sums[r] += rows[r][c]; c += 1; }
+            r += 1;
+        }""",
+    'branches': """
+        x = 5; if x < 3 { y = 'small'; } else if x <= 5 { y = 'medium'; } else { y = 'large'; }
+        if '' { z = 1; } else { z = [] == []; } w = 'ab' < 'b' >= false;""",
+    'paths': """
+        root = {'a': {'b': [10, {'c': 1}]}, 'k': 'a'};
+        root.a.b[1].c = root.a.b[0] + 5; root['a']['b'][0] += 1; x = root[root.k].b[1].c;
+        y = root.a.b[0-1].c; root.a.b[0-1] = {'c': 2}; y = root.a.b[0-1].c;""",
+    'aliasing': """
+        inner = [1, 2]; outer = {'x': inner, 'y': inner}; outer.x[0] = 9; z = inner[0];
+        copy = outer.y; outer.y = [3]; copy[1] = 8; w = outer.x == copy;
+        self = {}; self.me = [self]; n = len(self.me);""",
+    'assign_modes': "a = b = 3; c = (a += 4); d = a += b = 1; e = [a, b, c, d];",
+    'natives': """
+        xs = range(5); m = max(xs) + min(3, 4.5); s = sum(xs) + abs(0 - 2); r = round(2.675, 2);
+        k = keys({'p': 1, 'q': 2}); j = join(k, '-'); f = floor(sqrt(17)) + ceil(0.1); print(j, m);""",
+    'missing_name': "a = 1; b = a + missing;",
+    'path_key_types': "a = [[5], [6]]; x = a[1][0]; y = a[1.0][0];",
+    'bad_operands': "a = [1]; b = {'k': 1}; c = a - b;",
+    'bad_index': "a = [1, 2]; b = a[5];",
+    'missing_key': "a = {'k': 1}; b = a.j;",
+    'division_by_zero': "a = 1; i = 0; while i < 3 { i += 1; a = a / (2 - i); }",
+}
+
+
+def computed_names(last: str) -> list:
+    # the parser always starts an address with a name, but the engines also run ASTs that compute it, here 'a' + suffix
+    def name(suffix: str) -> Identifier:
+        return Identifier(address=[BinaryOperation(operator=TokenType.PLUS, left=String(value='a'),
+                                                   right=String(value=suffix))])
+
+    return [Assign(identifier=name('b'), value=Number(value=1)),
+            Assign(identifier=name('b'), value=Number(value=5), return_mode='before'), name(last)]
+
+
+def parse(source: str) -> list:
+    return Parser(Lexer(source)).parse()
+
+
+def optimized(source: str) -> list:
+    return Optimizer().optimize(parse(source))
+
+
+def streamed(source: str):
+    # a generator, as the engines get it with --stream
+    return Optimizer().optimize_stream(Parser(StreamLexer(io.StringIO(source), chunk_size=7)).statements())
+
+
+def outcome(run) -> str:
+    # everything the script printed, then the error it stopped with, if any
+    with redirect_stdout(io.StringIO()) as output:
+        try:
+            run()
+            error = None
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+    return output.getvalue() + (f"{error}\n" if error else '')
+
+
+def run_async(ast) -> None:
+    # statement results are only there once the script has run, so only the memory is compared
+    script = AsyncScript(ast, slice_size=3)
+    try:
+        asyncio.run(script.run())
+    finally:
+        print(script.memory)
+
+
+def run_vm(ast) -> None:
+    vm = VM(ast)
+    try:
+        for statement in ast:
+            vm.run(statement)
+    finally:
+        print(vm.memory)
+
+
+def run_reused(ast) -> None:
+    # runs the Program another VM has already run, so every statement executes from Code compiled for that run
+    program = Program(list(ast))
+    with redirect_stdout(io.StringIO()):
+        try:
+            VM(program).interpret()
+        except Exception:
+            pass
+    VM(program).interpret()
+
+
+def typed(ast) -> list:
+    ast = list(ast) # inference needs every statement up front, so a stream is read first
+    specialize(ast, TypeInference().infer(ast))
+    return ast
+
+
+ENGINE_RUNS = {
+    'tree': lambda ast: Interpreter(ast).interpret(),
+    'tree --quicken': lambda ast: Interpreter(ast, quicken=True).interpret(),
+    'vm': lambda ast: VM(ast).interpret(),
+    'vm reused': run_reused,
+    'tree --infer-types': lambda ast: Interpreter(typed(ast)).interpret(),
+    'vm --infer-types': lambda ast: VM(typed(ast)).interpret(),
+}
+
+
+class EngineParity(unittest.TestCase):
+    def test_engines_agree(self):
+        for name, source in SCRIPTS.items():
+            expected = outcome(lambda: Interpreter(parse(source)).interpret())
+            for engine, run in ENGINE_RUNS.items():
+                for pipeline in (parse, optimized, streamed): # the optimizer makes constant paths out of folded indexes
+                    with self.subTest(script=name, engine=engine, pipeline=pipeline.__name__):
+                        self.assertEqual(outcome(lambda: run(pipeline(source))), expected)
+
+    def test_computed_names_agree(self):
+        for last in ('b', 'c'): # the last name is missing
+            expected = outcome(lambda: Interpreter(computed_names(last)).interpret())
+            for engine, run in ENGINE_RUNS.items():
+                with self.subTest(last=last, engine=engine):
+                    self.assertEqual(outcome(lambda: run(computed_names(last))), expected)
+
+    def test_async_vm_agrees(self):
+        for name, source in SCRIPTS.items():
+            with self.subTest(script=name):
+                self.assertEqual(outcome(lambda: run_async(optimized(source))),
+                                 outcome(lambda: run_vm(optimized(source))))
+
+
+class ParserParity(unittest.TestCase):
+    def test_parsers_agree(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ParseCache(directory)
+            parsers = {
+                'bulk lexer': lambda source: Parser(BulkLexer(source)).parse(),
+                'stream lexer': lambda source: list(Parser(StreamLexer(io.StringIO(source),
+                                                                       chunk_size=7)).statements()),
+                'parallel': lambda source: parse_parallel(source, workers=2),
+                'incremental': lambda source: IncrementalParser(source).parse(),
+                'incremental edit': lambda source: IncrementalParser('x = 1;\n' + source).edit(0, 7, ''),
+                'cache miss': cache.parse,
+                'cache hit': cache.parse,
+            }
+            # long enough for the parallel parser to split it into chunks
+            sources = {**SCRIPTS, 'all, repeated': '\n'.join(SCRIPTS.values()) * 100}
+            for name, source in sources.items():
+                expected = parse(source)
+                for parser, run in parsers.items():
+                    with self.subTest(script=name, parser=parser):
+                        self.assertEqual(run(source), expected)
+
+    def test_parsers_reject_invalid_scripts(self):
+        parsers = (lambda source: Parser(BulkLexer(source)).parse(),
+                   lambda source: list(Parser(StreamLexer(io.StringIO(source))).statements()),
+                   lambda source: parse_parallel(source, workers=2), lambda source: IncrementalParser(source).parse())
+        for source in ("a = ;", "a = [1, 2;", "while 1 { a = 1;", "break;", "a = 1 $ 2;"):
+            with self.subTest(source=source):
+                self.assertRaises(Exception, parse, source)
+                for run in parsers:
+                    self.assertRaises(Exception, run, source)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from interpreter.interpreter import Interpreter
+from interpreter.profiler import Profiler
+from test_parity import parse
+
+
+def profile(source: str) -> tuple[Profiler, str]:
+    profiler = Profiler(source)
+    with redirect_stdout(io.StringIO()) as output:
+        Interpreter(parse(source), profiler=profiler).interpret()
+    return profiler, output.getvalue()
+
+
+class Profiling(unittest.TestCase):
+    def test_output_is_unchanged(self):
+        source = "a = {'b': [1, 2]};\nc = a.b[0] + a.b[1] * 2;"
+        with redirect_stdout(io.StringIO()) as output:
+            Interpreter(parse(source)).interpret()
+        self.assertEqual(profile(source)[1], output.getvalue())
+
+    def test_node_types_are_counted(self):
+        profiler, _ = profile("a = 1 + 2 * 3;\nb = a;")
+        calls = {name: stats.calls for name, stats in profiler.node_stats.items()}
+        self.assertEqual(calls, {'Assign': 2, 'BinaryOperation': 2, 'Number': 3, 'Identifier': 1, 'Symbol': 2})
+
+    def test_statements_are_labelled_by_position(self):
+        profiler, _ = profile("a = 1;\n  b = a;   c = b;")
+        self.assertEqual(list(profiler.statement_stats), ['1:1 Assign', '2:3 Assign', '2:12 Assign'])
+
+    def test_nested_types_are_timed_once(self):
+        profiler, _ = profile("a = [[[1]]];")
+        stats = profiler.node_stats['Array']
+        self.assertEqual(stats.calls, 3)
+        self.assertLessEqual(stats.cumulative, profiler.statement_stats['1:1 Assign'].cumulative)
+
+    def test_statements_in_blocks_are_attributed(self):
+        profiler, _ = profile("i = 0;\nwhile i < 3 {\n    i += 1;\n    if i == 2 { j = i; }\n}")
+        runs = {label: stats.calls for label, stats in profiler.statement_stats.items()}
+        self.assertEqual(runs, {'1:1 Assign': 1, '2:1 While': 1, '3:5 Assign': 3, '4:5 If': 3, '4:17 Assign': 1})
+
+    def test_collapsed_stacks(self):
+        profiler, _ = profile("a = 1 + 2;")
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'stacks.txt')
+            profiler.write_collapsed(path)
+            with open(path) as file:
+                stacks = [line.rsplit(' ', 1)[0] for line in file]
+        self.assertEqual(sorted(stacks), ['1:1 Assign', '1:1 Assign;BinaryOperation',
+                                          '1:1 Assign;BinaryOperation;Number', '1:1 Assign;Symbol'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+
+from interpreter.interpreter import Interpreter
+from interpreter.quickening import ConstantPathIdentifier, GenericBinaryOperation, GenericIdentifier, GlobalAssign, \
+    GlobalIdentifier, QuickBinaryOperation
+from test_parity import outcome, parse
+
+
+def run(ast: list, memory: dict) -> Interpreter:
+    interpreter = Interpreter(ast, memory=memory, quicken=True)
+    with redirect_stdout(io.StringIO()):
+        interpreter.interpret()
+    return interpreter
+
+
+class Quickening(unittest.TestCase):
+    def test_nodes_are_specialized(self):
+        ast = parse("a = {'b': [1]}; c = a.b[0] + 2; d = c;")
+        quickening = run(ast, {}).quickening
+        self.assertIs(type(ast[0]), GlobalAssign)
+        self.assertIsInstance(ast[1].value, QuickBinaryOperation)
+        self.assertIs(type(ast[1].value.left), ConstantPathIdentifier)
+        self.assertIs(type(ast[2].value), GlobalIdentifier)
+        self.assertEqual(quickening.observed, quickening.specialized.total())
+        self.assertEqual(quickening.specialized['QuickBinaryOperation[int + int]'], 1)
+        self.assertEqual(quickening.deoptimized.total(), 0)
+
+    def test_guard_misses_are_counted_and_stay_generic(self):
+        ast = parse("c = a + b;")
+        run(ast, {'a': 1, 'b': 2})
+        operation = ast[0].value
+        quickening = run(ast, {'a': 'x', 'b': 'y'}).quickening
+        self.assertIs(type(operation), GenericBinaryOperation)
+        self.assertEqual(dict(quickening.deoptimized), {'QuickBinaryOperation[int + int]': 1})
+        self.assertEqual(quickening.deoptimization_rate, 0.0) # nothing was specialized by this interpreter
+        memory = run(ast, {'a': 3, 'b': 4}).memory
+        self.assertIs(type(operation), GenericBinaryOperation)
+        self.assertEqual(memory['c'], 7)
+
+    def test_missing_path_deoptimizes_and_reports_the_error(self):
+        ast = parse("c = a.b;")
+        run(ast, {'a': {'b': 1}})
+        expected = outcome(lambda: Interpreter(parse("c = a.b;"), memory={'a': {'k': 1}}).interpret())
+        self.assertEqual(outcome(lambda: Interpreter(ast, memory={'a': {'k': 1}}, quicken=True).interpret()), expected)
+        self.assertIs(type(ast[0].value), GenericIdentifier)
+
+    def test_rates_and_report(self):
+        ast = parse("b = a + 1; c = b;")
+        first = run(ast, {'a': 1}).quickening
+        self.assertEqual((first.specialization_rate, first.deoptimization_rate), (1.0, 0.0))
+        second = Interpreter(ast, memory={'a': 0.5}, quicken=True)
+        second.quickening = first # one report for both runs
+        with redirect_stdout(io.StringIO()):
+            second.interpret()
+        self.assertEqual(first.deoptimized.total(), 1)
+        self.assertEqual(first.deoptimization_rate, 1 / first.specialized.total())
+        self.assertRegex(first.report(), r'QuickBinaryOperation\[int \+ int\] +1 specialized +1 deoptimized')
+
+    def test_a_plain_interpreter_runs_quickened_nodes(self):
+        source = "a = {'b': [1]}; c = a.b[0] + 2; a.b[0] = c;"
+        ast = parse(source)
+        run(ast, {})
+        self.assertEqual(outcome(lambda: Interpreter(ast).interpret()),
+                         outcome(lambda: Interpreter(parse(source)).interpret()))
+
+
+if __name__ == '__main__':
+    unittest.main()
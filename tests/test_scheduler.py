@@ -0,0 +1,100 @@
+import asyncio
+import unittest
+
+from test_parity import parse
+from vm.scheduler import AsyncScript, BudgetExceeded
+from vm.vm import VM, Frame
+
+
+SOURCE = "a = [1, 2, 3]; b = {'k': a}; c = b.k[0] + b.k[1] * b.k[2]; d = c - 1;"
+
+
+def executed(source: str) -> int:
+    vm = VM(parse(source))
+    total = 0
+    for statement in vm.ast:
+        frame = Frame(vm.compiler.compile(statement))
+        vm.resume(frame)
+        total += frame.executed
+    return total
+
+
+class Frames(unittest.TestCase):
+    def test_resume_stops_between_instructions(self):
+        vm = VM(parse(SOURCE))
+        results = []
+        for statement in vm.ast:
+            frame = Frame(vm.compiler.compile(statement))
+            steps = 1
+            while not vm.resume(frame, 1):
+                steps += 1
+            self.assertEqual(steps, frame.executed)
+            results.append(frame.result)
+        self.assertEqual(results, [[1, 2, 3], {'k': [1, 2, 3]}, 7, 6])
+        self.assertEqual(vm.memory, {'a': [1, 2, 3], 'b': {'k': [1, 2, 3]}, 'c': 7, 'd': 6})
+
+
+class AsyncScripts(unittest.TestCase):
+    def test_slices_match_a_plain_run(self):
+        for slice_size in (1, 2, 5, 1024):
+            with self.subTest(slice_size=slice_size):
+                script = AsyncScript(parse(SOURCE), slice_size=slice_size)
+                self.assertEqual(asyncio.run(script.run()), [[1, 2, 3], {'k': [1, 2, 3]}, 7, 6])
+                self.assertEqual(script.executed, executed(SOURCE))
+                self.assertGreaterEqual(script.switches, script.executed // slice_size)
+
+    def test_budget_exhaustion(self):
+        total = executed(SOURCE)
+        script = AsyncScript(parse(SOURCE), slice_size=3, budget=total - 1)
+        with self.assertRaises(BudgetExceeded):
+            asyncio.run(script.run())
+        self.assertEqual(script.executed, total - 1)
+        self.assertNotIn('d', script.memory)
+
+    def test_exact_budget_is_enough(self):
+        total = executed(SOURCE)
+        script = AsyncScript(parse(SOURCE), slice_size=3, budget=total)
+        asyncio.run(script.run())
+        self.assertEqual(script.memory['d'], 6)
+
+    def test_cancellation_stops_at_a_slice_boundary(self):
+        script = AsyncScript(parse("a = 0;" + "a += 1;" * 1000), slice_size=10)
+
+        async def cancel_soon():
+            task = asyncio.create_task(script.run())
+            for _ in range(5):
+                await asyncio.sleep(0)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(cancel_soon())
+        self.assertLess(script.memory['a'], 1000)
+        self.assertEqual(script.executed % 10, 0)
+
+    def test_scripts_interleave(self):
+        order = []
+
+        class Recording(AsyncScript):
+            def __init__(self, name, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                self.name = name
+
+            async def switch(self):
+                order.append(self.name)
+                await super().switch()
+
+        async def both():
+            await asyncio.gather(Recording('x', parse("a = 1;" * 20), slice_size=4).run(),
+                                 Recording('y', parse("a = 1;" * 20), slice_size=4).run())
+
+        asyncio.run(both())
+        self.assertEqual(order[:4], ['x', 'y', 'x', 'y'])
+
+    def test_invalid_slice_size(self):
+        with self.assertRaises(ValueError):
+            AsyncScript([], slice_size=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import io
+import os
+import pickle
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+from interpreter.interpreter import Interpreter
+from interpreter.snapshot import LazyDict, LazyList, restore_snapshot, write_snapshot
+from test_parity import parse
+from vm.vm import VM
+
+
+class Snapshots(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'memory.snap')
+
+    def round_trip(self, memory: dict) -> dict:
+        write_snapshot(memory, self.path)
+        return restore_snapshot(self.path)
+
+    def test_values_round_trip(self):
+        memory = {
+            'int': -7, 'big': 2 ** 100, 'negative big': -2 ** 70, 'float': 0.1, 'negative zero': -0.0,
+            'string': 'café \U0001f600', 'empty': '', 'none': None, 'true': True, 'false': False,
+            'list': [1, [2.5, 'x'], {}], 'dict': {1: 'one', 'two': [None]}, 'long': 'ab' * 100000,
+        }
+        restored = self.round_trip(memory)
+        self.assertEqual(restored, memory)
+        self.assertEqual(repr(restored), repr(memory)) # repr, since 0.0 == -0.0 and True == 1
+        self.assertIs(type(restored['true']), bool)
+
+    def test_aliases_stay_shared(self):
+        inner = [1, 2]
+        restored = self.round_trip({'a': inner, 'b': {'x': inner, 'y': inner}})
+        self.assertIs(restored['a'], restored['b']['x'])
+        self.assertIs(restored['b']['x'], restored['b']['y'])
+        restored['a'].append(3)
+        self.assertEqual(restored['b']['y'], [1, 2, 3])
+
+    def test_cycles_round_trip(self):
+        memory = {'a': [], 'self': {}}
+        memory['a'].append(memory['a'])
+        memory['self']['me'] = [memory['self'], memory['a']]
+        memory['memory'] = memory
+        restored = self.round_trip(memory)
+        self.assertEqual(repr(restored), repr(memory))
+        self.assertIs(restored['a'][0], restored['a'])
+        self.assertIs(restored['self']['me'][0], restored['self'])
+        self.assertIs(restored['self']['me'][1], restored['a'])
+        self.assertIs(restored['memory'], restored)
+
+    def test_records_are_patched_after_they_are_flushed(self):
+        memory = {'rows': [[i, 'x' * 50] for i in range(200)]}
+        memory['rows'].append(memory)
+        with patch('interpreter.snapshot.WRITE_BUFFER_SIZE', 64):
+            restored = self.round_trip(memory)
+        self.assertEqual(repr(restored), repr(memory))
+        self.assertIs(restored['rows'][-1], restored)
+
+    def test_restored_cycles_copy(self):
+        memory = {'self': {}}
+        memory['self']['me'] = [memory['self']]
+        copied = pickle.loads(pickle.dumps(self.round_trip(memory)))
+        self.assertIs(type(copied['self']['me']), list)
+        self.assertIs(copied['self']['me'][0], copied['self'])
+
+    def test_scripts_continue_from_a_restored_cycle(self):
+        with redirect_stdout(io.StringIO()):
+            interpreter = Interpreter(parse("self = {}; self.me = [self]; alias = self.me;"))
+            interpreter.interpret()
+        write_snapshot(interpreter.memory, self.path)
+        for engine in (Interpreter, VM):
+            with self.subTest(engine=engine.__name__), redirect_stdout(io.StringIO()):
+                interpreter = engine(parse("alias[0].me[0].n = 1; n = self.n + len(alias);"),
+                                     memory=restore_snapshot(self.path))
+                interpreter.interpret()
+            self.assertEqual(interpreter.memory['n'], 2)
+            self.assertIs(interpreter.memory['alias'], interpreter.memory['self']['me'])
+
+    def test_restore_is_lazy(self):
+        restored = self.round_trip({'a': {'b': [1, [2]]}, 'c': [3]})
+        self.assertIsInstance(restored, LazyDict)
+        self.assertEqual(dict.__len__(restored), 0) # nothing is read before the root is touched
+        a = restored['a']
+        self.assertEqual(list.__len__(dict.__getitem__(restored, 'c')), 0) # the root is loaded, not its children
+        self.assertIsInstance(a['b'][1], LazyList)
+        self.assertEqual(a['b'][1], [2])
+
+    def test_restored_containers_combine(self):
+        restored = self.round_trip({'a': [1], 'b': [2], 'c': {'k': 1}, 'd': {'k': 1}})
+        self.assertEqual(restored['a'] + restored['b'], [1, 2])
+        restored = self.round_trip({'a': [1], 'b': [1], 'c': {'k': 1}, 'd': {'k': 1}})
+        self.assertEqual(restored['a'], restored['b'])
+        self.assertEqual(restored['c'], restored['d'])
+        self.assertEqual(restored['c'] | restored['d'], {'k': 1})
+
+    def test_restored_containers_copy_and_pickle_as_plain_ones(self):
+        restored = self.round_trip({'a': [1, {'b': 2}]})
+        copied = pickle.loads(pickle.dumps(restored))
+        self.assertIs(type(copied), dict)
+        self.assertIs(type(copied['a']), list)
+        self.assertEqual(copied, {'a': [1, {'b': 2}]})
+
+    def test_engines_start_from_a_restored_memory(self):
+        source = "a = {'x': [1, 2]}; b = [0] + a.x * 2; a.x[0] = 5;"
+        with redirect_stdout(io.StringIO()):
+            interpreter = Interpreter(parse(source))
+            interpreter.interpret()
+        write_snapshot(interpreter.memory, self.path)
+        for engine in (Interpreter, VM):
+            with self.subTest(engine=engine.__name__), redirect_stdout(io.StringIO()) as output:
+                engine(parse("c = a.x + b; a.x[1] += 1;"), memory=restore_snapshot(self.path)).interpret()
+            self.assertEqual(output.getvalue().splitlines()[-1],
+                             "{'a': {'x': [5, 3]}, 'b': [0, 1, 2, 1, 2], 'c': [5, 2, 0, 1, 2, 1, 2]}")
+
+    def test_restored_containers_compare_in_scripts(self):
+        write_snapshot({'a': [1, {'k': 2}], 'b': {'k': 2}}, self.path)
+        for engine in (Interpreter, VM):
+            with self.subTest(engine=engine.__name__), redirect_stdout(io.StringIO()):
+                interpreter = engine(parse("c = a[1] == b; d = a != [1, b]; e = b == {};"),
+                                     memory=restore_snapshot(self.path))
+                interpreter.interpret()
+            self.assertEqual([interpreter.memory[name] for name in 'cde'], [True, False, False])
+
+    def test_not_a_snapshot(self):
+        with open(self.path, 'wb') as file:
+            file.write(b'a = 1;')
+        with self.assertRaises(ValueError):
+            restore_snapshot(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
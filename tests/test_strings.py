@@ -0,0 +1,77 @@
+import pickle
+import unittest
+
+from interpreter.operators import binary_operation
+from interpreter.strings import ROPE_THRESHOLD, Rope, concatenate
+from lexer.types import TokenType
+from test_parity import ENGINE_RUNS, outcome, parse
+
+
+LONG = 'x' * ROPE_THRESHOLD
+
+
+class Ropes(unittest.TestCase):
+    def test_short_concatenations_copy(self):
+        self.assertIs(type(concatenate('ab', 'cd')), str)
+        self.assertIs(type(concatenate(LONG, 'y')), Rope)
+
+    def test_appends_share_the_buffer(self):
+        rope = concatenate(LONG, 'a')
+        longer = concatenate(rope, 'b')
+        self.assertIs(longer.chunks, rope.chunks)
+        self.assertEqual(str(longer), LONG + 'ab')
+
+    def test_alias_is_unchanged_by_an_append(self):
+        alias = concatenate(LONG, 'a')
+        appended = concatenate(alias, 'b')
+        self.assertEqual(str(alias), LONG + 'a')
+        self.assertEqual(len(alias), len(LONG) + 1)
+        branched = concatenate(alias, 'c') # the alias no longer owns the end of the buffer, so it copies
+        self.assertIsNot(branched.chunks, appended.chunks)
+        self.assertEqual((str(alias), str(appended), str(branched)), (LONG + 'a', LONG + 'ab', LONG + 'ac'))
+
+    def test_alias_is_unchanged_after_it_was_joined(self):
+        alias = concatenate(LONG, 'a')
+        str(alias)
+        appended = concatenate(alias, 'b')
+        self.assertEqual((str(alias), str(appended)), (LONG + 'a', LONG + 'ab'))
+
+    def test_behaves_like_str(self):
+        rope = concatenate(LONG, 'yz')
+        plain = LONG + 'yz'
+        self.assertEqual(rope, plain)
+        self.assertEqual(plain, rope)
+        self.assertEqual(hash(rope), hash(plain))
+        self.assertEqual({plain: 1}[rope], 1)
+        self.assertEqual((rope[-1], len(rope), repr(rope)), ('z', len(plain), repr(plain)))
+        self.assertEqual(binary_operation(TokenType.MULTIPLY, rope, 2), plain * 2)
+        self.assertEqual(binary_operation(TokenType.PLUS, 'w', rope), 'w' + plain)
+        self.assertIs(type(pickle.loads(pickle.dumps(rope))), str)
+
+    def test_error_messages_name_str(self):
+        with self.assertRaisesRegex(TypeError, "'str' and 'int'"):
+            binary_operation(TokenType.PLUS, concatenate(LONG, 'y'), 1)
+
+
+class EnginesAgree(unittest.TestCase):
+    def test_long_strings(self):
+        source = f"s = '{LONG}'; t = s; s += 'a'; u = s; s += 'b'; t += 'c'; v = s == u + 'b'; w = u * 2; x = s[0 - 1];"
+        expected = outcome(lambda: ENGINE_RUNS['tree'](parse(source)))
+        for engine, run in ENGINE_RUNS.items():
+            with self.subTest(engine=engine):
+                self.assertEqual(outcome(lambda: run(parse(source))), expected)
+
+    def test_ropes_fail_like_str(self):
+        # the same statement on a rope and on a plain str, printing neither, must fail with the same error
+        for statement in ("s[0] = 'x';", "x = [1][s];", "x = int(s);", "x = float(s);", "x = abs(s);",
+                          "x = round(s);", "x = pow(s, 2);", "x = sqrt(s);", "x = min(s, 1);", "x = s - 1;"):
+            for engine, run in ENGINE_RUNS.items():
+                with self.subTest(statement=statement, engine=engine):
+                    rope = outcome(lambda: run(parse(f"s = '{LONG}'; s += 'y'; {statement}")))
+                    plain = outcome(lambda: run(parse(f"s = '{LONG}y'; {statement}")))
+                    self.assertEqual(rope.splitlines()[-1], plain.splitlines()[-1])
+                    self.assertNotIn('Rope', rope)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from lexer.lexer import Lexer
+from lexer.symbols import SYMBOLS, SymbolTable
+from lexer.types import TokenType
+from parser.cache import ParseCache
+from parser.types import Symbol
+from parser.validation import validate
+from test_parity import parse
+
+
+def identifier_parts(source: str) -> list:
+    return [part for statement in parse(source) for part in statement.identifier.address]
+
+
+class Symbols(unittest.TestCase):
+    def test_interning(self):
+        table = SymbolTable()
+        self.assertEqual([table.intern(name) for name in ('a', 'b', 'a', ''.join(['b']))], [0, 1, 0, 1])
+        self.assertEqual((table.name(1), len(table)), ('b', 2))
+
+    def test_ids_are_not_reused_after_a_clear(self):
+        table = SymbolTable()
+        kept = [table.intern(name) for name in ('a', 'b')]
+        table.clear()
+        self.assertEqual(len(table), 0)
+        self.assertEqual([table.intern(name) for name in ('c', 'a')], [2, 3])
+        self.assertEqual((table.name(2), table.name(3)), ('c', 'a'))
+        with self.assertRaises(KeyError):
+            table.name(kept[0])
+        self.assertTrue(table.matches(kept[1], 'b'))
+        self.assertFalse(table.matches(2, 'a'))
+
+    def test_kept_trees_survive_a_clear(self):
+        kept = parse("kept_name = 1; kept_name.other = 2;")
+        # the shared table is put back afterwards, for the other tests' trees
+        with patch.object(SYMBOLS, 'base', SYMBOLS.base), patch.object(SYMBOLS, 'ids', dict(SYMBOLS.ids)), \
+                patch.object(SYMBOLS, 'names', list(SYMBOLS.names)):
+            SYMBOLS.clear()
+            later = identifier_parts("other = 1; new_name = other;")
+            kept_ids = {part.symbol for statement in kept for part in statement.identifier.address}
+            self.assertFalse(kept_ids & {part.symbol for part in later})
+            for statement in kept:
+                validate(statement)
+            for part in later:
+                self.assertEqual(SYMBOLS.name(part.symbol), part.value)
+
+    def test_lexers_carry_the_same_ids(self):
+        lexer = Lexer("abc = abc.d;")
+        tokens = []
+        while (token := lexer.get_next_token()).type != TokenType.EOF:
+            if token.type == TokenType.IDENTIFIER:
+                tokens.append(token)
+        self.assertEqual(tokens[0].symbol, tokens[1].symbol)
+        bulk = [part.symbol for part in identifier_parts("abc = 1; abc.d = 2;")]
+        self.assertEqual(bulk[:2], [tokens[0].symbol] * 2)
+        self.assertEqual(SYMBOLS.name(tokens[2].symbol), 'd')
+
+    def test_names_are_shared(self):
+        first, second = identifier_parts("name = 1; name = 2;")
+        self.assertIs(type(first), Symbol)
+        self.assertIs(first.value, second.value)
+        self.assertEqual(first.symbol, second.symbol)
+
+    def test_mismatched_symbol_is_invalid(self):
+        part = identifier_parts("a = 1;")[0]
+        part.symbol = SYMBOLS.intern('not a')
+        with self.assertRaises(ValueError):
+            validate(part)
+
+    def test_cached_trees_are_re_interned(self):
+        source = "cached_name = 1; cached_name.x = 2;"
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ParseCache(os.path.join(directory, 'cache'))
+            cache.store(source, parse(source))
+            loaded = cache.load(source)
+        for part in (part for statement in loaded for part in statement.identifier.address):
+            self.assertIs(type(part), Symbol)
+            self.assertEqual(SYMBOLS.name(part.symbol), part.value)
+            validate(part)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+
+from analysis.inference import TypeInference, describe
+from analysis.specialization import TypedBinaryOperation, TypedGlobalAssign, TypedGlobalIdentifier, \
+    TypedPathAssign, TypedPathIdentifier, specialize
+from interpreter.interpreter import Interpreter
+from parser.hash_consing import HashConsing
+from test_parity import ENGINE_RUNS, outcome, parse, typed
+from vm.opcodes import BINARY_OP_TYPED, LOAD_PATH_TYPED
+from vm.vm import VM
+
+
+def inferred(source: str) -> dict[str, str]:
+    inference = TypeInference().infer(parse(source))
+    return {name: describe(value) for name, value in inference.variables.items()}
+
+
+class Inference(unittest.TestCase):
+    def test_variables(self):
+        self.assertEqual(inferred("a = 1; b = a / 2; c = 'x' + 'y'; d = [a, b]; e = {'k': d, 'n': false}; f = a < b;"),
+                         {'a': 'int', 'b': 'float', 'c': 'str', 'd': 'array<float|int>',
+                          'e': "object{'k': array<float|int>, 'n': bool}", 'f': 'bool'})
+
+    def test_branches_are_joined(self):
+        variables = inferred("x = 1; if x { y = 'a'; z = 1; } else { y = 2; }")
+        self.assertEqual(variables['y'], 'int|str')
+        self.assertNotIn('z', variables) # not assigned on every path
+
+    def test_loops_reach_a_fixed_point(self):
+        variables = inferred("a = 0; b = []; while a < 10 { a += 0.5; b = [b]; }")
+        self.assertEqual(variables['a'], 'float|int')
+        self.assertEqual(variables['b'], 'array<array<array<array<any>>>>') # nesting is bounded, so it ends
+
+    def test_stores_into_containers_are_taken_in(self):
+        variables = inferred("a = [1]; b = {'k': a}; b.k[0] = 'x'; c = a[0];")
+        self.assertEqual(variables['c'], 'int|str')
+        self.assertEqual(variables['a'], 'array<int|str>')
+
+    def test_unknown_memory(self):
+        self.assertEqual(inferred("a = b; c = a + 1;")['a'], 'any')
+
+
+class Specialization(unittest.TestCase):
+    def test_proven_nodes_are_rewritten(self):
+        ast = typed(parse("a = [1, 2]; b = {'k': a}; c = b.k[1] + a[0]; a[0] = c; d = c;"))
+        self.assertIs(type(ast[0]), TypedGlobalAssign)
+        self.assertIsInstance(ast[2].value, TypedBinaryOperation)
+        self.assertIs(type(ast[2].value.left), TypedPathIdentifier)
+        self.assertIs(type(ast[3]), TypedPathAssign)
+        self.assertIs(type(ast[4].value), TypedGlobalIdentifier)
+
+    def test_unproven_accesses_keep_their_checks(self):
+        for source in ("a = {}; b = a.k;", "a = [1]; b = a['x'];", "b = missing;",
+                       "a = {'k': 1}; if a.k { a = 1; } b = a.k;", "a = 1 + 'x';"):
+            with self.subTest(source=source):
+                self.assertNotIn('Typed', type(typed(parse(source))[-1].value).__name__)
+
+    def test_failing_scripts_fail_the_same(self):
+        # a list indexed with an int is proven, its bounds are not: the index still raises on its own
+        for source in ("a = [1]; b = a[1];", "a = {}; b = a.k;", "a = [1]; b = a['x'];", "b = missing;",
+                       "a = {'k': 1}; if a.k { a = 1; } b = a.k;", "a = 1 + 'x';", "a = 'ab'; b = a[5];"):
+            expected = outcome(lambda: Interpreter(parse(source)).interpret())
+            for engine, run in ENGINE_RUNS.items():
+                with self.subTest(source=source, engine=engine):
+                    self.assertEqual(outcome(lambda: run(typed(parse(source)))), expected)
+
+    def test_vm_compiles_typed_opcodes(self):
+        vm = VM(typed(parse("a = {'k': [1]}; b = a.k[0] * 2;")))
+        instructions = vm.compiler.compile(vm.ast[1]).instructions[::2]
+        self.assertIn(BINARY_OP_TYPED, instructions)
+        self.assertIn(LOAD_PATH_TYPED, instructions)
+
+    def test_shared_nodes_are_specialized_once(self):
+        hash_consing = HashConsing()
+        ast = [hash_consing.share(statement) for statement in parse("a = 1; b = a + a; c = a + a;")]
+        self.assertIs(ast[1].value, ast[2].value)
+        inference = TypeInference().infer(ast)
+        specialize(ast, inference)
+        self.assertEqual(inference.specialized['TypedBinaryOperation[int + int]'], 1)
+        self.assertEqual(outcome(lambda: Interpreter(ast).interpret()),
+                         outcome(lambda: Interpreter(parse("a = 1; b = a + a; c = a + a;")).interpret()))
+
+    def test_report_and_dump(self):
+        ast = parse("a = [1]; b = a[0] + 1;")
+        inference = TypeInference().infer(ast)
+        specialize(ast, inference)
+        report = inference.report()
+        self.assertIn('array<int>', report)
+        self.assertIn('TypedBinaryOperation[int + int]', report)
+        self.assertIn('TypedPathIdentifier (proven): int', inference.dump(ast))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+
+from lexer.lexer import Lexer
+from lexer.types import TokenType
+from parser.parser import Parser
+from parser.types import *
+from parser.validation import validate
+
+
+SOURCE = "a = {1: 2, 'b': [1, 2.5]}; a.b[0] += 3; c = a('x', 1) ** 2; @c; d = e = 'f'; while d { break; }"
+
+
+class StrictParsing(unittest.TestCase):
+    def test_strict_parse_matches(self):
+        self.assertEqual(Parser(Lexer(SOURCE), strict=True).parse(), Parser(Lexer(SOURCE)).parse())
+
+    def test_parser_rejects_bad_targets(self):
+        for source in ("2 = 2;", "a = {[1]: 2};"):
+            with self.subTest(source=source), self.assertRaises(Exception):
+                Parser(Lexer(source)).parse()
+
+
+class Validation(unittest.TestCase):
+    def test_invalid_nodes(self):
+        name = Identifier(address=[String(value='a')])
+        invalid = {
+            'number value': Number(value='1'),
+            'string value': String(value=1),
+            'object key': Object(properties=[ObjectProperty(key=name, value=Number(value=1))]),
+            'object property': Object(properties=[Number(value=1)]),
+            'operator': BinaryOperation(operator=TokenType.ASSIGN, left=Number(value=1), right=Number(value=2)),
+            'right operand': BinaryOperation(operator=TokenType.PLUS, left=Number(value=1), right=None),
+            'assign target': Assign(identifier=Number(value=1), value=Number(value=2)),
+            'assign value': Assign(identifier=name, value=1),
+            'return mode': Assign(identifier=name, value=Number(value=2), return_mode='during'),
+            'nested': Array(elements=[Number(value=1), Array(elements=[String(value=None)])]),
+            'condition': If(condition=None, body=[]),
+            'loop body': While(condition=Boolean(value=True), body=[Number(value='1')]),
+            'node type': 'a',
+        }
+        for case, node in invalid.items():
+            with self.subTest(case=case), self.assertRaises(ValueError):
+                validate(node)
+
+    def test_loop_jump_outside_of_a_loop(self):
+        for jump in (Break(), If(condition=Boolean(value=True), body=[Continue()], orelse=[])):
+            with self.subTest(jump=str(jump)), self.assertRaises(ValueError):
+                validate(jump)
+        validate(While(condition=Boolean(value=True), body=[If(condition=Boolean(value=False), body=[Break()])]))
+
+    def test_parsed_statements_are_valid(self):
+        for statement in Parser(Lexer(SOURCE)).parse():
+            validate(statement)
+
+
+if __name__ == '__main__':
+    unittest.main()
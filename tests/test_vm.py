@@ -0,0 +1,120 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+from test_parity import ENGINE_RUNS, outcome, parse
+from vm.compiler import Program
+from vm.opcodes import BUILD_ARRAY_CONST, BUILD_OBJECT_CONST
+from vm.vm import VM
+
+
+def run(source: str) -> VM:
+    vm = VM(parse(source))
+    for statement in vm.ast:
+        vm.run(statement)
+    return vm
+
+
+class EnginesAgree(unittest.TestCase):
+    def assertEnginesAgree(self, source: str):
+        expected = outcome(lambda: ENGINE_RUNS['tree'](parse(source)))
+        self.assertEqual(outcome(lambda: ENGINE_RUNS['vm'](parse(source))), expected)
+
+    def test_store_at_negative_index_invalidates_cached_paths(self):
+        self.assertEnginesAgree("a = [{'x': 1}]; a[0-1].x; a[0-1] = {'x': 2}; a[0-1].x;")
+
+    def test_replaced_container_invalidates_cached_paths(self):
+        self.assertEnginesAgree("a = {'b': {'c': 1}}; a.b.c; a.b = {'c': 2}; a.b.c; a = {'b': {'c': 3}}; a.b.c;")
+
+    def test_equal_keys_of_other_types_do_not_share_a_cache(self):
+        self.assertEnginesAgree("a = [[5], [6]]; x = a[1][0] + a[1.0][0];")
+
+    def test_missing_slot(self):
+        self.assertEnginesAgree("a = 1; b = c; c = 2;")
+
+
+class Slots(unittest.TestCase):
+    def test_memory_keeps_the_first_assignment_order(self):
+        self.assertEqual(list(run("b = 1; a = 2; b = 3;").memory), ['b', 'a'])
+
+    def test_names_share_one_slot(self):
+        vm = run("a = 1; a += 1; b = a;")
+        self.assertEqual(vm.compiler.slot_names, ['a', 'b'])
+
+
+class PathCaches(unittest.TestCase):
+    def test_repeated_paths_hit(self):
+        stats = run("a = {'b': [1, 2]}; x = a.b[0] + a.b[1] + (a.b[0] = 5) + a.b[0];").cache_stats()
+        self.assertEqual((stats['sites'], stats['hits'], stats['misses']), (2, 2, 2))
+
+    def test_loops_hit(self):
+        stats = run("a = {'b': [1, 2]}; i = 0; while i < 3 { a.b[1] = a.b[0] + i; i += 1; }").cache_stats()
+        self.assertEqual((stats['sites'], stats['hits'], stats['misses']), (2, 4, 2))
+
+    def test_scalar_stores_keep_the_cache(self):
+        stats = run("a = {'b': {'c': 1}}; x = a.b.c + (a.b.c = 2) + a.b.c;").cache_stats()
+        self.assertEqual(stats['misses'], 1)
+
+    def test_caches_hold_no_containers_after_their_statement(self):
+        for source in ("a = {'b': {'c': 1}}; x = a.b.c; a = 0;", "a = {'b': {'c': 1}}; x = a.b.c + a.b.missing;"):
+            vm = VM(parse(source))
+            with redirect_stdout(io.StringIO()):
+                try:
+                    vm.interpret()
+                except KeyError: # the second one fails halfway through its statement
+                    pass
+            caches = vm.compiler.path_caches.values()
+            self.assertTrue(caches)
+            self.assertTrue(all(cache.root is None and cache.parent is None for cache in caches))
+
+    def test_site_table_is_bounded(self):
+        program = Program(parse("a = {'b': {'c': 1}};" + "x = a.b.c;" * 5))
+        with patch('vm.compiler.MAX_PATH_SITES', 1):
+            program.compile()
+        self.assertEqual(len(program.compiler.path_caches), 1)
+        self.assertIsNot(program.codes[1].path_caches[0], program.codes[2].path_caches[0])
+
+
+class Programs(unittest.TestCase):
+    def interpret(self, vm: VM) -> VM:
+        with redirect_stdout(io.StringIO()):
+            vm.interpret()
+        return vm
+
+    def test_statements_compile_once(self):
+        program = Program(parse("a = [1, 2]; a[0] = 5; i = 0; while i < 3 { i += 1; }"))
+        first = self.interpret(VM(program))
+        codes = list(program.codes)
+        second = self.interpret(VM(program))
+        self.assertEqual(len(codes), 4)
+        self.assertTrue(all(a is b for a, b in zip(program.codes, codes, strict=True)))
+        self.assertEqual(second.memory, first.memory)
+        self.assertEqual(second.memory['a'], [5, 2])
+
+    def test_streams_compile_as_they_run(self):
+        vm = self.interpret(VM(iter(parse("a = 1; b = a + 1;"))))
+        self.assertEqual(vm.memory, {'a': 1, 'b': 2})
+        self.assertEqual(vm.program.codes, [])
+
+    def test_constant_literals_build_new_containers(self):
+        program = Program(parse("a = [1, 'x']; b = {'k': 1.5, 'l': true}; a[0] = 2; b.k = 3;")).compile()
+        opcodes = {opcode for code in program.codes for opcode in code.instructions[::2]}
+        self.assertTrue({BUILD_ARRAY_CONST, BUILD_OBJECT_CONST} <= opcodes)
+        for _ in range(2):
+            self.assertEqual(self.interpret(VM(program)).memory, {'a': [2, 'x'], 'b': {'k': 3, 'l': True}})
+
+    def test_vms_sharing_a_program_keep_their_own_path_caches(self):
+        # both VMs start from the same containers; one replacing a.b must not leave the other reading the old one
+        program = Program(parse("x = a.b.c; a.b = {'c': 2}; y = a.b.c;")).compile()
+        shared = {'b': {'c': 1}}
+        first, second = VM(program, {'a': shared}), VM(program, {'a': shared})
+        first.execute(program.codes[0])
+        second.execute(program.codes[0])
+        second.execute(program.codes[1])
+        first.execute(program.codes[2])
+        self.assertEqual(first.memory['y'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
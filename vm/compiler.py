@@ -0,0 +1,275 @@
+from typing import Iterator
+
+from analysis.specialization import TypedBinaryOperation, TypedPathIdentifier
+from parser.types import *
+from vm.opcodes import *
+
+
+MAX_PATH_SITES = 1 << 16 # path caches kept for sharing before the table starts over, so streamed scripts stay bounded
+
+
+class Code:
+    __slots__ = ('instructions', 'constants', 'path_caches')
+
+    def __init__(self):
+        self.instructions: list[int] = []
+        self.constants: list = []
+        self.path_caches: list[PathCache] = [] # released by the VM once the statement has run
+
+    def emit(self, opcode: int, arg: int = 0) -> int:
+        self.instructions.append(opcode)
+        self.instructions.append(arg)
+        return len(self.instructions) - 2
+
+    def here(self) -> int:
+        return len(self.instructions)
+
+    def patch(self, pc: int, target: int):
+        # points the jump emitted at pc to a target that was not known yet
+        self.instructions[pc + 1] = target
+
+    def constant(self, value) -> int:
+        self.constants.append(value)
+        return len(self.constants) - 1
+
+    def disassemble(self) -> str:
+        lines = []
+        for pc in range(0, len(self.instructions), 2):
+            opcode, arg = self.instructions[pc], self.instructions[pc + 1]
+            lines.append(f'{pc:>5} {OPCODE_NAMES[opcode]:<17} {arg}')
+        return '\n'.join(lines)
+
+
+class PathCache:
+    # inline cache of one constant key path site: the container holding the last key, valid while
+    # the slot still holds the same root and no container-like value has been overwritten since. It is only
+    # filled while a statement using it runs, so it never keeps containers alive after the statement.
+    __slots__ = ('slot', 'keys', 'last_key', 'epoch', 'root', 'parent', 'hits', 'misses')
+
+    def __init__(self, slot: int, keys: tuple):
+        self.slot = slot
+        self.keys = keys[:-1]
+        self.last_key = keys[-1]
+        self.epoch = -1
+        self.root = None
+        self.parent = None
+        self.hits = 0
+        self.misses = 0
+
+    def release(self):
+        self.epoch, self.root, self.parent = -1, None, None
+
+    def __repr__(self):
+        return f"PathCache(slot {self.slot}: {self.keys + (self.last_key,)})"
+
+
+# statements that leave nothing on the stack, unlike expression statements
+CONTROL_NODES = (If, While, Break, Continue)
+
+
+def constant_prefix(address: list) -> int:
+    length = 0
+    while length < len(address) and isinstance(address[length], Primitive):
+        length += 1
+    return length
+
+
+class Compiler:
+    def __init__(self):
+        self.slots: dict = {}
+        self.slot_names: list = []
+        self.path_caches: dict[tuple, PathCache] = {}
+        self.loops: list[tuple[list[int], list[int]]] = [] # break and continue jumps to patch, innermost loop last
+        self.node_compilers = {
+            Identifier: self.compile_identifier,
+            BinaryOperation: self.compile_binary_operation,
+            Assign: self.compile_assign,
+            Object: self.compile_object,
+            Array: self.compile_array,
+            NativeCall: self.compile_native_call,
+            If: self.compile_if,
+            While: self.compile_while,
+            Break: lambda node, code: self.loops[-1][0].append(code.emit(JUMP)),
+            Continue: lambda node, code: self.loops[-1][1].append(code.emit(JUMP)),
+            TypedBinaryOperation: self.compile_typed_binary_operation,
+            TypedPathIdentifier: lambda node, code: self.compile_container(node.address, code, typed=True),
+            Symbol: self.compile_primitive,
+            **{t: self.compile_primitive for t in Primitive.__subclasses__()}
+        }
+
+    def compile(self, statement) -> Code:
+        if len(self.path_caches) >= MAX_PATH_SITES:
+            self.path_caches.clear() # sites already compiled keep their caches, later ones only share with each other
+        code = Code()
+        self.compile_node(statement, code)
+        if type(statement) in CONTROL_NODES:
+            code.emit(LOAD_CONST, code.constant(None)) # the statement's result
+        return code
+
+    def compile_node(self, node, code: Code):
+        node_compiler = self.node_compilers.get(type(node))
+        if node_compiler is None:
+            node_compiler = self.inherited_compiler(type(node))
+        if node_compiler:
+            return node_compiler(node, code)
+        code.emit(UNSUPPORTED, code.constant(type(node).__name__))
+
+    def inherited_compiler(self, node_type: type):
+        # variants of a node (quickened, typed) that have no compiler of their own compile like their base
+        for base in node_type.__mro__[1:]:
+            node_compiler = self.node_compilers.get(base)
+            if node_compiler:
+                self.node_compilers[node_type] = node_compiler
+                return node_compiler
+        return None
+
+    def resolve(self, name) -> int:
+        slot = self.slots.get(name)
+        if slot is None:
+            slot = self.slots[name] = len(self.slot_names)
+            self.slot_names.append(name)
+        return slot
+
+    def path_cache(self, address: list, code: Code) -> PathCache:
+        # sites spelling the same constant path share one cache; 1, 1.0 and true are equal as Python values but
+        # do not index the same way, so the key holds their types too
+        slot, keys = self.resolve(address[0].value), tuple(part.value for part in address[1:])
+        key = (slot, keys, tuple(map(type, keys)))
+        cache = self.path_caches.get(key)
+        if cache is None:
+            cache = self.path_caches[key] = PathCache(slot, keys)
+        if cache not in code.path_caches:
+            code.path_caches.append(cache)
+        return cache
+
+    def compile_primitive(self, node: Primitive, code: Code):
+        code.emit(LOAD_CONST, code.constant(node.value))
+
+    def compile_container(self, address: list, code: Code, typed: bool = False):
+        # pushes the value at address; constant prefixes resolve to a slot or a cached path. A typed address is
+        # proven to index only containers that accept its keys, so nothing is validated.
+        prefix = constant_prefix(address)
+        if prefix == 0:
+            self.compile_node(address[0], code)
+            if type(address[0]) is not NativeCall: # a call's result is the container itself, not a name
+                code.emit(LOAD_NAME)
+            prefix = 1
+        elif prefix == 1:
+            code.emit(LOAD_SLOT, self.resolve(address[0].value))
+        else:
+            cache = self.path_cache(address[:prefix], code)
+            code.emit(LOAD_PATH_TYPED if typed else LOAD_PATH, code.constant(cache))
+        for part in address[prefix:]:
+            self.compile_node(part, code)
+            code.emit(INDEX_TYPED if typed else INDEX)
+
+    def compile_identifier(self, identifier: Identifier, code: Code):
+        self.compile_container(identifier.address, code)
+
+    def compile_assign(self, assign: Assign, code: Code):
+        self.compile_node(assign.value, code)
+        return_mode = RETURN_BEFORE if assign.return_mode == 'before' else RETURN_AFTER
+        address = assign.identifier.address
+        prefix = constant_prefix(address)
+        if prefix == len(address) == 1:
+            return code.emit(STORE_SLOT, self.resolve(address[0].value) << 1 | return_mode)
+        if prefix == len(address):
+            return code.emit(STORE_PATH, code.constant(self.path_cache(address, code)) << 1 | return_mode)
+        if len(address) == 1:
+            self.compile_node(address[0], code)
+            return code.emit(STORE_NAME, return_mode)
+        self.compile_container(address[:-1], code)
+        self.compile_node(address[-1], code)
+        code.emit(STORE_ITEM, return_mode)
+
+    def compile_binary_operation(self, operation: BinaryOperation, code: Code):
+        self.compile_node(operation.left, code)
+        self.compile_node(operation.right, code)
+        code.emit(BINARY_OP, code.constant(operation.operator))
+
+    def compile_typed_binary_operation(self, operation: TypedBinaryOperation, code: Code):
+        self.compile_node(operation.left, code)
+        self.compile_node(operation.right, code)
+        code.emit(BINARY_OP_TYPED, code.constant(operation.function))
+
+    def compile_object(self, obj: Object, code: Code):
+        if all(isinstance(prop.value, Primitive) for prop in obj.properties):
+            items = tuple((prop.key.value, prop.value.value) for prop in obj.properties)
+            return code.emit(BUILD_OBJECT_CONST, code.constant(items))
+        for prop in obj.properties:
+            code.emit(LOAD_CONST, code.constant(prop.key.value))
+            self.compile_node(prop.value, code)
+        code.emit(BUILD_OBJECT, len(obj.properties))
+
+    def compile_array(self, arr: Array, code: Code):
+        if all(isinstance(element, Primitive) for element in arr.elements):
+            return code.emit(BUILD_ARRAY_CONST, code.constant(tuple(element.value for element in arr.elements)))
+        for element in arr.elements:
+            self.compile_node(element, code)
+        code.emit(BUILD_ARRAY, len(arr.elements))
+
+    def compile_native_call(self, call: NativeCall, code: Code):
+        for arg in call.args:
+            self.compile_node(arg, code)
+        code.emit(CALL_NATIVE, code.constant((call.native, len(call.args))))
+
+    def compile_block(self, statements: list, code: Code):
+        for statement in statements:
+            self.compile_node(statement, code)
+            if type(statement) not in CONTROL_NODES:
+                code.emit(POP_TOP)
+
+    def compile_if(self, node: If, code: Code):
+        self.compile_node(node.condition, code)
+        to_else = code.emit(POP_JUMP_IF_FALSE)
+        self.compile_block(node.body, code)
+        if node.orelse:
+            to_end = code.emit(JUMP)
+            code.patch(to_else, code.here())
+            self.compile_block(node.orelse, code)
+            code.patch(to_end, code.here())
+        else:
+            code.patch(to_else, code.here())
+
+    def compile_while(self, loop: While, code: Code):
+        # the condition is tested at the bottom, so an iteration takes one conditional jump back to the body
+        to_test = code.emit(JUMP)
+        body = code.here()
+        self.loops.append(([], []))
+        self.compile_block(loop.body, code)
+        breaks, continues = self.loops.pop()
+        for jump in (to_test, *continues):
+            code.patch(jump, code.here())
+        self.compile_node(loop.condition, code)
+        code.emit(POP_JUMP_IF_TRUE, body)
+        for jump in breaks:
+            code.patch(jump, code.here())
+
+
+class Program:
+    # a script compiled once: each statement is compiled the first time it runs, and its Code is reused by every
+    # later run, in this VM or in any other VM built from the same Program. Statements from a stream run once,
+    # so they are compiled as they come and not kept.
+    __slots__ = ('statements', 'compiler', 'codes')
+
+    def __init__(self, statements):
+        self.statements = statements
+        self.compiler = Compiler()
+        self.codes: list[Code] = []
+
+    def __iter__(self) -> Iterator[tuple[object, Code]]:
+        if not isinstance(self.statements, list):
+            for statement in self.statements:
+                yield statement, self.compiler.compile(statement)
+            return
+        for index, statement in enumerate(self.statements):
+            if index == len(self.codes):
+                self.codes.append(self.compiler.compile(statement))
+            yield statement, self.codes[index]
+
+    def compile(self) -> 'Program':
+        # compiles every statement up front, so no run pays for compiling; a stream still compiles as it runs
+        if isinstance(self.statements, list):
+            for _ in self:
+                pass
+        return self
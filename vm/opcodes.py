@@ -0,0 +1,30 @@
+# the opcodes up to JUMP are numbered by how often they run on the benchmark corpus, and the VM tests them inline in
+# this order; the rest are dispatched through its handler table
+LOAD_CONST = 0  # push constants[arg]
+LOAD_SLOT = 1  # push the top-level variable in slot arg
+STORE_SLOT = 2  # pop value, store it in slot arg >> 1, push result (return mode arg & 1)
+BINARY_OP = 3  # pop right and left, push the operator table result for operator constants[arg]
+BINARY_OP_TYPED = 4  # pop right and left, push constants[arg](left, right): the operand types are proven
+POP_TOP = 5  # discard the top of the stack
+POP_JUMP_IF_TRUE = 6  # pop a value, continue at offset arg if it is truthy
+POP_JUMP_IF_FALSE = 7  # pop a value, continue at offset arg if it is falsy
+JUMP = 8  # continue at instruction offset arg
+BUILD_ARRAY = 9  # pop arg values, push them as a list
+STORE_PATH = 10  # pop value, store it at the constant key path of the PathCache constants[arg >> 1], push result
+LOAD_PATH = 11  # push the value at the constant key path described by the PathCache constants[arg]
+BUILD_OBJECT = 12  # pop arg key/value pairs, push them as a dict
+LOAD_PATH_TYPED = 13  # like LOAD_PATH, for a path proven to lead to a container holding the last key
+INDEX = 14  # pop key, replace the container on top of the stack with container[key]
+STORE_ITEM = 15  # pop key, container and value, store container[key] = value, push result (return mode arg)
+INDEX_TYPED = 16  # like INDEX, for a container proven to accept the key
+LOAD_NAME = 17  # pop a computed top-level name, push its value
+STORE_NAME = 18  # pop a computed top-level name and a value, store it, push result (return mode arg)
+CALL_NATIVE = 19  # pop constants[arg][1] arguments, push the result of calling the native constants[arg][0]
+UNSUPPORTED = 20  # raise for the node type named by constants[arg]
+BUILD_ARRAY_CONST = 21  # push a new list of the values in the tuple constants[arg]
+BUILD_OBJECT_CONST = 22  # push a new dict of the key/value pairs in the tuple constants[arg]
+
+OPCODE_NAMES = {value: name for name, value in globals().copy().items() if name.isupper() and isinstance(value, int)}
+
+RETURN_AFTER = 0
+RETURN_BEFORE = 1
@@ -0,0 +1,61 @@
+import asyncio
+
+from vm.vm import VM, Frame
+
+
+class BudgetExceeded(Exception):
+    pass
+
+
+class AsyncScript:
+    # runs a script on the VM as a coroutine that gives control back to the event loop every `slice_size`
+    # instructions; cancel it through its asyncio task, which interrupts it at the next slice boundary
+    def __init__(self, ast, slice_size: int = 1024, budget: int | None = None):
+        if slice_size < 1:
+            raise ValueError("slice_size must be at least 1")
+        self.vm = VM(ast)
+        self.slice_size = slice_size
+        self.budget = budget
+        self.executed = 0
+        self.switches = 0
+        self.results = []
+
+    @property
+    def memory(self) -> dict:
+        return self.vm.memory
+
+    async def switch(self):
+        self.switches += 1
+        await asyncio.sleep(0)
+
+    async def run(self) -> list:
+        since_switch = 0
+        for _, code in self.vm.program:
+            frame = Frame(code)
+            while True:
+                limit = self.slice_size - since_switch
+                remaining = None if self.budget is None else self.budget - self.executed
+                if remaining is not None:
+                    limit = min(limit, remaining)
+                before = frame.executed
+                done = self.vm.resume(frame, limit)
+                ran = frame.executed - before
+                self.executed += ran
+                since_switch += ran
+                if done:
+                    break
+                if remaining is not None and ran >= remaining:
+                    raise BudgetExceeded(f"Script exceeded its budget of {self.budget} instructions")
+                await self.switch()
+                since_switch = 0
+            self.results.append(frame.result)
+            if since_switch >= self.slice_size:
+                await self.switch()
+                since_switch = 0
+        return self.results
+
+
+async def run_async(ast, slice_size: int = 1024, budget: int | None = None) -> AsyncScript:
+    script = AsyncScript(ast, slice_size, budget)
+    await script.run()
+    return script
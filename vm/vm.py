@@ -0,0 +1,267 @@
+import itertools
+
+from interpreter.interpreter import validate_indexable, safe_get, prints_result
+from interpreter.operators import OPERATOR_TABLE, unsupported_operands
+from vm.compiler import Code, PathCache, Program
+from vm.opcodes import *
+
+
+UNSET = object()
+
+# overwriting one of these can never invalidate a cached path: they are never indexed through
+SCALAR_TYPES = (int, float, bool, type(None))
+
+# shared by every VM, so a path cache that one VM of a Program filled is never valid in another
+EPOCHS = itertools.count()
+
+
+class Frame:
+    # the suspended state of one compiled statement, so execution can stop between any two instructions
+    __slots__ = ('code', 'pc', 'stack', 'executed', 'result')
+
+    def __init__(self, code: Code):
+        self.code = code
+        self.pc = 0
+        self.stack = []
+        self.executed = 0
+        self.result = None
+
+
+class VM:
+    def __init__(self, ast, memory: dict | None = None):
+        # ast is a list or stream of statements, or a Program another VM already ran, to reuse its Code
+        self.program = ast if isinstance(ast, Program) else Program(ast)
+        self.ast = self.program.statements
+        self.compiler = self.program.compiler
+        self.slots: list = []
+        self.assigned: list[int] = []  # slots in first-assignment order, to mirror the memory dict
+        self.epoch = next(EPOCHS)
+        handlers = {
+            BUILD_ARRAY: self.build_array,
+            STORE_PATH: self.store_path,
+            LOAD_PATH: self.load_path,
+            BUILD_OBJECT: self.build_object,
+            LOAD_PATH_TYPED: self.load_path_typed,
+            INDEX: self.index,
+            STORE_ITEM: self.store_item,
+            INDEX_TYPED: self.index_typed,
+            LOAD_NAME: self.load_name,
+            STORE_NAME: self.store_name,
+            CALL_NATIVE: self.call_native,
+            UNSUPPORTED: self.unsupported,
+            BUILD_ARRAY_CONST: self.build_array_const,
+            BUILD_OBJECT_CONST: self.build_object_const,
+        }
+        # indexed by opcode; the opcodes resume tests inline have no handler
+        self.handlers = [handlers.get(opcode) for opcode in range(max(OPCODE_NAMES) + 1)]
+        for name, value in (memory or {}).items():
+            self.store_slot(self.resolve_name(name), value, RETURN_AFTER)
+
+    @property
+    def memory(self) -> dict:
+        names, slots = self.compiler.slot_names, self.slots
+        return {names[slot]: slots[slot] for slot in self.assigned}
+
+    def cache_stats(self) -> dict:
+        # counted per Program, over every VM that ran it
+        caches = self.compiler.path_caches.values()
+        hits = sum(cache.hits for cache in caches)
+        misses = sum(cache.misses for cache in caches)
+        return {
+            'sites': len(self.compiler.path_caches),
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / (hits + misses) if hits + misses else 0.0,
+        }
+
+    def load_slot(self, slot: int):
+        value = self.slots[slot]
+        if value is UNSET:
+            raise KeyError(f"Identifier '{self.compiler.slot_names[slot]}' not found in memory")
+        return value
+
+    def store_slot(self, slot: int, value, return_mode: int):
+        old_value = self.slots[slot]
+        if old_value is UNSET:
+            self.assigned.append(slot)
+            old_value = None
+        self.slots[slot] = value
+        return old_value if return_mode == RETURN_BEFORE else value
+
+    def cached_parent(self, cache: PathCache):
+        root = self.load_slot(cache.slot)
+        if cache.epoch == self.epoch and cache.root is root:
+            cache.hits += 1
+            return cache.parent
+        cache.misses += 1
+        parent = root
+        for key in cache.keys:
+            validate_indexable(parent, key) # raises KeyError or TypeError if invalid indexing
+            parent = parent[key]
+        cache.epoch, cache.root, cache.parent = self.epoch, root, parent
+        return parent
+
+    def store(self, container: dict | list, key, value, return_mode: int):
+        old_value = safe_get(container, key)
+        container[key] = value
+        # safe_get reads None for negative list indexes, which still replace an element
+        if not isinstance(old_value, SCALAR_TYPES) or (not isinstance(container, dict) and key < 0):
+            self.epoch = next(EPOCHS) # a container may have been replaced, cached paths through it are stale
+        return old_value if return_mode == RETURN_BEFORE else value
+
+    def resolve_name(self, name) -> int:
+        slot = self.compiler.resolve(name)
+        if slot >= len(self.slots):
+            self.slots.extend(UNSET for _ in range(slot + 1 - len(self.slots)))
+        return slot
+
+    # handlers of the opcodes resume does not test inline, called with the frame's stack, the constants of its
+    # code and the instruction's argument
+
+    def build_array(self, stack: list, constants: list, arg: int):
+        values = stack[len(stack) - arg:]
+        del stack[len(stack) - arg:]
+        stack.append(values)
+
+    def store_path(self, stack: list, constants: list, arg: int):
+        cache = constants[arg >> 1]
+        stack.append(self.store(self.cached_parent(cache), cache.last_key, stack.pop(), arg & 1))
+
+    def load_path(self, stack: list, constants: list, arg: int):
+        cache = constants[arg]
+        parent = self.cached_parent(cache)
+        validate_indexable(parent, cache.last_key)
+        stack.append(parent[cache.last_key])
+
+    def build_object(self, stack: list, constants: list, arg: int):
+        items = stack[len(stack) - 2 * arg:]
+        del stack[len(stack) - 2 * arg:]
+        stack.append({items[i]: items[i + 1] for i in range(0, len(items), 2)})
+
+    def load_path_typed(self, stack: list, constants: list, arg: int):
+        cache = constants[arg]
+        stack.append(self.cached_parent(cache)[cache.last_key])
+
+    def index(self, stack: list, constants: list, arg: int):
+        key = stack.pop()
+        validate_indexable(stack[-1], key)
+        stack[-1] = stack[-1][key]
+
+    def store_item(self, stack: list, constants: list, arg: int):
+        key = stack.pop()
+        container = stack.pop()
+        stack.append(self.store(container, key, stack.pop(), arg))
+
+    def index_typed(self, stack: list, constants: list, arg: int):
+        key = stack.pop()
+        stack[-1] = stack[-1][key]
+
+    def load_name(self, stack: list, constants: list, arg: int):
+        name = stack.pop()
+        if name not in self.compiler.slots:
+            raise KeyError(f"Identifier '{name}' not found in memory")
+        stack.append(self.load_slot(self.resolve_name(name)))
+
+    def store_name(self, stack: list, constants: list, arg: int):
+        name = stack.pop()
+        stack.append(self.store_slot(self.resolve_name(name), stack.pop(), arg))
+
+    def call_native(self, stack: list, constants: list, arg: int):
+        native, argc = constants[arg]
+        args = stack[len(stack) - argc:]
+        del stack[len(stack) - argc:]
+        stack.append(native(*args))
+
+    def unsupported(self, stack: list, constants: list, arg: int):
+        raise TypeError(f"Unsupported type for interpretation: {constants[arg]}")
+
+    def build_array_const(self, stack: list, constants: list, arg: int):
+        stack.append(list(constants[arg]))
+
+    def build_object_const(self, stack: list, constants: list, arg: int):
+        stack.append(dict(constants[arg]))
+
+    def execute(self, code: Code):
+        frame = Frame(code)
+        self.resume(frame)
+        return frame.result
+
+    def resume(self, frame: 'Frame', limit: int | None = None) -> bool:
+        # runs at most `limit` instructions of the frame; returns True once the frame has finished
+        code = frame.code
+        instructions, constants = code.instructions, code.constants
+        slots = self.slots
+        if len(slots) < len(self.compiler.slot_names):
+            slots.extend(UNSET for _ in range(len(self.compiler.slot_names) - len(slots)))
+        stack = frame.stack
+        push, pop = stack.append, stack.pop
+        operator_table, handlers = OPERATOR_TABLE, self.handlers
+        pc, end = frame.pc, len(instructions)
+        # straight-line code runs pc - start instructions (times two), and jumps add how far back they moved pc,
+        # so a budget is an earlier stopping point that each jump moves
+        start, jumped = pc, 0
+        budget = None if limit is None else 2 * limit
+        stop = end if budget is None else min(end, pc + budget)
+        try:
+            while pc < stop:
+                opcode, arg = instructions[pc], instructions[pc + 1]
+                pc += 2
+                if opcode == LOAD_CONST:
+                    push(constants[arg])
+                elif opcode == LOAD_SLOT:
+                    value = slots[arg]
+                    push(value if value is not UNSET else self.load_slot(arg))
+                elif opcode == STORE_SLOT:
+                    push(self.store_slot(arg >> 1, pop(), arg & 1))
+                elif opcode == BINARY_OP:
+                    right, left = pop(), stack[-1]
+                    function = operator_table.get((constants[arg], type(left), type(right)))
+                    if function is None:
+                        raise unsupported_operands(constants[arg], left, right)
+                    stack[-1] = function(left, right)
+                elif opcode == BINARY_OP_TYPED:
+                    right = pop()
+                    stack[-1] = constants[arg](stack[-1], right)
+                elif opcode == POP_TOP:
+                    pop()
+                elif opcode > JUMP:
+                    handlers[opcode](stack, constants, arg)
+                elif opcode == POP_JUMP_IF_TRUE:
+                    if pop():
+                        jumped += pc - arg
+                        pc = arg
+                        if budget is not None:
+                            stop = min(end, start - jumped + budget)
+                elif opcode == POP_JUMP_IF_FALSE:
+                    if not pop():
+                        jumped += pc - arg
+                        pc = arg
+                        if budget is not None:
+                            stop = min(end, start - jumped + budget)
+                else:
+                    jumped += pc - arg
+                    pc = arg
+                    if budget is not None:
+                        stop = min(end, start - jumped + budget)
+        except BaseException:
+            for cache in code.path_caches: # the frame is abandoned, its caches must not keep containers alive
+                cache.release()
+            raise
+        frame.executed += (pc - start + jumped) >> 1
+        frame.pc = pc
+        if pc < end:
+            return False
+        frame.result = pop()
+        for cache in code.path_caches:
+            cache.release()
+        return True
+
+    def run(self, statement):
+        return self.execute(self.compiler.compile(statement))
+
+    def interpret(self):
+        for statement, code in self.program:
+            result = self.execute(code)
+            if prints_result(statement, result):
+                print(result)
+        print(self.memory)